@@ -5,12 +5,17 @@ from dotenv import load_dotenv   # ✅ ADD THIS
 load_dotenv() 
 from .extensions import (
     db, jwt, mail, cloudinary_client, mongo_client,
-    migrate, cors, bcrypt, oauth, limiter, socketio
+    migrate, cors, bcrypt, oauth, limiter, socketio, REDIS_URL
 )
 
 from .models import *
-from .routes import auth, admin_routes, candidate_routes, ai_routes, mfa_routes, sso_routes, analytics_routes, chat_routes, offer_routes  # import sso_routes
+from .routes import auth, admin_routes, candidate_routes, ai_routes, mfa_routes, sso_routes, analytics_routes, chat_routes, offer_routes, file_routes  # import sso_routes
 from .websocket_handler import register_websocket_handlers
+from .cli import register_cli_commands
+from .services.dashboard_snapshot_service import DashboardSnapshotService
+from .services.change_feed_service import ChangeFeedService
+from .services.candidate_skill_service import CandidateSkillService
+from .services.socketio_fanout import socketio_options
 from .config import config  # <-- import the config dictionary
 
 def create_app(config_name=None):
@@ -41,19 +46,22 @@ def create_app(config_name=None):
     bcrypt.init_app(app)
     cloudinary_client.init_app(app)
     limiter.init_app(app)
+    # Async mode, transports and the message queue fanning emits out to every
+    # worker come from SOCKETIO_* config (see services/socketio_fanout.py)
     socketio.init_app(
         app,
         cors_allowed_origins="*",
-        async_mode="threading",  # or 'gevent' depending on your setup
         manage_session=False,
         ping_timeout=60,
-        ping_interval=25
+        ping_interval=25,
+        **socketio_options(app.config, REDIS_URL)
     )
     cors.init_app(
         app,
         origins=["*"],
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+        expose_headers=["X-Rollups-Refreshed-At"],
         supports_credentials=True,
     )
 
@@ -66,6 +74,7 @@ def create_app(config_name=None):
     app.register_blueprint(analytics_routes.analytics_bp, url_prefix="/api")
     app.register_blueprint(chat_routes.chat_bp, url_prefix="/api/chat")
     app.register_blueprint(offer_routes.offer_bp, url_prefix="/api/offer")
+    app.register_blueprint(file_routes.files_bp, url_prefix="/api/files")
 
     # ---------------- Register SSO Blueprint ----------------
     sso_routes.register_sso_provider(app)      # initialize Auth0 / SSO provider
@@ -73,6 +82,14 @@ def create_app(config_name=None):
 
     # ---------------- Register WebSocket Handlers ----------------
     register_websocket_handlers(app)
+
+    # ---------------- Dashboard Snapshot / Change Feed / Skills Hooks ----------------
+    DashboardSnapshotService.register_hooks()
+    ChangeFeedService.register_hooks()
+    CandidateSkillService.register_hooks()
+
+    # ---------------- Register CLI Commands ----------------
+    register_cli_commands(app)
     
     # ---------------- Health Check Route ----------------
     @app.route("/api/health")
@@ -0,0 +1,174 @@
+"""
+Flask CLI commands (``flask <command>``).
+"""
+import os
+import time
+
+import click
+
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.analytics_rollup_service import AnalyticsRollupService
+from app.services.candidate_skill_service import CandidateSkillService
+from app.services.cv_job_queue import CVJobQueue
+from app.services.cv_import_service import CVImportService
+from app.services import skill_taxonomy
+from app.services.storage_service import StorageService
+from app.services import socketio_fanout
+from app.extensions import REDIS_URL
+from app.services.columnar_export_service import ColumnarExportService, FORMATS as COLUMNAR_FORMATS
+
+
+def register_cli_commands(app):
+    """Attach maintenance commands to the app's CLI"""
+
+    @app.cli.command("rebuild-dashboard-snapshot")
+    def rebuild_dashboard_snapshot():
+        """Recompute the materialized dashboard counters from source tables."""
+        started = time.monotonic()
+        DashboardSnapshotService.rebuild(wait=True)
+        click.echo(f"Dashboard snapshot rebuilt in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("compact-dashboard-snapshot")
+    def compact_dashboard_snapshot():
+        """Fold pending dashboard counter deltas into the snapshot rows."""
+        if DashboardSnapshotService.compact():
+            click.echo("Dashboard snapshot deltas compacted")
+        else:
+            click.echo("Another rebuild or compaction is running; skipped")
+
+    @app.cli.command("prune-tombstones")
+    @click.option("--days", default=90, show_default=True, help="Keep tombstones newer than this many days.")
+    def prune_tombstones(days):
+        """Delete old change-feed tombstones."""
+        removed = ChangeFeedService.prune_tombstones(days)
+        click.echo(f"Removed {removed} tombstones older than {days} days")
+
+    @app.cli.command("export-columnar")
+    @click.option("--format", "fmt", type=click.Choice(list(COLUMNAR_FORMATS)), default="parquet", show_default=True)
+    @click.option("--output-dir", default=None, help="Defaults to the EXPORT_DIR config value.")
+    @click.option("--table", "tables", multiple=True, type=click.Choice(ColumnarExportService.TABLES),
+                  help="Table to export; repeat for several. Defaults to all tables.")
+    def export_columnar(fmt, output_dir, tables):
+        """Write the fact and dimension tables as Parquet or Arrow IPC files."""
+        output_dir = output_dir or app.config["EXPORT_DIR"]
+        started = time.monotonic()
+        written = ColumnarExportService.export_to_directory(output_dir, tables or None, fmt)
+        for name, rows in written.items():
+            click.echo(f"{name}: {rows} rows")
+        click.echo(f"Exported to {output_dir} in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("backfill-analytics-rollups")
+    @click.option("--fact", "facts", multiple=True, type=click.Choice(AnalyticsRollupService.FACTS),
+                  help="Fact to rebuild; repeat for several. Defaults to all facts.")
+    @click.option("--start", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="First day (YYYY-MM-DD).")
+    @click.option("--end", type=click.DateTime(formats=["%Y-%m-%d"]), default=None, help="Last day (YYYY-MM-DD).")
+    def backfill_analytics_rollups(facts, start, end):
+        """Recompute the daily analytics rollups from the source tables."""
+        started = time.monotonic()
+        result = AnalyticsRollupService.backfill(
+            facts or None,
+            start=start.date() if start else None,
+            end=end.date() if end else None
+        )
+        for fact, outcome in result.items():
+            click.echo(f"{fact}: {outcome}")
+        click.echo(f"Done in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("catch-up-analytics-rollups")
+    def catch_up_analytics_rollups():
+        """Recompute the rollup days changed since the last run (cron-friendly)."""
+        started = time.monotonic()
+        for fact, outcome in AnalyticsRollupService.catch_up(wait=True).items():
+            click.echo(f"{fact}: {outcome}")
+        click.echo(f"Done in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("rebuild-candidate-skills")
+    def rebuild_candidate_skills():
+        """Repopulate candidate_skills and skill_frequencies from Candidate.skills."""
+        started = time.monotonic()
+        written = CandidateSkillService.rebuild()
+        click.echo(f"Wrote {written} candidate skills in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("cv-worker")
+    @click.option("--max-jobs", type=int, default=None, help="Exit after processing this many jobs.")
+    @click.option("--stale-after", default=900, show_default=True,
+                  help="Requeue jobs left running longer than this many seconds (crashed workers).")
+    def cv_worker(max_jobs, stale_after):
+        """Process queued resume uploads and analyses from Redis."""
+        if not app.config.get("PUBLIC_API_URL"):
+            raise click.ClickException("Set PUBLIC_API_URL: the worker links stored resumes outside a request")
+        requeued = CVJobQueue.recover(stale_after)
+        click.echo(f"Re-enqueued {requeued} pending CV jobs; waiting for work")
+        processed = CVJobQueue.work(max_jobs=max_jobs)
+        click.echo(f"Processed {processed} CV jobs")
+
+    @app.cli.command("import-cvs")
+    @click.argument("source", type=click.Path(exists=True))
+    @click.option("--workers", type=int, default=None, help="Parser processes. Defaults to the CPU count.")
+    @click.option("--batch-size", default=200, show_default=True, help="Files parsed and upserted per transaction.")
+    @click.option("--ai/--no-ai", "use_ai", default=False, show_default=True,
+                  help="Enrich the offline extraction with the AI provider.")
+    @click.option("--checkpoint", default=None, help="Defaults to <source>.import-checkpoint.")
+    @click.option("--restart", is_flag=True, help="Ignore the checkpoint and import every file again.")
+    def import_cvs(source, workers, batch_size, use_ai, checkpoint, restart):
+        """Bulk-import resumes from a directory or zip as candidates (resumable)."""
+        checkpoint = checkpoint or CVImportService.default_checkpoint(source)
+        if restart and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        def progress(stats):
+            click.echo(f"{stats['files']} files ({stats['failed']} failed) "
+                       f"in {stats['seconds']:.1f}s, {stats['files_per_second']:.1f} files/s")
+
+        stats = CVImportService.import_path(source, workers=workers, batch_size=batch_size, use_ai=use_ai,
+                                            checkpoint=checkpoint, progress=progress)
+        for error in stats["errors"]:
+            click.echo(f"  failed: {error}")
+        click.echo(
+            f"Imported {stats['files']} files ({stats['skipped']} already done): "
+            f"{stats['inserted']} new, {stats['updated']} updated, {stats['failed']} failed, "
+            f"{stats['enriched']} AI-enriched in {stats['seconds']:.1f}s "
+            f"({stats['files_per_second']:.1f} files/s)"
+        )
+
+    @app.cli.command("benchmark-skill-matcher")
+    @click.option("--terms", default=10000, show_default=True, help="Taxonomy size (padded with generated terms).")
+    @click.option("--pages", default=20, show_default=True, help="Pages per synthetic CV.")
+    @click.option("--docs", default=10, show_default=True, help="Number of synthetic CVs.")
+    def benchmark_skill_matcher(terms, pages, docs):
+        """Measure offline skill extraction throughput against per-keyword regex searches."""
+        result = skill_taxonomy.benchmark(terms=terms, pages=pages, docs=docs)
+        click.echo(f"{result['terms']} terms compiled in {result['compile_seconds']:.3f}s")
+        click.echo(
+            f"{result['docs']} CVs x {result['pages_per_doc']} pages ({result['megabytes']} MB): "
+            f"{result['docs_per_second']:.1f} CVs/s, {result['megabytes_per_second']:.1f} MB/s, "
+            f"{result['hits']} matches"
+        )
+        click.echo(f"Per-keyword regex searches: {result['per_keyword_docs_per_second']:.2f} CVs/s")
+
+    @app.cli.command("storage-sync")
+    def storage_sync():
+        """Upload staged files whose background upload failed or was interrupted."""
+        started = time.monotonic()
+        uploaded, failed = StorageService.sync()
+        click.echo(f"Uploaded {uploaded} files, {failed} failed in {time.monotonic() - started:.2f}s")
+
+    @app.cli.command("benchmark-socketio")
+    @click.option("--workers", "worker_counts", multiple=True, type=int, default=(1, 2, 4), show_default=True,
+                  help="Server processes; repeat to compare several counts.")
+    @click.option("--clients", default=200, show_default=True, help="WebSocket clients, spread over the workers.")
+    @click.option("--messages", default=200, show_default=True, help="Broadcasts published per run.")
+    @click.option("--queue", "queue_url", default=None, help="Message queue URL. Defaults to the app's queue.")
+    def benchmark_socketio(worker_counts, clients, messages, queue_url):
+        """Measure Socket.IO broadcast delivery through the message queue per worker count."""
+        queue_url = queue_url or socketio_fanout.message_queue_url(app.config["SOCKETIO_MESSAGE_QUEUE"], REDIS_URL)
+        if not queue_url:
+            raise click.ClickException("No message queue: set SOCKETIO_MESSAGE_QUEUE or pass --queue")
+        for workers in worker_counts:
+            result = socketio_fanout.benchmark(queue_url, workers=workers, clients=clients, messages=messages)
+            click.echo(
+                f"{result['workers']} workers, {result['clients']} clients: "
+                f"{result['delivered']}/{result['expected']} delivered in {result['seconds']:.2f}s, "
+                f"{result['delivered_per_second']:.0f} messages/s"
+            )
@@ -74,6 +74,65 @@ class Config:
     GOOGLE_CALENDAR_DEFAULT_DURATION = int(os.getenv('GOOGLE_CALENDAR_DEFAULT_DURATION', '60'))  # minutes
     GOOGLE_CALENDAR_TIMEZONE = os.getenv('GOOGLE_CALENDAR_TIMEZONE', 'UTC')
 
+    # Dashboard snapshot: max age (seconds) before a read schedules a background full reconcile
+    DASHBOARD_SNAPSHOT_RECONCILE_SECONDS = int(os.getenv('DASHBOARD_SNAPSHOT_RECONCILE_SECONDS', '3600'))
+    # Dashboard snapshot: how often (seconds) pending writer deltas are folded into the snapshot
+    DASHBOARD_SNAPSHOT_COMPACT_SECONDS = int(os.getenv('DASHBOARD_SNAPSHOT_COMPACT_SECONDS', '60'))
+
+    # Power BI change feed: how far the watermark trails now() to cover in-flight commits
+    CHANGE_FEED_SAFETY_SECONDS = int(os.getenv('CHANGE_FEED_SAFETY_SECONDS', '5'))
+
+    # Columnar (Parquet / Arrow) exports written by `flask export-columnar`
+    EXPORT_DIR = os.getenv('EXPORT_DIR', 'exports')
+
+    # Analytics rollups: max lag (seconds) before a request queues a background catch-up
+    ANALYTICS_ROLLUP_MAX_LAG_SECONDS = int(os.getenv('ANALYTICS_ROLLUP_MAX_LAG_SECONDS', '300'))
+
+    # LLM CV analysis cache: 'memory' (per process) or 'redis' (shared)
+    ANALYSIS_CACHE_BACKEND = os.getenv('ANALYSIS_CACHE_BACKEND', 'memory')
+    ANALYSIS_CACHE_TTL_SECONDS = int(os.getenv('ANALYSIS_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+    ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv('ANALYSIS_CACHE_MAX_ENTRIES', '1024'))
+
+    # Resume analysis jobs: 'auto' (Redis when reachable), 'redis' or 'thread' (in-process)
+    CV_JOB_QUEUE_BACKEND = os.getenv('CV_JOB_QUEUE_BACKEND', 'auto')
+    CV_JOB_THREADS = int(os.getenv('CV_JOB_THREADS', '2'))
+    # Failed resume jobs retry after base * 2^(attempt-1) seconds (jittered, capped at max)
+    CV_JOB_RETRY_BASE_SECONDS = int(os.getenv('CV_JOB_RETRY_BASE_SECONDS', '30'))
+    CV_JOB_RETRY_MAX_SECONDS = int(os.getenv('CV_JOB_RETRY_MAX_SECONDS', '900'))
+
+    # CV text extraction: concurrent per-document processes (0 = parse in-process), per-document limits
+    TEXT_EXTRACTION_PROCESSES = int(os.getenv('TEXT_EXTRACTION_PROCESSES', '2'))
+    TEXT_EXTRACTION_TIMEOUT_SECONDS = int(os.getenv('TEXT_EXTRACTION_TIMEOUT_SECONDS', '30'))
+    TEXT_EXTRACTION_MAX_PAGES = int(os.getenv('TEXT_EXTRACTION_MAX_PAGES', '50'))
+    TEXT_EXTRACTION_MAX_CHARS = int(os.getenv('TEXT_EXTRACTION_MAX_CHARS', '200000'))
+
+    # File storage: 'cloudinary' or 'local'. Uploads are staged under STORAGE_LOCAL_DIR
+    # first (write-ahead) and pushed to Cloudinary in the background.
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'cloudinary')
+    STORAGE_LOCAL_DIR = os.getenv('STORAGE_LOCAL_DIR', os.path.join(os.getcwd(), 'storage'))
+    STORAGE_UPLOAD_THREADS = int(os.getenv('STORAGE_UPLOAD_THREADS', '2'))
+    # Files above this size use Cloudinary's chunked upload (chunks of the same size)
+    STORAGE_CHUNK_SIZE = int(os.getenv('STORAGE_CHUNK_SIZE', str(20 * 1024 * 1024)))
+    # Base URL used for file links outside a request; required by the cv-worker and CLI
+    PUBLIC_API_URL = os.getenv('PUBLIC_API_URL', '')
+    # Set when STORAGE_LOCAL_DIR is shared by web and worker processes (local backend only)
+    STORAGE_LOCAL_SHARED = os.getenv('STORAGE_LOCAL_SHARED', 'False').lower() == 'true'
+
+    # Socket.IO: queue fanning emits out to every worker, node and background process.
+    # 'auto' (REDIS_URL when reachable), 'none' (this process only) or a queue URL
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE', 'auto')
+    SOCKETIO_CHANNEL = os.getenv('SOCKETIO_CHANNEL', 'flask-socketio')
+    # 'threading' (gunicorn gthread workers) or 'gevent' (gunicorn -k gevent, needs gevent installed)
+    SOCKETIO_ASYNC_MODE = os.getenv('SOCKETIO_ASYNC_MODE', 'threading')
+    # Set to 'websocket' to run several workers without sticky sessions
+    SOCKETIO_TRANSPORTS = os.getenv('SOCKETIO_TRANSPORTS', 'websocket,polling')
+
+    # Chat presence: 'auto' (Redis when reachable), 'redis' or 'memory' (single worker).
+    # Sockets expire unless refreshed within the TTL; changes are broadcast in batches
+    PRESENCE_BACKEND = os.getenv('PRESENCE_BACKEND', 'auto')
+    PRESENCE_TTL_SECONDS = int(os.getenv('PRESENCE_TTL_SECONDS', '90'))
+    PRESENCE_FLUSH_MS = int(os.getenv('PRESENCE_FLUSH_MS', '500'))
+
 
 
 class DevelopmentConfig(Config):
@@ -104,6 +163,8 @@ class TestingConfig(Config):
     MAIL_SUPPRESS_SEND = True
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=5)
     RATELIMIT_STORAGE_URI = "memory://"
+    STORAGE_BACKEND = "local"
+    SOCKETIO_MESSAGE_QUEUE = "none"
 
     # Dummy SSO config for tests
     SSO_CLIENT_ID = "test-client-id"
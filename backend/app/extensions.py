@@ -49,7 +49,8 @@ cloudinary_client = CloudinaryClient()
 # ------------------- MongoDB Client -------------------
 # Use env var for production, fallback to local for dev
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
-mongo_client = MongoClient(MONGO_URI)
+# Short server selection timeout: Mongo only backs caches, so fail fast when it is down
+mongo_client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=int(os.getenv("MONGO_TIMEOUT_MS", "2000")))
 mongo_db = mongo_client.get_database(os.getenv("MONGO_DB_NAME", "recruitment_cv"))
 
 
@@ -1,10 +1,28 @@
 from app.extensions import db
 from datetime import datetime
 from sqlalchemy.dialects.postgresql import JSON
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.ext.mutable import MutableDict, MutableList
+from sqlalchemy.orm import deferred
+from sqlalchemy import DDL, event, text
 import enum
 
+# Trigram indexes below need pg_trgm (also created by the search migration)
+event.listen(db.metadata, 'before_create', DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
+def tsvector_column(*weighted_columns):
+    """
+    Generated tsvector column over (column, weight) pairs. Postgres keeps it
+    current on every write; deferred so ordinary loads never fetch it.
+    """
+    expression = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+    return deferred(db.Column(TSVECTOR, db.Computed(expression, persisted=True)))
+
+
 # ------------------- USER -------------------
 class User(db.Model):
     __tablename__ = 'users'
@@ -194,9 +212,16 @@ class Requisition(db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     deleted_at = db.Column(db.DateTime, nullable=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    search_vector = tsvector_column(('title', 'A'), ('category', 'B'), ('description', 'C'))
 
     applications = db.relationship('Application', back_populates='requisition', lazy=True)
 
+    __table_args__ = (
+        db.Index('idx_requisitions_search', 'search_vector', postgresql_using='gin'),
+        db.Index('idx_requisitions_title_trgm', 'title', postgresql_using='gin',
+                 postgresql_ops={'title': 'gin_trgm_ops'}),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -223,18 +248,13 @@ class Requisition(db.Model):
     
     def to_dict_with_stats(self):
         """Return job data with application statistics"""
-        from . import Application
+        from app.services.job_stats_service import JobStatsService
         
         base_dict = self.to_dict()
         
-        # Get application statistics
-        applications = Application.query.filter_by(requisition_id=self.id).all()
-        total_applications = len(applications)
-        
-        # Status breakdown
-        status_counts = {}
-        for app in applications:
-            status_counts[app.status] = status_counts.get(app.status, 0) + 1
+        # Status breakdown (single grouped query)
+        status_counts = JobStatsService.status_breakdown([self.id])[self.id]
+        total_applications = sum(status_counts.values())
         
         base_dict.update({
             "statistics": {
@@ -268,6 +288,8 @@ class Candidate(db.Model):
     github = db.Column(db.String(250), nullable=True)          # ✅ added
     cv_url = db.Column(db.String(500))
     cv_text = db.Column(db.Text)
+    # SHA-256 of the CV file (extraction store key); unique so bulk imports can upsert on it
+    cv_hash = db.Column(db.String(64), unique=True)
     portfolio = db.Column(db.String(500))
     cover_letter = db.Column(db.Text)
     profile_picture = db.Column(db.String(1024), nullable=True)
@@ -286,6 +308,15 @@ class Candidate(db.Model):
     dark_mode = db.Column(db.Boolean, default=False)
     notifications_email = db.Column(db.Boolean, default=True)
     notifications_push = db.Column(db.Boolean, default=False)
+    search_vector = tsvector_column(('full_name', 'A'), ('title', 'B'), ('phone', 'C'), ('location', 'C'))
+
+    __table_args__ = (
+        db.Index('idx_candidates_search', 'search_vector', postgresql_using='gin'),
+        db.Index('idx_candidates_full_name_trgm', 'full_name', postgresql_using='gin',
+                 postgresql_ops={'full_name': 'gin_trgm_ops'}),
+        db.Index('idx_candidates_phone_trgm', 'phone', postgresql_using='gin',
+                 postgresql_ops={'phone': 'gin_trgm_ops'}),
+    )
 
     # 🔗 Relationships
     user = db.relationship('User', back_populates='candidates')
@@ -313,6 +344,7 @@ class Candidate(db.Model):
             "github": self.github,
             "cv_url": self.cv_url,
             "cv_text": self.cv_text,
+            "cv_hash": self.cv_hash,
             "portfolio": self.portfolio,
             "cover_letter": self.cover_letter,
             "profile_picture": self.profile_picture,
@@ -346,7 +378,8 @@ class Application(db.Model):
     overall_score = db.Column(db.Float, default=0)
     recommendation = db.Column(db.String(50))
     assessed_date = db.Column(db.DateTime)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     last_saved_screen = db.Column(db.String(50))
     saved_at = db.Column(db.DateTime)
     last_interview_date = db.Column(db.DateTime, nullable=True)
@@ -374,6 +407,7 @@ class Application(db.Model):
             "recommendation": self.recommendation,
             "assessed_date": self.assessed_date.isoformat() if self.assessed_date else None,
             "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "assessment_results": [ar.to_dict() for ar in self.assessment_results],
             "last_saved_screen": self.last_saved_screen,
             "saved_at": self.saved_at.isoformat() if self.saved_at else None,
@@ -387,7 +421,7 @@ class Application(db.Model):
 class AssessmentResult(db.Model):
     __tablename__ = 'assessment_results'
     id = db.Column(db.Integer, primary_key=True)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
     answers = db.Column(JSON, default={})
     scores = db.Column(JSON, default={})
@@ -395,7 +429,8 @@ class AssessmentResult(db.Model):
     percentage_score = db.Column(db.Float, default=0)
     recommendation = db.Column(db.String(50))
     assessed_at = db.Column(db.DateTime, default=datetime.utcnow)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow) 
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     application = db.relationship('Application', back_populates='assessment_results')
     candidate = db.relationship('Candidate', back_populates='assessments')
@@ -420,13 +455,13 @@ class Interview(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
     hiring_manager_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=True)
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=True, index=True)
     scheduled_time = db.Column(db.DateTime, nullable=False)
     interview_type = db.Column(db.String(50), nullable=True)
     meeting_link = db.Column(db.String(255), nullable=True)
     status = db.Column(db.String(50), default='scheduled')  # Add this line if not present
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Add this
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Add this
     
     # Google Calendar Integration Fields
     google_calendar_event_id = db.Column(db.String(255), nullable=True, index=True)
@@ -532,12 +567,26 @@ class CVAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id'), nullable=False)
     job_description = db.Column(db.Text)
-    cv_text = db.Column(db.Text)
+    # SHA-256 of the CV; the text itself lives in the extraction store (Mongo)
+    cv_hash = db.Column(db.String(64), index=True)
+    cv_text = db.Column(db.Text)  # legacy rows, or when the store was unavailable
     result = db.Column(JSON, default={})
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     candidate = db.relationship('Candidate', back_populates='analyses')
 
+    def to_dict(self):
+        from app.services.extraction_store import ExtractionStore
+        return {
+            "id": self.id,
+            "candidate_id": self.candidate_id,
+            "job_description": self.job_description,
+            "cv_hash": self.cv_hash,
+            "cv_text": self.cv_text or ExtractionStore.get_text(self.cv_hash),
+            "result": self.result,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
 
 # ------------------- NOTIFICATION -------------------
 class Notification(db.Model):
@@ -628,6 +677,13 @@ class AuditLog(db.Model):
     user_agent = db.Column(db.String(500), nullable=True)
     extra_data = db.Column(JSON, nullable=True)  # <- renamed from metadata
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    search_vector = tsvector_column(('action', 'A'), ('details', 'B'))
+
+    __table_args__ = (
+        db.Index('idx_audit_logs_search', 'search_vector', postgresql_using='gin'),
+        db.Index('idx_audit_logs_details_trgm', 'details', postgresql_using='gin',
+                 postgresql_ops={'details': 'gin_trgm_ops'}),
+    )
 
     def to_dict(self):
         return {
@@ -691,9 +747,18 @@ class Meeting(db.Model):
     cancelled = db.Column(db.Boolean, default=False)
     cancelled_at = db.Column(db.DateTime, nullable=True)
     cancelled_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    search_vector = tsvector_column(('title', 'A'), ('description', 'B'))
 
     organizer = db.relationship("User", backref=db.backref("organized_meetings", lazy=True), foreign_keys=[organizer_id])
 
+    __table_args__ = (
+        db.Index('idx_meetings_search', 'search_vector', postgresql_using='gin'),
+        db.Index('idx_meetings_title_trgm', 'title', postgresql_using='gin',
+                 postgresql_ops={'title': 'gin_trgm_ops'}),
+        db.Index('idx_meetings_description_trgm', 'description', postgresql_using='gin',
+                 postgresql_ops={'description': 'gin_trgm_ops'}),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -729,9 +794,9 @@ chat_participants = db.Table(
     db.Column('is_admin', db.Boolean, default=False),
     db.Column('muted_until', db.DateTime, nullable=True),
 
-    # Indexes
-    db.Index('idx_chat_user', 'user_id'),
-    db.Index('idx_chat_thread', 'chat_thread_id')
+    # Indexes: the (user_id, chat_thread_id) key serves lookups by user;
+    # member lists and membership checks go by thread
+    db.Index('idx_chat_thread_user', 'chat_thread_id', 'user_id')
 )
 
 
@@ -804,6 +869,15 @@ class ChatMessage(db.Model):
     parent_message_id = db.Column(db.Integer, db.ForeignKey('chat_messages.id'), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # Unread counts scan a thread's messages past the reader's watermark
+        db.Index('ix_chat_messages_thread_id_id', 'thread_id', 'id'),
+        # History pages and the inbox's last message are one range scan of
+        # a thread's live messages in (created_at, id) order
+        db.Index('ix_chat_messages_thread_id_created_at_id', 'thread_id', 'created_at', 'id',
+                 postgresql_where=text('is_deleted = false')),
+    )
     
     # Self-referential for replies
     parent = db.relationship('ChatMessage', remote_side=[id], backref='replies')
@@ -838,27 +912,25 @@ class ChatMessage(db.Model):
 
 
 
-class MessageReadStatus(db.Model):
-    __tablename__ = 'message_read_status'
-    
-    id = db.Column(db.Integer, primary_key=True)
-    message_id = db.Column(db.Integer, db.ForeignKey('chat_messages.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    read_at = db.Column(db.DateTime, default=datetime.utcnow)
-    
-    # Composite unique constraint
-    __table_args__ = (
-        db.UniqueConstraint('message_id', 'user_id', name='uq_message_user'),
-    )
-    
+class ChatReadCursor(db.Model):
+    """Read watermark of one user in one thread: messages up to last_read_message_id are read"""
+    __tablename__ = 'chat_read_cursors'
+
+    thread_id = db.Column(db.Integer, db.ForeignKey('chat_threads.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    last_read_message_id = db.Column(db.Integer, nullable=False)
+    last_read_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
     def to_dict(self):
         return {
-            'message_id': self.message_id,
+            'thread_id': self.thread_id,
             'user_id': self.user_id,
-            'read_at': self.read_at.isoformat() if self.read_at else None
+            'last_read_message_id': self.last_read_message_id,
+            'last_read_at': self.last_read_at.isoformat() if self.last_read_at else None
         }
 
 
+# Legacy: live presence is kept in Redis by PresenceService; no longer written
 class UserPresence(db.Model):
     __tablename__ = 'user_presence'
     
@@ -952,7 +1024,8 @@ class Offer(db.Model):
         db.DateTime,
         default=datetime.utcnow,
         onupdate=datetime.utcnow,
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     # Relationships
@@ -1127,4 +1200,191 @@ class InterviewReminder(db.Model):
             "error_message": self.error_message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+# =====================================================
+# 📊 DASHBOARD SNAPSHOT
+# =====================================================
+
+class DashboardSnapshot(db.Model):
+    """
+    Pre-aggregated dashboard counters.
+
+    One row per (metric, bucket). ``bucket`` is '' for all-time totals or an
+    ISO date (YYYY-MM-DD) for per-day counters used by rolling windows.
+    Writes append to ``dashboard_snapshot_deltas``; DashboardSnapshotService
+    folds those in here in the background and reconciles with a full rebuild.
+    """
+    __tablename__ = 'dashboard_snapshot'
+
+    metric = db.Column(db.String(100), primary_key=True)
+    bucket = db.Column(db.String(10), primary_key=True, default='')
+    value = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "metric": self.metric,
+            "bucket": self.bucket,
+            "value": self.value,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+
+class DashboardSnapshotDelta(db.Model):
+    """
+    Counter changes appended by each writing transaction (no shared rows, so
+    concurrent writers never wait on each other). Reads add them to
+    ``dashboard_snapshot`` until compaction folds them in.
+    """
+    __tablename__ = 'dashboard_snapshot_deltas'
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    metric = db.Column(db.String(100), nullable=False)
+    bucket = db.Column(db.String(10), nullable=False, default='')
+    value = db.Column(db.Float, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class DeletedRecord(db.Model):
+    """Tombstone for a deleted row, consumed by the Power BI change feed"""
+    __tablename__ = 'deleted_records'
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(50), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            "entity": self.entity_type,
+            "id": self.entity_id,
+            "deleted_at": self.deleted_at.isoformat() if self.deleted_at else None
+        }
+
+
+# =====================================================
+# 📈 ANALYTICS ROLLUPS
+# =====================================================
+
+class AnalyticsDailyRollup(db.Model):
+    """
+    Per-day x requisition x status counts backing the /api/analytics endpoints.
+
+    ``fact`` is 'applications', 'assessments' or 'interviews'. ``requisition_id``
+    is 0 for rows without a requisition and ``status`` is '' when unknown;
+    assessments use 'passed' / 'failed'. ``score_sum`` / ``score_count`` carry
+    assessment percentage scores so averages can be served from the rollup.
+    """
+    __tablename__ = 'analytics_daily_rollups'
+
+    fact = db.Column(db.String(20), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    requisition_id = db.Column(db.Integer, primary_key=True, default=0)
+    status = db.Column(db.String(50), primary_key=True, default='')
+    count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Float, nullable=False, default=0)
+    score_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_rollup_fact_requisition', 'fact', 'requisition_id'),
+    )
+
+
+class AnalyticsRollupState(db.Model):
+    """Catch-up watermark per rollup fact"""
+    __tablename__ = 'analytics_rollup_state'
+
+    fact = db.Column(db.String(20), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# =====================================================
+# 🧠 NORMALIZED CANDIDATE SKILLS
+# =====================================================
+
+class CandidateSkill(db.Model):
+    """One canonical (case-folded) skill of a candidate, mirrored from Candidate.skills"""
+    __tablename__ = 'candidate_skills'
+
+    candidate_id = db.Column(db.Integer, db.ForeignKey('candidates.id', ondelete='CASCADE'), primary_key=True)
+    skill = db.Column(db.String(100), primary_key=True)
+
+    __table_args__ = (
+        db.Index('idx_candidate_skills_skill', 'skill', 'candidate_id'),
+    )
+
+
+class SkillFrequency(db.Model):
+    """Number of candidates listing each canonical skill"""
+    __tablename__ = 'skill_frequencies'
+
+    skill = db.Column(db.String(100), primary_key=True)
+    candidate_count = db.Column(db.Integer, nullable=False, default=0, index=True)
+
+
+# =====================================================
+# 🧠 BACKGROUND CV ANALYSIS JOBS
+# =====================================================
+
+class CVAnalysisJob(db.Model):
+    """Durable record of a queued resume upload + analysis (see CVJobQueue)"""
+    __tablename__ = 'cv_analysis_jobs'
+
+    id = db.Column(db.String(36), primary_key=True)  # uuid4 hex, also the queue message
+    application_id = db.Column(db.Integer, db.ForeignKey('applications.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, completed, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    not_before = db.Column(db.DateTime)  # retry backoff: not claimed before this time
+    filename = db.Column(db.String(255))
+    file_hash = db.Column(db.String(64))  # SHA-256 of file_data, key into the extraction store
+    # Uploaded file and submitted text, cleared once the job finishes
+    file_data = db.Column(db.LargeBinary)
+    resume_text = db.Column(db.Text)
+    result = db.Column(JSON)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        # At most one queued/running job per application, so concurrent
+        # uploads cannot both be accepted
+        db.Index('uq_cv_analysis_jobs_active_application', 'application_id', unique=True,
+                 postgresql_where=text("status IN ('queued', 'running')")),
+    )
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "application_id": self.application_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+# ------------------- STORED FILES -------------------
+class StoredFile(db.Model):
+    """An uploaded file, content-addressed by SHA-256 (see StorageService)"""
+    __tablename__ = 'stored_files'
+
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the bytes
+    folder = db.Column(db.String(100))
+    filename = db.Column(db.String(255))
+    content_type = db.Column(db.String(100))
+    resource_type = db.Column(db.String(20), nullable=False, default='raw')  # raw, image
+    size = db.Column(db.BigInteger, nullable=False, default=0)
+    backend = db.Column(db.String(20), nullable=False)  # local, cloudinary
+    status = db.Column(db.String(20), nullable=False, default='staged', index=True)  # staged, uploaded, failed
+    remote_url = db.Column(db.String(1024))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    uploaded_at = db.Column(db.DateTime)
@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, send_file
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.extensions import db
 from app.models import User, Requisition, Candidate, Application, AssessmentResult, Interview, Notification, AuditLog, Conversation, SharedNote, Meeting, CVAnalysis, InterviewFeedback, Offer, OfferStatus
@@ -10,8 +10,18 @@ from app.services.audit2 import AuditService
 from flask_cors import cross_origin
 from sqlalchemy import func, and_, or_
 import bleach
+import tempfile
 from marshmallow import ValidationError
 from app.services.job_service import JobService
+from app.services.job_stats_service import JobStatsService
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+from app.services.powerbi_export_service import PowerBIExportService
+from app.services.change_feed_service import ChangeFeedService
+from app.services.columnar_export_service import ColumnarExportService, FORMATS as COLUMNAR_FORMATS
+from app.utils.exceptions import ServiceException
+from app.services.candidate_skill_service import CandidateSkillService
+from app.services.shortlist_service import ShortlistService
+from app.services.search_service import SearchService
 from app.schemas.job_schemas import (
     job_create_schema, job_update_schema, job_response_schema,
     job_list_schema, job_filter_schema, job_activity_log_schema
@@ -28,48 +38,32 @@ admin_bp = Blueprint("admin_bp", __name__)
 @admin_bp.route('/analytics/dashboard', methods=['GET'])
 @role_required(["admin", "hiring_manager"])
 def get_dashboard_stats():
-    """Get overall dashboard statistics"""
-    
-    # Total counts
-    total_users = User.query.count()
-    total_candidates = Candidate.query.count()
-    total_requisitions = Requisition.query.count()
-    total_applications = Application.query.count()
-    
-    # Application status breakdown
-    application_statuses = db.session.query(
-        Application.status,
-        func.count(Application.id)
-    ).group_by(Application.status).all()
-    
-    status_breakdown = {status: count for status, count in application_statuses}
-    
-    # Recent activity (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    
-    new_users_week = User.query.filter(User.created_at >= week_ago).count()
-    new_applications_week = Application.query.filter(Application.created_at >= week_ago).count()
-    new_requisitions_week = Requisition.query.filter(Requisition.created_at >= week_ago).count()
-    
-    # Average scores
-    avg_cv_score = db.session.query(func.avg(Application.cv_score)).scalar() or 0
-    avg_assessment_score = db.session.query(func.avg(Application.assessment_score)).scalar() or 0
-    
+    """Get overall dashboard statistics (served from the materialized snapshot)"""
+    snapshot = DashboardSnapshotService.load()
+
+    status_breakdown = snapshot.totals_by_suffix('applications.status.')
+
+    avg_cv_score = snapshot.average('applications.cv_score.sum', 'applications.cv_score.count')
+    avg_assessment_score = snapshot.average(
+        'applications.assessment_score.sum', 'applications.assessment_score.count'
+    )
+
     return jsonify({
-        'total_users': total_users,
-        'total_candidates': total_candidates,
-        'total_requisitions': total_requisitions,
-        'total_applications': total_applications,
+        'total_users': snapshot.total('users.total'),
+        'total_candidates': snapshot.total('candidates.total'),
+        'total_requisitions': snapshot.total('requisitions.total'),
+        'total_applications': snapshot.total('applications.total'),
         'application_status_breakdown': status_breakdown,
         'recent_activity': {
-            'new_users': new_users_week,
-            'new_applications': new_applications_week,
-            'new_requisitions': new_requisitions_week
+            'new_users': snapshot.window('users.created', days=7),
+            'new_applications': snapshot.window('applications.created', days=7),
+            'new_requisitions': snapshot.window('requisitions.created', days=7)
         },
         'average_scores': {
             'cv_score': round(float(avg_cv_score), 2),
             'assessment_score': round(float(avg_assessment_score), 2)
-        }
+        },
+        'snapshot': snapshot.meta()
     })
 
 @admin_bp.route('/analytics/users-growth', methods=['GET'])
@@ -659,37 +653,14 @@ def get_application(application_id):
 @admin_bp.route("/jobs/<int:job_id>/shortlist", methods=["GET"])
 @role_required(["admin", "hiring_manager", "hr"])
 def shortlist_candidates(job_id):
-    job = Requisition.query.get_or_404(job_id)
-    applications = Application.query.filter_by(requisition_id=job.id).all()
-    shortlisted = []
-
-    for app in applications:
-        profile = app.candidate.profile or {}
-        cv_score = profile.get("cv_score", 0)
-        assessment_score = app.assessment_score or 0
-
-        try:
-            overall = (
-                (cv_score * job.weightings.get("cv", 60) / 100) +
-                (assessment_score * job.weightings.get("assessment", 40) / 100)
-            )
-        except Exception:
-            overall = 0
-
-        app.overall_score = overall
-        shortlisted.append({
-            "application_id": app.id,
-            "candidate_id": app.candidate_id,
-            "full_name": app.candidate.full_name,
-            "cv_score": cv_score,
-            "assessment_score": assessment_score,
-            "overall_score": overall,
-            "status": app.status
-        })
-
-    db.session.commit()
-    shortlisted_sorted = sorted(shortlisted, key=lambda x: x["overall_score"], reverse=True)
-    return jsonify(shortlisted_sorted)
+    Requisition.query.get_or_404(job_id)
+    top_k = request.args.get("limit", type=int)
+    try:
+        result = ShortlistService.rank(job_id, top_k=top_k)
+        return jsonify(result["ranked"])
+    except Exception as e:
+        current_app.logger.error(f"Shortlist error for job {job_id}: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
 
 
 # ----------------- NOTIFICATIONS -----------------
@@ -843,7 +814,7 @@ def list_audits():
             query = query.filter(AuditLog.action.ilike(f"%{action}%"))
 
         if search:
-            query = query.filter(AuditLog.details.ilike(f"%{search}%"))
+            query = SearchService.filter(query, AuditLog, search)
 
         if start_date:
             try:
@@ -882,12 +853,14 @@ def list_audits():
 @role_required(["admin", "hiring_manager"])
 def dashboard_counts():
     try:
+        snapshot = DashboardSnapshotService.load()
         counts = {
-            "jobs": Requisition.query.count(),
-            "candidates": Candidate.query.count(),
-            "cv_reviews": Application.query.count(),
-            "audits": AuditLog.query.count(),
-            "interviews": Interview.query.count()
+            "jobs": snapshot.total("requisitions.total"),
+            "candidates": snapshot.total("candidates.total"),
+            "cv_reviews": snapshot.total("applications.total"),
+            "audits": snapshot.total("audits.total"),
+            "interviews": snapshot.total("interviews.total"),
+            "snapshot": snapshot.meta()
         }
         return jsonify(counts), 200
     except Exception as e:
@@ -2432,76 +2405,131 @@ def recent_activities():
 @role_required(["admin"])
 def powerbi_data():
     """
-    Flattened data for Power BI with optional filters:
+    Flattened data for Power BI, streamed in keyset batches.
+
+    Filters:
     - job_id
     - candidate_id
     - status
     - start_date, end_date (ISO format)
+
+    Paging / output:
+    - format: json (default, JSON array), ndjson or csv
+    - limit: max rows in this response; omit to stream every matching row
+    - cursor: value of the previous response's X-Next-Cursor header
     """
     try:
         # --- Get filters from query params ---
-        job_id = request.args.get("job_id", type=int)
-        candidate_id = request.args.get("candidate_id", type=int)
-        status = request.args.get("status", type=str)
-        start_date_str = request.args.get("start_date")
-        end_date_str = request.args.get("end_date")
+        filters = {
+            "job_id": request.args.get("job_id", type=int),
+            "candidate_id": request.args.get("candidate_id", type=int),
+            "status": request.args.get("status", type=str),
+        }
 
-        # --- Build base query ---
-        query = Application.query
+        for key in ("start_date", "end_date"):
+            value = request.args.get(key)
+            if value:
+                try:
+                    filters[key] = datetime.fromisoformat(value)
+                except ValueError:
+                    return jsonify({"error": f"Invalid {key} format. Use YYYY-MM-DD or ISO format"}), 400
+
+        fmt = request.args.get("format", "json").lower()
+        if fmt not in PowerBIExportService.FORMATS:
+            return jsonify({"error": f"Invalid format. Use one of: {', '.join(PowerBIExportService.FORMATS)}"}), 400
+
+        cursor = request.args.get("cursor", type=int)
+        limit = request.args.get("limit", type=int)
+        if limit is not None:
+            limit = max(1, min(limit, PowerBIExportService.MAX_LIMIT))
+
+        # upper is None when fewer than `limit` rows remain: stream them all
+        upper, next_cursor = PowerBIExportService.page_bounds(filters, cursor, limit)
+
+        rows = PowerBIExportService.iter_rows(filters, cursor=cursor, upper=upper)
+        response = Response(
+            stream_with_context(PowerBIExportService.serialize(rows, fmt)),
+            mimetype=PowerBIExportService.CONTENT_TYPES[fmt]
+        )
+        if next_cursor is not None:
+            response.headers["X-Next-Cursor"] = str(next_cursor)
+        if fmt == "csv":
+            response.headers["Content-Disposition"] = "attachment; filename=powerbi_applications.csv"
+        return response
 
-        if job_id:
-            query = query.filter_by(requisition_id=job_id)
-        if candidate_id:
-            query = query.filter_by(candidate_id=candidate_id)
-        if status:
-            query = query.filter_by(status=status)
+    except Exception as e:
+        current_app.logger.error(f"Power BI filtered data error: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
 
-        if start_date_str:
-            try:
-                start_date = datetime.fromisoformat(start_date_str)
-                query = query.filter(Application.created_at >= start_date)
-            except ValueError:
-                return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD or ISO format"}), 400
 
-        if end_date_str:
-            try:
-                end_date = datetime.fromisoformat(end_date_str)
-                query = query.filter(Application.created_at <= end_date)
-            except ValueError:
-                return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD or ISO format"}), 400
+@admin_bp.route("/powerbi/export/<string:table>", methods=["GET"])
+@role_required(["admin"])
+def powerbi_columnar_export(table):
+    """
+    Download an export table as compressed Parquet (default) or Arrow IPC.
 
-        applications = query.all()
-        data = []
+    Tables: applications (flattened fact), candidates, requisitions, interviews
+    Query params:
+    - format: parquet or arrow
+    """
+    try:
+        fmt = request.args.get("format", "parquet").lower()
 
-        for app in applications:
-            candidate = app.candidate
-            user = candidate.user if candidate else None
-            job = app.requisition
-            assessment = AssessmentResult.query.filter_by(application_id=app.id).first()
-            interviews = Interview.query.filter_by(application_id=app.id).all()
+        # Spill to disk past 32MB so large exports don't sit in memory
+        spool = tempfile.SpooledTemporaryFile(max_size=32 * 1024 * 1024)
+        try:
+            ColumnarExportService.write_table(table, spool, fmt)
+        except Exception:
+            spool.close()
+            raise
+        spool.seek(0)
+
+        extension, mimetype = COLUMNAR_FORMATS[fmt]
+        return send_file(
+            spool,
+            mimetype=mimetype,
+            as_attachment=True,
+            download_name=f"{table}{extension}"
+        )
 
-            data.append({
-                "application_id": app.id,
-                "application_status": app.status,
-                "cv_score": app.cv_score,
-                "assessment_score": app.assessment_score,
-                "overall_score": app.overall_score,
-                "recommendation": assessment.recommendation if assessment else None,
-                "candidate_id": candidate.id if candidate else None,
-                "candidate_name": candidate.full_name if candidate else None,
-                "candidate_email": user.email if user else None,
-                "candidate_verified": user.is_verified if user else None,
-                "job_id": job.id if job else None,
-                "job_title": job.title if job else None,
-                "job_category": job.category if job else None,
-                "interview_count": len(interviews),
-                "interview_dates": [i.scheduled_time.isoformat() for i in interviews]
-            })
+    except ServiceException as e:
+        return jsonify({"error": str(e)}), e.code
+    except Exception as e:
+        current_app.logger.error(f"Power BI columnar export error: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+@admin_bp.route("/powerbi/changes", methods=["GET"])
+@role_required(["admin"])
+def powerbi_changes():
+    """
+    Delta feed for incremental Power BI refreshes.
+
+    Query params:
+    - since: watermark returned by the previous call (ISO format); omit for a full pull
+    - limit: soft cap on rows per entity
+
+    Returns applications, assessments, interviews and offers created or
+    modified after `since`, tombstones for rows deleted after it, and the
+    watermark to send next time. Keep pulling while `has_more` is true.
+    """
+    try:
+        since = None
+        since_str = request.args.get("since")
+        if since_str:
+            try:
+                since = datetime.fromisoformat(since_str)
+            except ValueError:
+                return jsonify({"error": "Invalid since format. Use YYYY-MM-DD or ISO format"}), 400
 
-        return jsonify(data), 200
+        limit = request.args.get("limit", type=int)
+        if limit is not None and limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+
+        return jsonify(ChangeFeedService.get_changes(since, limit)), 200
 
     except Exception as e:
-        current_app.logger.error(f"Power BI filtered data error: {e}", exc_info=True)
+        current_app.logger.error(f"Power BI change feed error: {e}", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 
@@ -2864,12 +2892,7 @@ def get_meetings():
         
         # Apply filters
         if search:
-            query = query.filter(
-                or_(
-                    Meeting.title.ilike(f'%{search}%'),
-                    Meeting.description.ilike(f'%{search}%')
-                )
-            )
+            query = SearchService.filter(query, Meeting, search)
         
         now = datetime.now()
         if status == 'upcoming':
@@ -3447,46 +3470,29 @@ def get_pipeline_stats():
     Get statistics for the recruitment pipeline header
     """
     try:
-        # Active jobs (where requisition has status 'active' - you might need to add this field)
-        # For now, assuming all requisitions are active
-        active_jobs = Requisition.query.count()
-        
-        # Total applications
-        total_applications = Application.query.count()
-        
-        # Offers sent (status = 'sent' in Offer model)
-        offers_sent = Offer.query.filter_by(status=OfferStatus.SENT).count()
-        
-        # Today's interviews
-        today = datetime.utcnow().date()
-        today_interviews = Interview.query.filter(
-            db.func.date(Interview.scheduled_time) == today,
-            Interview.status == 'scheduled'
-        ).count()
-        
+        snapshot = DashboardSnapshotService.load()
+
         # Applications by pipeline stage (using Application.status)
         stages = ['screening', 'assessment', 'interview', 'offer', 'hired', 'rejected']
-        apps_by_stage = {}
-        
-        for stage in stages:
-            count = Application.query.filter_by(status=stage).count()
-            apps_by_stage[stage] = count
-        
-        # Add pending interviews count
-        pending_interviews = Interview.query.filter(
-            Interview.status == 'scheduled'
-        ).count()
-        
+        apps_by_stage = {
+            stage: snapshot.total(f"applications.status.{stage}")
+            for stage in stages
+        }
+
+        # For now, assuming all requisitions are active
+        total_requisitions = snapshot.total("requisitions.total")
+
         return jsonify({
-            "active_jobs": active_jobs,
-            "total_candidates": total_applications,
-            "offers_sent": offers_sent,
-            "today_interviews": today_interviews,
-            "pending_interviews": pending_interviews,
+            "active_jobs": total_requisitions,
+            "total_candidates": snapshot.total("applications.total"),
+            "offers_sent": snapshot.total(f"offers.status.{OfferStatus.SENT.value}"),
+            "today_interviews": snapshot.window("interviews.scheduled_on", days=1),
+            "pending_interviews": snapshot.total("interviews.status.scheduled"),
             "applications_by_stage": apps_by_stage,
-            "total_requisitions": Requisition.query.count(),
-            "total_interviews": Interview.query.count(),
-            "total_offers": Offer.query.count()
+            "total_requisitions": total_requisitions,
+            "total_interviews": snapshot.total("interviews.total"),
+            "total_offers": snapshot.total("offers.total"),
+            "snapshot": snapshot.meta()
         }), 200
         
     except Exception as e:
@@ -3508,6 +3514,7 @@ def get_filtered_applications():
         sort_order = request.args.get("sort_order", "desc")
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
+        skills = [s for s in request.args.get("skills", "").split(",") if s.strip()]
         
         # Base query
         query = Application.query.join(Candidate).join(Requisition)
@@ -3519,14 +3526,16 @@ def get_filtered_applications():
         if job_id:
             query = query.filter(Application.requisition_id == job_id)
         
+        # Candidates must list every requested skill (index lookups on candidate_skills)
+        if skills:
+            query = query.filter(CandidateSkillService.has_skills_filter(skills))
+        
+        search = search.strip()
         if search:
-            search_pattern = f"%{search}%"
-            query = query.filter(
-                db.or_(
-                    Candidate.full_name.ilike(search_pattern),
-                    Requisition.title.ilike(search_pattern)
-                )
-            )
+            query = query.filter(db.or_(
+                SearchService.condition(Candidate, search),
+                SearchService.condition(Requisition, search)
+            ))
         
         # Apply sorting
         if sort_by == "name":
@@ -3616,44 +3625,30 @@ def get_filtered_applications():
 def get_jobs_with_stats():
     """
     Get all jobs with their statistics
+
+    Optional query params:
+    - page, per_page: paginate the job list (all jobs are returned when page is omitted)
+    - category: only jobs in this category
+    - status: active, inactive or all (default)
     """
     try:
-        jobs = Requisition.query.all()
+        page = request.args.get("page", type=int)
+        per_page = min(request.args.get("per_page", 20, type=int), 100)
+        category = request.args.get("category")
+        status = request.args.get("status", "all")
+
+        if status not in ("active", "inactive", "all"):
+            return jsonify({"error": "Invalid status. Must be one of: active, inactive, all"}), 400
+
+        rows, pagination = JobStatsService.list_jobs_with_stats(
+            category=category,
+            status=status,
+            page=page,
+            per_page=per_page
+        )
+
         result = []
-        
-        for job in jobs:
-            # Count applications for this job
-            total_apps = Application.query.filter_by(requisition_id=job.id).count()
-            
-            # Count by status
-            status_counts = {}
-            statuses = ['screening', 'assessment', 'interview', 'offer', 'hired', 'rejected']
-            
-            for status in statuses:
-                count = Application.query.filter_by(
-                    requisition_id=job.id,
-                    status=status
-                ).count()
-                status_counts[status] = count
-            
-            # Count hired candidates
-            hired_count = Application.query.filter_by(
-                requisition_id=job.id,
-                status='hired'
-            ).count()
-            
-            # Calculate progress percentage
-            progress = 0
-            if job.vacancy and job.vacancy > 0:
-                progress = min(100, (hired_count / job.vacancy) * 100)
-            
-            # Get recent applications (last 7 days)
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_apps = Application.query.filter(
-                Application.requisition_id == job.id,
-                Application.created_at >= week_ago
-            ).count()
-            
+        for job, stats in rows:
             result.append({
                 "id": job.id,
                 "title": job.title,
@@ -3662,18 +3657,29 @@ def get_jobs_with_stats():
                 "vacancy": job.vacancy or 0,
                 "created_at": job.created_at.isoformat() if job.created_at else None,
                 "published_on": job.published_on.isoformat() if job.published_on else None,
-                "applications_count": total_apps,
-                "recent_applications": recent_apps,
+                "applications_count": stats["applications_count"],
+                "recent_applications": stats["recent_applications"],
                 "status": "active",  # You might want to add a status field to Requisition
-                "progress": round(progress, 1),
-                "hired_count": hired_count,
-                "status_breakdown": status_counts,
+                "progress": stats["progress"],
+                "hired_count": stats["hired_count"],
+                "status_breakdown": stats["status_breakdown"],
                 "required_skills": job.required_skills or [],
                 "min_experience": job.min_experience or 0,
                 "created_by": job.created_by
             })
-        
-        return jsonify({"jobs": result}), 200
+
+        response = {"jobs": result}
+        if pagination is not None:
+            response["pagination"] = {
+                "page": pagination.page,
+                "per_page": pagination.per_page,
+                "total_pages": pagination.pages,
+                "total_items": pagination.total,
+                "has_next": pagination.has_next,
+                "has_prev": pagination.has_prev
+            }
+
+        return jsonify(response), 200
         
     except Exception as e:
         current_app.logger.error(f"Jobs with stats error: {e}", exc_info=True)
@@ -3848,76 +3854,49 @@ def get_pipeline_quick_stats():
     """
     try:
         now = datetime.utcnow()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
+        snapshot = DashboardSnapshotService.load()
 
         # Core stats
-        active_jobs = Requisition.query.count()
-        total_applications = Application.query.count()
-        offers_sent = Offer.query.filter_by(status=OfferStatus.SENT).count()
-
-        today_interviews = Interview.query.filter(
-            db.func.date(Interview.scheduled_time) == today,
-            Interview.status == "scheduled"
-        ).count()
+        active_jobs = snapshot.total("requisitions.total")
+        total_applications = snapshot.total("applications.total")
+        offers_sent = snapshot.total(f"offers.status.{OfferStatus.SENT.value}")
+        today_interviews = snapshot.window("interviews.scheduled_on", days=1)
 
         # Time to hire (avg days from application creation to now for hired)
-        time_to_hire_query = db.session.query(
-            db.func.avg(
-                db.func.extract(
-                    "epoch",
-                    db.func.now() - Application.created_at
-                ) / 86400
-            )
-        ).filter(Application.status == "hired").scalar()
-
-        time_to_hire = round(time_to_hire_query or 28, 1)
+        time_to_hire_days = snapshot.days_since_average(
+            "applications.hired.created_epoch.sum",
+            "applications.hired.created_epoch.count"
+        )
+        time_to_hire = round(time_to_hire_days or 28, 1)
 
         # Offer acceptance rate
-        total_offers = Offer.query.filter_by(status=OfferStatus.SENT).count()
-        accepted_offers = Offer.query.filter_by(status=OfferStatus.SIGNED).count()
+        accepted_offers = snapshot.total(f"offers.status.{OfferStatus.SIGNED.value}")
         acceptance_rate = (
-            round((accepted_offers / total_offers) * 100, 1)
-            if total_offers > 0 else 0
+            round((accepted_offers / offers_sent) * 100, 1)
+            if offers_sent > 0 else 0
         )
 
-        # Recent activity
-        recent_applications = Application.query.filter(
-            Application.created_at >= week_ago
-        ).count()
-
-        recent_interviews = Interview.query.filter(
-            Interview.created_at >= week_ago
-        ).count()
-
         # Stage distribution
         stages = ["screening", "assessment", "interview", "offer", "hired"]
         stage_distribution = {
-            stage: Application.query.filter_by(status=stage).count()
+            stage: snapshot.total(f"applications.status.{stage}")
             for stage in stages
         }
 
         # Interview completion rate
-        total_interviews = Interview.query.count()
-        completed_interviews = Interview.query.filter_by(status="completed").count()
+        total_interviews = snapshot.total("interviews.total")
+        completed_interviews = snapshot.total("interviews.status.completed")
         interview_completion_rate = (
             round((completed_interviews / total_interviews) * 100, 1)
             if total_interviews > 0 else 0
         )
 
-        # Hires in last 30 days (using created_at as proxy)
-        hires_last_30_days = Application.query.filter(
-            Application.status == "hired",
-            Application.created_at >= month_ago
-        ).count()
-
         return jsonify({
             "active_jobs": active_jobs,
             "total_candidates": total_applications,
             "offers_sent": offers_sent,
             "today_interviews": today_interviews,
-            "pending_reviews": Application.query.filter_by(status="screening").count(),
+            "pending_reviews": snapshot.total("applications.status.screening"),
 
             "performance_metrics": {
                 "time_to_hire_days": time_to_hire,
@@ -3928,25 +3907,21 @@ def get_pipeline_quick_stats():
             },
 
             "recent_activity": {
-                "applications_last_7_days": recent_applications,
-                "interviews_last_7_days": recent_interviews,
-                "offers_last_7_days": Offer.query.filter(
-                    Offer.created_at >= week_ago
-                ).count(),
-                "hires_last_30_days": hires_last_30_days
+                "applications_last_7_days": snapshot.window("applications.created", days=7),
+                "interviews_last_7_days": snapshot.window("interviews.created", days=7),
+                "offers_last_7_days": snapshot.window("offers.created", days=7),
+                # Hires in last 30 days (using created_at as proxy)
+                "hires_last_30_days": snapshot.window("applications.hired.created", days=30)
             },
 
             "stage_distribution": stage_distribution,
             "total_interviews": total_interviews,
-            "upcoming_interviews": Interview.query.filter(
-                Interview.scheduled_time > now,
-                Interview.status == "scheduled"
-            ).count(),
-            "offers_pending_response": Offer.query.filter_by(
-                status=OfferStatus.SENT
-            ).count(),
+            # Day granularity: includes interviews scheduled earlier today
+            "upcoming_interviews": snapshot.window("interviews.scheduled_on", upcoming=True),
+            "offers_pending_response": offers_sent,
 
-            "updated_at": now.isoformat()
+            "updated_at": now.isoformat(),
+            "snapshot": snapshot.meta()
         }), 200
 
     except Exception as e:
@@ -4057,75 +4032,12 @@ def search_all():
                 "interviews": []
             }), 200
         
-        search_pattern = f"%{query}%"
-        
-        # Search candidates
-        candidates = Candidate.query.filter(
-            db.or_(
-                Candidate.full_name.ilike(search_pattern),
-                Candidate.email.ilike(search_pattern) if hasattr(Candidate, 'email') else False,
-                Candidate.phone.ilike(search_pattern)
-            )
-        ).limit(10).all()
-        
-        # Search jobs
-        jobs = Requisition.query.filter(
-            db.or_(
-                Requisition.title.ilike(search_pattern),
-                Requisition.description.ilike(search_pattern),
-                Requisition.category.ilike(search_pattern)
-            )
-        ).limit(10).all()
-        
-        # Search applications (through candidates and jobs)
-        applications = Application.query.join(Candidate).join(Requisition).filter(
-            db.or_(
-                Candidate.full_name.ilike(search_pattern),
-                Requisition.title.ilike(search_pattern)
-            )
-        ).limit(10).all()
-        
-        # Search interviews
-        interviews = Interview.query.join(Candidate).filter(
-            Candidate.full_name.ilike(search_pattern)
-        ).limit(10).all()
+        results = SearchService.search_all(query, limit=10)
         
         return jsonify({
-            "candidates": [{
-                "id": c.id,
-                "name": c.full_name,
-                "email": c.user.email if c.user else None,
-                "type": "candidate",
-                "score": c.cv_score
-            } for c in candidates],
-            
-            "jobs": [{
-                "id": j.id,
-                "title": j.title,
-                "category": j.category,
-                "type": "job",
-                "applications_count": Application.query.filter_by(requisition_id=j.id).count()
-            } for j in jobs],
-            
-            "applications": [{
-                "id": a.id,
-                "candidate_name": a.candidate.full_name if a.candidate else None,
-                "job_title": a.requisition.title if a.requisition else None,
-                "status": a.status,
-                "type": "application",
-                "score": a.overall_score
-            } for a in applications],
-            
-            "interviews": [{
-                "id": i.id,
-                "candidate_name": i.candidate.full_name if i.candidate else None,
-                "scheduled_time": i.scheduled_time.isoformat() if i.scheduled_time else None,
-                "type": "interview",
-                "status": i.status
-            } for i in interviews],
-            
+            **results,
             "query": query,
-            "total_results": len(candidates) + len(jobs) + len(applications) + len(interviews)
+            "total_results": sum(len(items) for items in results.values())
         }), 200
         
     except Exception as e:
@@ -1,23 +1,57 @@
 # app/routes/ai_routes.py
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
 from app.utils.decorators import role_required
 from app.services.ai_parser_service import analyse_resume_gemini
+from app.services.extraction_store import ExtractionStore
+from app.services.storage_service import StorageService
 from app.extensions import db, cloudinary_client
 from app.models import CVAnalysis, Conversation, Candidate, User
-import cloudinary.uploader
 import datetime
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 ai_bp = Blueprint("ai_bp", __name__, url_prefix="/api/ai")
 
 
+def _chat_user_id():
+    """Identity of the caller when a valid JWT was sent, else None"""
+    try:
+        verify_jwt_in_request(optional=True)
+        return get_jwt_identity()
+    except Exception:
+        return None
+
+
+def _save_conversation(user_id, message, reply):
+    if not user_id:
+        return
+    try:
+        conv = Conversation(user_id=user_id, user_message=message, assistant_message=reply)
+        db.session.add(conv)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to save conversation")
+
+
+def _sse(data, event=None):
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
 @ai_bp.route("/chat", methods=["POST"])
 def chat():
     """
     Public chat endpoint (optionally require auth if desired).
-    body: {"message": "hello"}
+    body: {"message": "hello", "stream": false}
+
+    With "stream": true (or ?stream=1, or Accept: text/event-stream) the reply
+    is sent as server-sent events while it is generated:
+      data: {"delta": "..."}                  one per token chunk
+      event: done   data: {"reply": "..."}    full reply, after persisting
+      event: error  data: {"error": "..."}
     """
     data = request.get_json(silent=True) or {}
     message = (data.get("message") or "").strip()
@@ -27,25 +61,40 @@ def chat():
     # Lazy import to avoid cycle
     from app.services.ai_service import AIService
     ai = AIService()
+    user_id = _chat_user_id()
+
+    wants_stream = (
+        bool(data.get("stream"))
+        or request.args.get("stream") in ("1", "true")
+        or request.accept_mimetypes.best == "text/event-stream"
+    )
+    if wants_stream:
+        def generate():
+            parts = []
+            try:
+                for delta in ai.chat_stream(message):
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+            except Exception as e:
+                logger.exception("Chat stream error")
+                yield _sse({"error": "AI chat failed", "details": str(e)}, event="error")
+                return
+            reply = "".join(parts)
+            # Persist once the stream has completed
+            _save_conversation(user_id, message, reply)
+            yield _sse({"reply": reply}, event="done")
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     try:
         reply = ai.chat(message)
 
         # Optionally persist conversation if authenticated
-        user_id = None
-        try:
-            user_id = get_jwt_identity()
-        except Exception:
-            user_id = None
-
-        if user_id:
-            try:
-                conv = Conversation(user_id=user_id, user_message=message, assistant_message=reply)
-                db.session.add(conv)
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-                logger.exception("Failed to save conversation")
+        _save_conversation(user_id, message, reply)
 
         return jsonify({"reply": reply}), 200
 
@@ -77,34 +126,44 @@ def parse_cv():
     cv_text = request.form.get("cv_text") or (request.json and request.json.get("cv_text"))
     job_description = request.form.get("job_description") or (request.json and request.json.get("job_description"))
 
-    # If a file is uploaded, push to Cloudinary
+    # If a file is uploaded, extract its text (once per distinct file) and store it
     resume_url = None
+    cv_hash = None
+    stored = False
     if "resume" in request.files:
         file = request.files["resume"]
+        if not cv_text:
+            try:
+                extraction = ExtractionStore.extract(file)
+                cv_text, cv_hash, stored = extraction["text"], extraction["cv_hash"], extraction["stored"]
+            except Exception:
+                logger.exception("CV text extraction failed")
         try:
-            upload_result = cloudinary.uploader.upload(file, folder="resumes", resource_type="raw")
-            resume_url = upload_result.get("secure_url")
+            resume_url = StorageService.store(file, folder="resumes")
             candidate.cv_url = resume_url
         except Exception:
-            logger.exception("Cloudinary upload failed")
+            logger.exception("Resume storage failed")
 
     if not job_description:
         return jsonify({"error": "job_description is required"}), 400
 
     if not cv_text:
-        cv_text = candidate.cv_text or ""
+        cv_text = candidate.cv_text or ExtractionStore.get_text(candidate.cv_hash) or ""
         if not cv_text:
             return jsonify({"error": "cv_text is required (or upload text)"}), 400
 
     # Run Gemini CV analysis with safe fallback
     parser_result = analyse_resume_gemini(cv_text=cv_text, job_description=job_description)
 
-    # Save analysis record
+    # Save analysis record; the text stays in SQL unless the extraction store confirmed it
     try:
+        if not stored:
+            cv_hash, stored = ExtractionStore.save_text(cv_text)
         analysis = CVAnalysis(
             candidate_id=candidate.id,
             job_description=job_description,
-            cv_text=cv_text,
+            cv_hash=cv_hash,
+            cv_text=None if stored else cv_text,
             result=parser_result,
             created_at=datetime.datetime.utcnow(),
         )
@@ -153,3 +212,11 @@ def get_analysis(analysis_id):
     except Exception:
         logger.exception("Failed to fetch analysis")
         return jsonify({"error": "Internal server error"}), 500
+
+
+@ai_bp.route("/cache/stats", methods=["GET"])
+@role_required(["admin"])
+def analysis_cache_stats():
+    """Hit/miss counts of this worker's CV analysis cache"""
+    from app.services.analysis_cache import analysis_cache
+    return jsonify(analysis_cache.stats()), 200
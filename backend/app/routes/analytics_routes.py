@@ -1,32 +1,115 @@
-from flask import Blueprint, jsonify
+from functools import wraps
+
+from flask import Blueprint, jsonify, request, make_response
 from sqlalchemy import func, cast, Date, text, case
 from app.extensions import db
 from app.models import (
     Application, Requisition, Interview,
-    AssessmentResult, Candidate, CVAnalysis
+    AssessmentResult, Candidate, CVAnalysis, AnalyticsDailyRollup
 )
+from app.services.analytics_rollup_service import AnalyticsRollupService
+from app.services.candidate_skill_service import CandidateSkillService
 import json
 
 analytics_bp = Blueprint("analytics_bp", __name__)
 
+
+def _application_count(status=None):
+    """Total applications (optionally in one status) from the daily rollups"""
+    query = AnalyticsRollupService.query("applications", func.sum(AnalyticsDailyRollup.count))
+    if status is not None:
+        query = query.filter(AnalyticsDailyRollup.status == status)
+    return int(query.scalar() or 0)
+
+
+def _rollup_backed(view):
+    """
+    Serve a rollup-backed endpoint as is, reporting how current the rollups
+    are in the X-Rollups-Refreshed-At header (absent until the first run).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        refreshed_at = AnalyticsRollupService.refreshed_at()
+        response = make_response(view(*args, **kwargs))
+        if refreshed_at is not None:
+            response.headers["X-Rollups-Refreshed-At"] = refreshed_at.isoformat()
+        return response
+    return wrapper
+
+
+STAGE_TIME_GROUPS = ("none", "requisition", "category", "month")
+
+
+def _round(value, digits=2):
+    return round(float(value), digits) if value is not None else None
+
+
+def _stage_times_subquery():
+    """
+    One row per application with the days until its first assessment and
+    first interview. Both firsts come from grouped subqueries, so the whole
+    table is covered by two aggregate scans instead of a query per row.
+    """
+    first_interview = (
+        db.session.query(
+            Interview.application_id.label("application_id"),
+            func.min(Interview.scheduled_time).label("first_interview")
+        )
+        .group_by(Interview.application_id)
+        .subquery()
+    )
+    first_assessment = (
+        db.session.query(
+            AssessmentResult.application_id.label("application_id"),
+            func.min(AssessmentResult.created_at).label("first_assessment")
+        )
+        .group_by(AssessmentResult.application_id)
+        .subquery()
+    )
+
+    def days_between(later):
+        return func.extract("epoch", later - Application.created_at) / 86400.0
+
+    return (
+        db.session.query(
+            Application.id.label("application_id"),
+            Application.requisition_id.label("requisition_id"),
+            Application.created_at.label("created_at"),
+            days_between(first_assessment.c.first_assessment).label("time_to_assessment_days"),
+            days_between(first_interview.c.first_interview).label("time_to_interview_days"),
+        )
+        .outerjoin(first_assessment, first_assessment.c.application_id == Application.id)
+        .outerjoin(first_interview, first_interview.c.application_id == Application.id)
+        .subquery()
+    )
+
 # ------------------------------------------------------------
 # 1. APPLICATION VOLUME PER REQUISITION
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/applications-per-requisition")
+@_rollup_backed
 def applications_per_requisition():
+    counts = (
+        AnalyticsRollupService.query(
+            "applications",
+            AnalyticsDailyRollup.requisition_id,
+            func.sum(AnalyticsDailyRollup.count).label("applications")
+        )
+        .group_by(AnalyticsDailyRollup.requisition_id)
+        .subquery()
+    )
     results = (
         db.session.query(
             Requisition.id,
             Requisition.title,
-            func.count(Application.id).label("applications")
+            func.coalesce(counts.c.applications, 0).label("applications")
         )
-        .outerjoin(Application, Application.requisition_id == Requisition.id)
-        .group_by(Requisition.id)
+        .outerjoin(counts, counts.c.requisition_id == Requisition.id)
         .all()
     )
 
     return jsonify([
-        {"requisition_id": r.id, "title": r.title, "applications": r.applications}
+        {"requisition_id": r.id, "title": r.title, "applications": int(r.applications)}
         for r in results
     ])
 
@@ -35,8 +118,9 @@ def applications_per_requisition():
 # 2. APPLICATION → INTERVIEW CONVERSION RATE
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/conversion/application-to-interview")
+@_rollup_backed
 def application_to_interview():
-    total_apps = db.session.query(func.count(Application.id)).scalar()
+    total_apps = _application_count()
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
     rate = (interviewed / total_apps * 100) if total_apps else 0
 
@@ -51,9 +135,10 @@ def application_to_interview():
 # 3. INTERVIEW → OFFER CONVERSION RATE
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/conversion/interview-to-offer")
+@_rollup_backed
 def interview_to_offer():
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
-    offered = db.session.query(func.count(Application.id)).filter(Application.status == "recommended").scalar()
+    offered = _application_count("recommended")
     rate = (offered / interviewed * 100) if interviewed else 0
 
     return jsonify({
@@ -67,11 +152,12 @@ def interview_to_offer():
 # 4. STAGE DROP-OFF RATE
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/dropoff")
+@_rollup_backed
 def stage_dropoff():
-    total = db.session.query(func.count(Application.id)).scalar()
-    reviewed = db.session.query(func.count(Application.id)).filter(Application.status == "reviewed").scalar()
+    total = _application_count()
+    reviewed = _application_count("reviewed")
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
-    offered = db.session.query(func.count(Application.id)).filter(Application.status == "recommended").scalar()
+    offered = _application_count("recommended")
 
     return jsonify({
         "total_applications": total,
@@ -91,50 +177,117 @@ def stage_dropoff():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/time-per-stage")
 def time_per_stage():
-    query = text("""
-        SELECT
-            a.id AS application_id,
-            a.created_at,
-            MIN(i.scheduled_at) AS first_interview,
-            (SELECT ar.created_at FROM assessment_results ar WHERE ar.application_id = a.id ORDER BY ar.created_at LIMIT 1) AS first_assessment
-        FROM applications a
-        LEFT JOIN interviews i ON i.application_id = a.id
-        GROUP BY a.id
-    """)
-    rows = db.session.execute(query).fetchall()
-
-    stage_times = []
-    for r in rows:
-        created = r.created_at
-        interview = r.first_interview
-        assessment = r.first_assessment
-
-        stage_times.append({
-            "application_id": r.application_id,
-            "time_to_assessment_days": (assessment - created).days if assessment else None,
-            "time_to_interview_days": (interview - created).days if interview else None
+    """
+    Time from application to first assessment and to first interview, in days.
+
+    Query params:
+    - group_by: none (default), requisition, category or month
+    - mode=raw: one row per application instead of aggregates (paginated
+      with page / per_page, max 500)
+    """
+    group_by = request.args.get("group_by", "none")
+    if group_by not in STAGE_TIME_GROUPS:
+        return jsonify({"error": f"Invalid group_by. Use one of: {', '.join(STAGE_TIME_GROUPS)}"}), 400
+
+    stages = _stage_times_subquery()
+
+    if request.args.get("mode") == "raw":
+        page = request.args.get("page", 1, type=int)
+        per_page = min(request.args.get("per_page", 100, type=int), 500)
+        pagination = (
+            db.session.query(stages)
+            .order_by(stages.c.application_id)
+            .paginate(page=page, per_page=per_page, error_out=False)
+        )
+        return jsonify({
+            "results": [
+                {
+                    "application_id": r.application_id,
+                    "time_to_assessment_days": _round(r.time_to_assessment_days),
+                    "time_to_interview_days": _round(r.time_to_interview_days)
+                }
+                for r in pagination.items
+            ],
+            "pagination": {
+                "page": pagination.page,
+                "per_page": pagination.per_page,
+                "total_pages": pagination.pages,
+                "total_items": pagination.total,
+                "has_next": pagination.has_next,
+                "has_prev": pagination.has_prev
+            }
         })
 
-    return jsonify(stage_times)
+    columns = []
+    for metric in ("time_to_assessment_days", "time_to_interview_days"):
+        value = stages.c[metric]
+        columns += [
+            func.count(value).label(f"{metric}_count"),
+            func.avg(value).label(f"{metric}_mean"),
+            func.percentile_cont(0.5).within_group(value).label(f"{metric}_median"),
+            func.percentile_cont(0.9).within_group(value).label(f"{metric}_p90"),
+            func.percentile_cont(0.99).within_group(value).label(f"{metric}_p99"),
+        ]
+
+    query = db.session.query(*columns).select_from(stages)
+    group_columns = []
+    if group_by == "requisition":
+        group_columns = [stages.c.requisition_id, Requisition.title]
+        query = query.outerjoin(Requisition, Requisition.id == stages.c.requisition_id)
+    elif group_by == "category":
+        group_columns = [Requisition.category]
+        query = query.outerjoin(Requisition, Requisition.id == stages.c.requisition_id)
+    elif group_by == "month":
+        group_columns = [func.date_trunc("month", stages.c.created_at).label("month")]
+
+    if group_columns:
+        query = query.add_columns(*group_columns).group_by(*group_columns).order_by(*group_columns)
+
+    results = []
+    for r in query.all():
+        row = {}
+        if group_by == "requisition":
+            row.update({"requisition_id": r.requisition_id, "title": r.title})
+        elif group_by == "category":
+            row["category"] = r.category
+        elif group_by == "month":
+            row["month"] = r.month.strftime("%Y-%m") if r.month else None
+
+        for metric in ("time_to_assessment_days", "time_to_interview_days"):
+            row[metric] = {
+                "count": getattr(r, f"{metric}_count"),
+                "mean": _round(getattr(r, f"{metric}_mean")),
+                "median": _round(getattr(r, f"{metric}_median")),
+                "p90": _round(getattr(r, f"{metric}_p90")),
+                "p99": _round(getattr(r, f"{metric}_p99")),
+            }
+        results.append(row)
+
+    if group_by == "none":
+        return jsonify(results[0] if results else {})
+    return jsonify(results)
 
 
 # ------------------------------------------------------------
 # 6. APPLICATIONS PER MONTH
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/applications/monthly")
+@_rollup_backed
 def monthly_applications():
+    month = AnalyticsRollupService.month()
     results = (
-        db.session.query(
-            func.date_trunc("month", Application.created_at).label("month"),
-            func.count(Application.id)
+        AnalyticsRollupService.query(
+            "applications",
+            month.label("month"),
+            func.sum(AnalyticsDailyRollup.count)
         )
-        .group_by(func.date_trunc("month", Application.created_at))
-        .order_by(func.date_trunc("month", Application.created_at))
+        .group_by(month)
+        .order_by(month)
         .all()
     )
 
     return jsonify([
-        {"month": r.month.strftime("%Y-%m"), "applications": r[1]}
+        {"month": r.month.strftime("%Y-%m"), "applications": int(r[1])}
         for r in results
     ])
 
@@ -144,27 +297,31 @@ def monthly_applications():
 # ------------------------------------------------------------
 # CV SCREENING DROP TREND
 @analytics_bp.route("/analytics/cv-screening-drop")
+@_rollup_backed
 def cv_screening_drop():
+    month = AnalyticsRollupService.month()
     results = (
-        db.session.query(
-            func.date_trunc("month", Application.created_at).label("month"),
-            func.count(Application.id).label("total"),
+        AnalyticsRollupService.query(
+            "applications",
+            month.label("month"),
+            func.sum(AnalyticsDailyRollup.count).label("total"),
             func.sum(
                 case(
-                    (Application.status == "rejected", 1),
+                    (AnalyticsDailyRollup.status == "rejected", AnalyticsDailyRollup.count),
                     else_=0
                 )
             ).label("rejected")
         )
-        .group_by(func.date_trunc("month", Application.created_at))
+        .group_by(month)
+        .order_by(month)
         .all()
     )
 
     return jsonify([
         {
             "month": r.month.strftime("%Y-%m"),
-            "total_applications": r.total,
-            "rejected": r.rejected,
+            "total_applications": int(r.total),
+            "rejected": int(r.rejected),
             "drop_rate_percent": round((r.rejected / r.total * 100), 2) if r.total else 0
         }
         for r in results
@@ -173,27 +330,31 @@ def cv_screening_drop():
 
 # ASSESSMENT PASS RATE TREND
 @analytics_bp.route("/analytics/assessments/pass-rate")
+@_rollup_backed
 def assessment_pass_rate():
+    month = AnalyticsRollupService.month()
     results = (
-        db.session.query(
-            func.date_trunc("month", AssessmentResult.created_at).label("month"),
-            func.count(AssessmentResult.id).label("taken"),
+        AnalyticsRollupService.query(
+            "assessments",
+            month.label("month"),
+            func.sum(AnalyticsDailyRollup.count).label("taken"),
             func.sum(
                 case(
-                    (AssessmentResult.percentage_score >= 50, 1),
+                    (AnalyticsDailyRollup.status == "passed", AnalyticsDailyRollup.count),
                     else_=0
                 )
             ).label("passed")
         )
-        .group_by(func.date_trunc("month", AssessmentResult.created_at))
+        .group_by(month)
+        .order_by(month)
         .all()
     )
 
     return jsonify([
         {
             "month": r.month.strftime("%Y-%m") if r.month else None,
-            "taken": r.taken,
-            "passed": r.passed,
+            "taken": int(r.taken),
+            "passed": int(r.passed),
             "pass_rate_percent": round((r.passed / r.taken * 100), 2) if r.taken else 0
         }
         for r in results
@@ -205,19 +366,22 @@ def assessment_pass_rate():
 # 9. INTERVIEW SCHEDULING RATE OVER TIME
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/interviews/scheduled")
+@_rollup_backed
 def interview_scheduling():
+    month = AnalyticsRollupService.month()
     results = (
-        db.session.query(
-            func.date_trunc("month", Interview.created_at).label("month"),
-            func.count(Interview.id)
+        AnalyticsRollupService.query(
+            "interviews",
+            month.label("month"),
+            func.sum(AnalyticsDailyRollup.count)
         )
-        .group_by(func.date_trunc("month", Interview.created_at))
-        .order_by(func.date_trunc("month", Interview.created_at))
+        .group_by(month)
+        .order_by(month)
         .all()
     )
 
     return jsonify([
-        {"month": r.month.strftime("%Y-%m"), "interviews": r[1]}
+        {"month": r.month.strftime("%Y-%m"), "interviews": int(r[1])}
         for r in results
     ])
 
@@ -226,19 +390,21 @@ def interview_scheduling():
 # 10. OFFER TREND BY JOB CATEGORY
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/offers-by-category")
+@_rollup_backed
 def offers_by_category():
     results = (
-        db.session.query(
+        AnalyticsRollupService.query(
+            "applications",
             Requisition.category,
-            func.count(Application.id)
+            func.sum(AnalyticsDailyRollup.count)
         )
-        .join(Application, Application.requisition_id == Requisition.id)
-        .filter(Application.status == "recommended")
+        .join(Requisition, Requisition.id == AnalyticsDailyRollup.requisition_id)
+        .filter(AnalyticsDailyRollup.status == "recommended")
         .group_by(Requisition.category)
         .all()
     )
 
-    return jsonify([{"category": r[0], "offers": r[1]} for r in results])
+    return jsonify([{"category": r[0], "offers": int(r[1])} for r in results])
 
 
 # ============================================================
@@ -258,8 +424,14 @@ def avg_cv_score():
 # 12. AVERAGE ASSESSMENT SCORE
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/candidate/avg-assessment-score")
+@_rollup_backed
 def avg_assessment_score():
-    avg_score = db.session.query(func.avg(AssessmentResult.percentage_score)).scalar()
+    totals = AnalyticsRollupService.query(
+        "assessments",
+        func.sum(AnalyticsDailyRollup.score_sum),
+        func.sum(AnalyticsDailyRollup.score_count)
+    ).one()
+    avg_score = (totals[0] / totals[1]) if totals[1] else None
     return jsonify({"average_assessment_score": round(avg_score, 2) if avg_score else 0})
 
 
@@ -268,16 +440,12 @@ def avg_assessment_score():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/candidate/skills-frequency")
 def skill_frequency():
-    candidates = Candidate.query.with_entities(Candidate.skills).all()
-    freq = {}
-
-    for c in candidates:
-        if not c.skills:
-            continue
-        for skill in c.skills:
-            freq[skill] = freq.get(skill, 0) + 1
-
-    return jsonify(freq)
+    """
+    Candidates per canonical (case-folded) skill, read from the incrementally
+    maintained skill_frequencies table. Optional ?limit=N returns the top N.
+    """
+    limit = request.args.get("limit", type=int)
+    return jsonify(CandidateSkillService.frequencies(limit))
 
 
 # ------------------------------------------------------------
@@ -3,18 +3,18 @@ from flask_jwt_extended import get_jwt_identity, jwt_required
 from app.extensions import db, cloudinary_client
 from werkzeug.security import check_password_hash, generate_password_hash
 from app.extensions import bcrypt
-import cloudinary.uploader
 from app.models import (
-    User, Candidate, Requisition, Application, AssessmentResult, Notification, AuditLog
+    User, Candidate, Requisition, Application, AssessmentResult, Notification, AuditLog, CVAnalysisJob
 )
 from datetime import datetime
 from werkzeug.utils import secure_filename
 
-from app.services.cv_parser_service import HybridResumeAnalyzer
+from app.services.cv_job_queue import CVJobQueue
+from app.services.storage_service import StorageService
 from app.utils.decorators import role_required
+from app.utils.exceptions import ConflictException
 from app.utils.helper import get_current_candidate
 from app.services.audit2 import AuditService
-import fitz
 from flask import jsonify, request, current_app
 import json
 import re
@@ -132,8 +132,6 @@ def get_available_jobs():
 def upload_resume(application_id):
     try:
         application = Application.query.get_or_404(application_id)
-        candidate = application.candidate
-        job = application.requisition
 
         if application.candidate.user.id != int(get_jwt_identity()):
             return jsonify({"error": "Unauthorized"}), 403
@@ -146,56 +144,47 @@ def upload_resume(application_id):
 
         file = request.files["resume"]
 
-        # --- Upload to Cloudinary ---
-        resume_url = HybridResumeAnalyzer.upload_cv(file)
-        if not resume_url:
-            return jsonify({"error": "Failed to upload resume"}), 500
-
-        # --- Extract PDF text if needed ---
-        resume_text = request.form.get("resume_text", "")
-        if not resume_text and file.filename.lower().endswith(".pdf"):
-            file.stream.seek(0)
-            pdf_doc = fitz.open(stream=file.stream.read(), filetype="pdf")
-            resume_text = ""
-            for page in pdf_doc:
-                resume_text += page.get_text()
-
-        # --- Hybrid Resume Analysis ---
-        analyzer = HybridResumeAnalyzer()
-        parser_result = analyzer.analyse(resume_text, job.id)
-
-        # --- Save results ---
-        application.resume_url = resume_url
-        application.cv_score = parser_result.get("match_score", 0)
-        application.cv_parser_result = parser_result
-        application.recommendation = parser_result.get("recommendation", "")
-        db.session.commit()
-
-        # --- Notify admins ---
-        admins = User.query.filter_by(role="admin").all()
-        for admin in admins:
-            notif = Notification(
-                user_id=admin.id,
-                message=f"{candidate.full_name} submitted resume for {job.title}."
+        active = CVJobQueue.active_job(application.id)
+        if active:
+            return jsonify({
+                "error": "Resume analysis already in progress",
+                "job_id": active.id,
+                "status": active.status
+            }), 409
+
+        # --- Upload, extraction and analysis run in the CV worker ---
+        try:
+            cv_job = CVJobQueue.submit(
+                application, int(get_jwt_identity()), file, request.form.get("resume_text", "")
             )
-            db.session.add(notif)
-        db.session.commit()
+        except ConflictException as e:
+            return jsonify({"error": str(e), **e.details}), 409
 
         return jsonify({
-            "message": "Resume uploaded and analyzed",
-            "cv_score": application.cv_score,
-            "missing_skills": parser_result.get("missing_skills", []),
-            "suggestions": parser_result.get("suggestions", []),
-            "recommendation": application.recommendation,
-            "resume_url": resume_url,
-            "raw_parser_text": parser_result.get("raw_text", "")
-        }), 200
+            "message": "Resume received; analysis queued",
+            "job_id": cv_job.id,
+            "status": cv_job.status,
+            "status_url": f"/api/candidate/resume_jobs/{cv_job.id}"
+        }), 202
 
     except Exception as e:
         current_app.logger.error(f"Upload resume error: {e}", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 
+@candidate_bp.route("/resume_jobs/<job_id>", methods=["GET"])
+@role_required(["candidate"])
+def resume_job_status(job_id):
+    try:
+        job = CVAnalysisJob.query.get_or_404(job_id)
+        if job.user_id != int(get_jwt_identity()):
+            return jsonify({"error": "Unauthorized"}), 403
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        current_app.logger.error(f"Resume job status error: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 # ----------------- CANDIDATE APPLICATIONS -----------------
 @candidate_bp.route("/applications", methods=["GET"])
 @role_required(["candidate"])
@@ -440,7 +429,7 @@ def upload_document():
         if not ('.' in filename and filename.rsplit('.', 1)[1].lower() in allowed_docs):
             return jsonify({"success": False, "message": "Invalid file type"}), 400
 
-        url = upload_cv_to_cloudinary(file)
+        url = StorageService.store(file, folder="candidate_documents")
         if not url:
             return jsonify({"success": False, "message": "Failed to upload document"}), 500
 
@@ -491,15 +480,8 @@ def upload_profile_picture():
         if ext not in allowed_images:
             return jsonify({"success": False, "message": "Invalid image type"}), 400
 
-        # ---- Upload to Cloudinary ----
-        result = cloudinary.uploader.upload(
-            file,
-            folder="profile_pics/",
-            format="jpg",  # convert everything to jpg
-            resource_type="image",
-            public_id=f"candidate_{candidate.id}"
-        )
-        url = result.get("secure_url")
+        # ---- Stage for storage (Cloudinary converts images to jpg) ----
+        url = StorageService.store(file, folder="profile_pics", resource_type="image")
         if not url:
             return jsonify({"success": False, "message": "Failed to upload image"}), 500
 
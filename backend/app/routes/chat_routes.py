@@ -1,8 +1,8 @@
 # routes/chat_routes.py
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
 from app.services.chat_service import ChatService
+from app.services.presence_service import PresenceService
 from app.models import db, ChatThread
 
 chat_bp = Blueprint('chat', __name__)
@@ -15,13 +15,20 @@ def get_threads():
         user_id = get_jwt_identity()
         entity_type = request.args.get('entity_type')
         entity_id = request.args.get('entity_id')
+        limit = min(int(request.args.get('limit', 50)), 100)
+        cursor = request.args.get('cursor')
         
-        threads = ChatService.get_user_threads(user_id, entity_type, entity_id)
+        threads, next_cursor = ChatService.get_user_threads(
+            user_id, entity_type, entity_id, limit=limit, cursor=cursor
+        )
         return jsonify({
             'success': True,
             'threads': threads,
-            'count': len(threads)
+            'count': len(threads),
+            'next_cursor': next_cursor
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -87,28 +94,23 @@ def get_messages(thread_id):
         user_id = get_jwt_identity()
         
         limit = min(int(request.args.get('limit', 50)), 100)
-        before = request.args.get('before')
-        
-        if before:
-            try:
-                before_dt = datetime.fromisoformat(before.replace('Z', '+00:00'))
-            except ValueError:
-                before_dt = None
-        else:
-            before_dt = None
         
-        messages = ChatService.get_thread_messages(
+        messages, page = ChatService.get_thread_messages(
             thread_id=thread_id,
             user_id=user_id,
             limit=limit,
-            before=before_dt
+            before=request.args.get('before'),
+            after=request.args.get('after')
         )
         
         return jsonify({
             'success': True,
             'messages': messages,
-            'count': len(messages)
+            'count': len(messages),
+            **page
         })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -153,26 +155,15 @@ def mark_as_read(thread_id):
         if not any(p.id == user_id for p in thread.participants):
             return jsonify({'success': False, 'error': 'Access denied'}), 403
         
-        # Get last message in thread
-        last_message = thread.messages.first()
-        if last_message:
-            from app.models import MessageReadStatus
-            existing = MessageReadStatus.query.filter_by(
-                message_id=last_message.id, 
-                user_id=user_id
-            ).first()
-            
-            if not existing:
-                read_status = MessageReadStatus(
-                    message_id=last_message.id,
-                    user_id=user_id
-                )
-                db.session.add(read_status)
-                db.session.commit()
+        data = request.get_json(silent=True) or {}
+        message_id = int(data['message_id']) if data.get('message_id') else None
+        last_read_message_id = ChatService.mark_read(thread_id, user_id, message_id)
+        db.session.commit()
         
         return jsonify({
             'success': True,
-            'message': 'Messages marked as read'
+            'message': 'Messages marked as read',
+            'last_read_message_id': last_read_message_id
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -214,15 +205,11 @@ def update_presence():
         if not data or 'status' not in data:
             return jsonify({'success': False, 'error': 'Status is required'}), 400
         
-        presence = ChatService.update_presence(
-            user_id=user_id,
-            status=data['status'],
-            socket_id=data.get('socket_id')
-        )
+        presence = PresenceService.set_status(int(user_id), data['status'])
         
         return jsonify({
             'success': True,
-            'presence': presence.to_dict()
+            'presence': presence
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,40 @@
+# app/routes/file_routes.py
+import os
+import re
+
+from flask import Blueprint, jsonify, redirect, send_file
+
+from app.extensions import db
+from app.models import StoredFile
+from app.services.storage_service import StorageService
+
+files_bp = Blueprint("files", __name__)
+
+KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@files_bp.route("/<key>", methods=["GET"])
+def get_file(key):
+    """
+    Serve a stored file: the staged local copy while its background upload
+    is pending (or on the local backend), a redirect to Cloudinary once
+    uploaded. Keys are content hashes, so responses never change.
+    """
+    if not KEY_RE.match(key):
+        return jsonify({"error": "File not found"}), 404
+
+    stored = db.session.get(StoredFile, key)
+    if stored is None:
+        return jsonify({"error": "File not found"}), 404
+
+    if stored.status == "uploaded" and stored.remote_url:
+        return redirect(stored.remote_url, code=302)
+
+    path = StorageService.local_path(key)
+    if not os.path.exists(path):
+        return jsonify({"error": "File not available"}), 404
+
+    response = send_file(path, mimetype=stored.content_type or "application/octet-stream",
+                         download_name=stored.filename, conditional=True)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
@@ -3,10 +3,15 @@ import logging
 import re
 from typing import Dict, Any
 from .cv_parser_service import HybridResumeAnalyzer
-import pdfplumber
-import docx
+from .extraction_store import ExtractionStore
+from .skill_taxonomy import get_taxonomy
 
 logger = logging.getLogger(__name__)
+
+EMAIL_RE = re.compile(r'[\w\.-]+@[\w\.-]+')
+PHONE_RE = re.compile(r'\+?\d[\d\s\-\(\)]{7,}')
+NAME_RE = re.compile(r'([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)')
+
 analyzer = HybridResumeAnalyzer()  # Singleton instance
 
 class AIParser:
@@ -19,7 +24,8 @@ class AIParser:
         Ensures minimal data is always returned for auto-population.
         """
         try:
-            cv_text = AIParser.read_cv_file(cv_file)
+            extraction = ExtractionStore.extract(cv_file)
+            cv_text = extraction["text"]
             if not cv_text.strip():
                 logger.warning("CV text empty after extraction.")
                 cv_text = ""
@@ -37,6 +43,7 @@ class AIParser:
             # Step 3: Merge AI results with fallback (AI overrides fallback if present)
             merged = {**fallback_data, **parsed_data} if parsed_data else fallback_data
             merged["cv_text"] = cv_text
+            merged["cv_hash"] = extraction["cv_hash"]
 
             # Ensure all expected keys exist
             keys = [
@@ -58,27 +65,21 @@ class AIParser:
     @staticmethod
     def offline_extract(cv_text: str) -> Dict[str, Any]:
         """
-        Basic regex-based extraction to ensure minimal auto-fill.
+        Regex and taxonomy based extraction to ensure minimal auto-fill.
         """
-        # Extract email
-        email_match = re.search(r'[\w\.-]+@[\w\.-]+', cv_text)
+        email_match = EMAIL_RE.search(cv_text)
         email = email_match.group(0) if email_match else ""
 
-        # Extract phone (simple international/local formats)
-        phone_match = re.search(r'\+?\d[\d\s\-\(\)]{7,}', cv_text)
+        # Simple international/local formats
+        phone_match = PHONE_RE.search(cv_text)
         phone = phone_match.group(0) if phone_match else ""
 
-        # Extract name (very basic heuristic: first 2 capitalized words in CV)
-        name_match = re.search(r'([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)', cv_text)
+        # Very basic heuristic: first 2 capitalized words in CV
+        name_match = NAME_RE.search(cv_text)
         full_name = name_match.group(0) if name_match else ""
 
-        # Extract skills (simple keyword matching)
-        skill_keywords = ["Python", "Java", "Flutter", "Dart", "React", "SQL", "Node", "AWS"]
-        skills = [skill for skill in skill_keywords if re.search(rf'\b{skill}\b', cv_text, re.I)]
-
-        # Extract education (look for common degree keywords)
-        education_keywords = ["BSc", "MSc", "Bachelor", "Master", "PhD", "Diploma"]
-        education = [edu for edu in education_keywords if re.search(rf'\b{edu}\b', cv_text, re.I)]
+        # Skills, degrees, certifications and languages in one pass over the text
+        found = get_taxonomy().find(cv_text)
 
         return {
             "full_name": full_name,
@@ -88,10 +89,10 @@ class AIParser:
             "linkedin": "",
             "github": "",
             "portfolio": "",
-            "education": education,
-            "skills": skills,
-            "certifications": [],
-            "languages": [],
+            "education": found.get("education", []),
+            "skills": found.get("skills", []),
+            "certifications": found.get("certifications", []),
+            "languages": found.get("languages", []),
             "experience": "",
             "position": "",
             "previous_companies": [],
@@ -101,20 +102,34 @@ class AIParser:
             "suggestions": []
         }
 
+    @staticmethod
+    def offline_match(cv_text: str, job_description: str, required_skills=None) -> Dict[str, Any]:
+        """
+        Keyword-based CV-vs-job result with the same shape as the AI analysis,
+        used when the AI provider is unavailable (circuit open or failing).
+        """
+        required = [s for s in (required_skills or []) if isinstance(s, str) and s.strip()]
+        if not required:
+            required = AIParser.offline_extract(job_description or "")["skills"]
+        required = list(dict.fromkeys(s.strip() for s in required))
+
+        # Taxonomy hits cover synonyms ("k8s" for Kubernetes); other skills are matched literally
+        cv_skills = {s.casefold() for s in get_taxonomy().find(cv_text or "").get("skills", [])}
+        matched = [
+            s for s in required
+            if s.casefold() in cv_skills or re.search(rf'(?<!\w){re.escape(s)}(?!\w)', cv_text or "", re.I)
+        ]
+        missing = [s for s in required if s not in matched]
+
+        return {
+            "match_score": round(100 * len(matched) / len(required)) if required else 0,
+            "missing_skills": missing,
+            "suggestions": ["AI analysis is temporarily unavailable; this score is based on keyword matching only."],
+            "interview_questions": [],
+            "offline": True,
+        }
+
     @staticmethod
     def read_cv_file(cv_file) -> str:
-        import os, tempfile
-        temp_path = os.path.join(tempfile.gettempdir(), cv_file.filename)
-        cv_file.save(temp_path)
-        text = ""
-        if cv_file.filename.lower().endswith(".pdf"):
-            with pdfplumber.open(temp_path) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        elif cv_file.filename.lower().endswith(".docx"):
-            doc = docx.Document(temp_path)
-            text = "\n".join(p.text for p in doc.paragraphs)
-        else:
-            # fallback for TXT
-            with open(temp_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-        return text
\ No newline at end of file
+        # Parsed once per distinct file; unknown extensions are read as plain text
+        return ExtractionStore.extract(cv_file)["text"]
\ No newline at end of file
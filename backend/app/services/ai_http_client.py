@@ -0,0 +1,302 @@
+"""
+Shared HTTP client for AI provider calls.
+
+- One process-wide ``requests.Session`` with a sized connection pool, so
+  calls reuse keep-alive connections instead of a TLS handshake each time.
+- A global semaphore bounds in-flight AI calls per process (AI_MAX_CONCURRENCY)
+  so a burst of analyses cannot exhaust workers or the provider's rate limit.
+- Retries use exponential backoff with full jitter, honour ``Retry-After`` on
+  429/503 and never sleep past the per-call deadline.
+- ``map_concurrent`` fans calls out on a shared thread pool (the app runs
+  Socket.IO in threading mode, so threads rather than asyncio).
+- Every attempt goes through the provider's circuit breaker, so once the
+  provider is failing or slow, calls fail fast with CircuitOpenError instead
+  of waiting out timeouts and retries.
+- ``post_json_hedged`` sends a second request (e.g. to a fallback model) when
+  the first has not answered after a p95-based delay; first success wins.
+"""
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENCY = int(os.environ.get("AI_MAX_CONCURRENCY", "8"))
+POOL_SIZE = int(os.environ.get("AI_HTTP_POOL_SIZE", str(MAX_CONCURRENCY)))
+
+# Statuses worth retrying; any other 4xx is a caller error
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+# Shared by every call to the AI provider in this process
+ai_breaker = CircuitBreaker.from_env("openrouter")
+
+
+class AIRequestError(RuntimeError):
+    """Raised when an AI call fails permanently or runs out of time/attempts"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff for the given 1-based attempt"""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+class AIHttpClient:
+    """Pooled, concurrency-bounded JSON POST client"""
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+    _semaphore = threading.BoundedSemaphore(MAX_CONCURRENCY)
+    _executor: Optional[ThreadPoolExecutor] = None
+    # Separate pool so hedges issued from map_concurrent tasks cannot starve it
+    _hedge_executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def session(cls) -> requests.Session:
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def _open(
+        cls,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]],
+        timeout: float,
+        deadline: Optional[float],
+        retries: int,
+        backoff_base: float,
+        backoff_cap: float,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        Retry loop shared by post_json and stream_events. Returns a 200
+        response while still holding a concurrency slot; the caller must
+        release it with ``_semaphore.release()`` once the body is consumed.
+        """
+        expires_at = time.monotonic() + deadline if deadline else None
+        last_error = "no attempt made"
+        status_code = None
+
+        for attempt in range(1, retries + 1):
+            attempt_timeout = timeout
+            if expires_at is not None:
+                remaining = expires_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                attempt_timeout = min(timeout, remaining)
+
+            retry_after = None
+            acquired = cls._semaphore.acquire(timeout=attempt_timeout)
+            if not acquired:
+                last_error = "timed out waiting for a free AI call slot"
+            else:
+                keep_slot = False
+                try:
+                    # Raises CircuitOpenError (no retry) while the provider is failing
+                    ticket = ai_breaker.allow()
+                    started = time.monotonic()
+                    try:
+                        resp = cls.session().post(url, headers=headers, json=payload,
+                                                  timeout=attempt_timeout, stream=stream)
+                    except Exception:
+                        ai_breaker.record(False, ticket=ticket)
+                        raise
+                    status_code = resp.status_code
+                    # Non-retryable 4xx are caller errors, not provider health problems
+                    healthy = resp.status_code not in RETRY_STATUSES
+                    ai_breaker.record(healthy, time.monotonic() - started, ticket=ticket)
+                    if resp.status_code == 200:
+                        keep_slot = True
+                        return resp
+                    last_error = f"HTTP {resp.status_code}: {resp.text[:500]}"
+                    if healthy:
+                        raise AIRequestError(f"AI provider error {last_error}", status_code)
+                    retry_after = retry_after_seconds(resp.headers.get("Retry-After"))
+                except requests.exceptions.RequestException as e:
+                    last_error = f"{type(e).__name__}: {e}"
+                finally:
+                    if not keep_slot:
+                        cls._semaphore.release()
+
+            if attempt == retries:
+                break
+            delay = retry_after if retry_after is not None else backoff_delay(attempt, backoff_base, backoff_cap)
+            if expires_at is not None and time.monotonic() + delay >= expires_at:
+                last_error += " (deadline reached before next retry)"
+                break
+            logger.warning("AI call attempt %d/%d failed (%s); retrying in %.1fs",
+                           attempt, retries, last_error, delay)
+            time.sleep(delay)
+
+        raise AIRequestError(f"AI call failed: {last_error}", status_code)
+
+    @classmethod
+    def post_json(
+        cls,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 60,
+        deadline: Optional[float] = None,
+        retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 20.0,
+    ) -> Dict[str, Any]:
+        """
+        POST ``payload`` and return the decoded JSON response.
+
+        Args:
+            timeout: Per-attempt timeout in seconds
+            deadline: Total time budget in seconds across all attempts and waits
+            retries: Maximum number of attempts
+
+        Raises:
+            AIRequestError when the call fails permanently, attempts run out
+            or the deadline would be exceeded
+        """
+        resp = cls._open(url, payload, headers, timeout, deadline, retries, backoff_base, backoff_cap)
+        try:
+            return resp.json()
+        finally:
+            cls._semaphore.release()
+
+    @classmethod
+    def post_json_hedged(
+        cls,
+        url: str,
+        payload: Dict[str, Any],
+        hedge_payload: Dict[str, Any],
+        hedge_delay: float,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """
+        Like post_json, but if ``payload`` has not answered within
+        ``hedge_delay`` seconds (or fails sooner), also send ``hedge_payload``
+        and return whichever succeeds first. The slower call is left to finish
+        in the background.
+        """
+        if cls._hedge_executor is None:
+            with cls._session_lock:
+                if cls._hedge_executor is None:
+                    cls._hedge_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY * 2,
+                                                             thread_name_prefix="ai-hedge")
+        executor = cls._hedge_executor
+
+        primary = executor.submit(cls.post_json, url, payload, headers, **kwargs)
+        pending = {primary}
+        done, _ = wait(pending, timeout=hedge_delay)
+        if primary in done and primary.exception() is None:
+            return primary.result()
+        if not (primary in done and isinstance(primary.exception(), CircuitOpenError)):
+            logger.info("Hedging AI call after %.1fs", hedge_delay)
+            pending.add(executor.submit(cls.post_json, url, hedge_payload, headers, **kwargs))
+
+        errors = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                errors.append(future.exception())
+        raise errors[0]
+
+    @classmethod
+    def stream_events(
+        cls,
+        url: str,
+        payload: Dict[str, Any],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 60,
+        deadline: Optional[float] = None,
+        retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 20.0,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        POST ``payload`` and yield the decoded ``data:`` events of the
+        upstream server-sent-event stream until ``[DONE]``.
+
+        Retries only happen before the stream starts; ``timeout`` then bounds
+        the wait between chunks. The concurrency slot is held until the
+        generator finishes or is closed.
+        """
+        resp = cls._open(url, payload, headers, timeout, deadline, retries, backoff_base, backoff_cap,
+                         stream=True)
+        try:
+            for line in resp.iter_lines(decode_unicode=True):
+                # Blank lines separate events; ':' lines are keep-alive comments
+                if not line or line.startswith(":") or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    yield json.loads(data)
+                except ValueError:
+                    logger.warning("Skipping malformed AI stream event: %s", data[:200])
+        except requests.exceptions.RequestException as e:
+            raise AIRequestError(f"AI stream interrupted: {type(e).__name__}: {e}")
+        finally:
+            resp.close()
+            cls._semaphore.release()
+
+    @classmethod
+    def map_concurrent(cls, fn: Callable, items: Iterable) -> List[Any]:
+        """
+        Run ``fn`` over ``items`` on the shared pool and return results in
+        order. Exceptions are returned in place of results, not raised.
+        """
+        if cls._executor is None:
+            with cls._session_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY,
+                                                       thread_name_prefix="ai-client")
+        futures = [cls._executor.submit(fn, item) for item in items]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
@@ -1,5 +1,7 @@
 # app/services/cv_parser_service.py
 from .ai_service import AIService
+from .ai_cv_parser import AIParser
+from .circuit_breaker import CircuitOpenError
 from typing import Dict, Any
 import logging
 
@@ -14,13 +16,10 @@ def analyse_resume_gemini(cv_text: str, job_description: str) -> Dict[str, Any]:
     try:
         result = ai.analyze_cv_vs_job(cv_text= cv_text, job_description=job_description)
         return result
+    except CircuitOpenError as e:
+        logger.warning("AI unavailable, using offline match: %s", e)
+        return AIParser.offline_match(cv_text, job_description)
     except Exception as e:
         logger.exception("Error analyzing resume: %s", e)
         # Return safe fallback
-        return {
-            "match_score": 0,
-            "missing_skills": [],
-            "suggestions": [],
-            "interview_questions": [],
-            "error": str(e)
-        }
+        return dict(AIParser.offline_match(cv_text, job_description), error=str(e))
@@ -1,11 +1,12 @@
 import os
-import requests
 import json
 import logging
-import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
+from app.services.analysis_cache import analysis_cache
+from app.services.ai_http_client import AIHttpClient, AIRequestError, ai_breaker
+
 
 # ----------------------------
 # Environment & Logging Setup
@@ -19,6 +20,13 @@ OPENROUTER_URL = os.environ.get(
     "OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions"
 )
 DEFAULT_MODEL = os.environ.get("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+# Optional hedged requests: a second call to FALLBACK_MODEL after the p95 latency
+FALLBACK_MODEL = os.environ.get("OPENROUTER_FALLBACK_MODEL")
+HEDGE_REQUESTS = os.environ.get("AI_HEDGE_REQUESTS", "false").lower() == "true"
+HEDGE_DEFAULT_DELAY = float(os.environ.get("AI_HEDGE_DEFAULT_DELAY", "15"))
+
+# Bump whenever the analyze_cv_vs_job prompt changes so cached results miss
+CV_JOB_PROMPT_VERSION = "cv-vs-job/v1"
 
 
 class AIService:
@@ -28,30 +36,33 @@ class AIService:
         model: Optional[str] = None,
         timeout: int = 60,
         retries: int = 3,
-        backoff: int = 5,
+        backoff: float = 1.0,
+        deadline: Optional[float] = 120,
+        fallback_model: Optional[str] = None,
+        hedge: Optional[bool] = None,
     ):
         self.api_key = api_key or OPENROUTER_API_KEY
         self.model = model or DEFAULT_MODEL
+        self.fallback_model = fallback_model or FALLBACK_MODEL
+        self.hedge = (HEDGE_REQUESTS if hedge is None else hedge) and bool(self.fallback_model)
         self.timeout = timeout
         self.retries = retries
+        # Base delay of the jittered exponential backoff between retries
         self.backoff = backoff
+        # Total budget per call across attempts and waits (None = unbounded)
+        self.deadline = deadline
 
         if not self.api_key:
             logger.warning(
                 "No OPENROUTER_API_KEY found in environment. AI calls will fail without a key."
             )
 
-    def _call_generation(
-        self, prompt: str, temperature: float = 0.7, max_output_tokens: int = 512
-    ) -> str:
-        if not self.api_key:
-            raise RuntimeError("OPENROUTER_API_KEY not set")
-
+    def _request(self, prompt: str, temperature: float, max_output_tokens: int, stream: bool = False):
+        """Return (headers, payload) for a chat completion request"""
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
-
         payload = {
             "model": self.model,
             "messages": [
@@ -61,49 +72,137 @@ class AIService:
             "temperature": temperature,
             "max_tokens": max_output_tokens,
         }
+        if stream:
+            payload["stream"] = True
+        return headers, payload
 
-        for attempt in range(1, self.retries + 1):
-            try:
-                resp = requests.post(
-                    OPENROUTER_URL, headers=headers, json=payload, timeout=self.timeout
-                )
-                if resp.status_code != 200:
-                    logger.error(
-                        "OpenRouter API error [%s]: %s", resp.status_code, resp.text
-                    )
-                    raise RuntimeError(
-                        f"OpenRouter API error: {resp.status_code} {resp.text}"
-                    )
-                data = resp.json()
-                return data["choices"][0]["message"]["content"]
-            except requests.exceptions.Timeout:
-                logger.warning(
-                    "Timeout on attempt %d/%d, retrying in %d seconds...",
-                    attempt,
-                    self.retries,
-                    self.backoff,
-                )
-                time.sleep(self.backoff)
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    "RequestException on attempt %d/%d: %s", attempt, self.retries, e
-                )
-                time.sleep(self.backoff)
-            except Exception as e:
-                logger.exception(
-                    "Unexpected error on attempt %d/%d: %s", attempt, self.retries, e
+    def _call_generation(
+        self,
+        prompt: str,
+        temperature: float = 0.7,
+        max_output_tokens: int = 512,
+        deadline: Optional[float] = None,
+    ) -> str:
+        if not self.api_key:
+            raise RuntimeError("OPENROUTER_API_KEY not set")
+
+        headers, payload = self._request(prompt, temperature, max_output_tokens)
+
+        options = dict(
+            timeout=self.timeout,
+            deadline=deadline or self.deadline,
+            retries=self.retries,
+            backoff_base=self.backoff,
+        )
+        try:
+            if self.hedge:
+                data = AIHttpClient.post_json_hedged(
+                    OPENROUTER_URL,
+                    payload,
+                    dict(payload, model=self.fallback_model),
+                    hedge_delay=ai_breaker.p95_latency(HEDGE_DEFAULT_DELAY),
+                    headers=headers,
+                    **options,
                 )
-                time.sleep(self.backoff)
+            else:
+                data = AIHttpClient.post_json(OPENROUTER_URL, payload, headers=headers, **options)
+        except AIRequestError as e:
+            logger.error("OpenRouter call failed: %s", e)
+            raise RuntimeError(f"Failed to call OpenRouter API: {e}") from e
 
-        raise RuntimeError("Failed to call OpenRouter API after multiple retries")
+        try:
+            return data["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise RuntimeError(f"Unexpected OpenRouter response: {str(data)[:500]}")
 
     def chat(self, message: str, temperature: float = 0.2) -> str:
         prompt = f"User:\n{message}\n\nAssistant:"
         return self._call_generation(prompt, temperature=temperature, max_output_tokens=400)
 
+    def chat_stream(self, message: str, temperature: float = 0.2) -> Iterator[str]:
+        """Yield the reply to ``message`` as text deltas while it is generated"""
+        if not self.api_key:
+            raise RuntimeError("OPENROUTER_API_KEY not set")
+
+        prompt = f"User:\n{message}\n\nAssistant:"
+        headers, payload = self._request(prompt, temperature, 400, stream=True)
+        events = AIHttpClient.stream_events(
+            OPENROUTER_URL,
+            payload,
+            headers=headers,
+            timeout=self.timeout,
+            deadline=self.deadline,
+            retries=self.retries,
+            backoff_base=self.backoff,
+        )
+        for event in events:
+            if event.get("error"):
+                raise RuntimeError(f"OpenRouter stream error: {event['error']}")
+            for choice in event.get("choices") or []:
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
     def analyze_cv_vs_job(
-        self, cv_text: str, job_description: str, want_json: bool = True
+        self, cv_text: str, job_description: str, want_json: bool = True, use_cache: bool = True
     ) -> Dict[str, Any]:
+        if not use_cache:
+            return self._analyze_cv_vs_job(cv_text, job_description)
+
+        key = analysis_cache.make_key(cv_text, job_description, self.model, CV_JOB_PROMPT_VERSION)
+        return analysis_cache.get_or_compute(
+            key,
+            lambda: self._analyze_cv_vs_job(cv_text, job_description),
+            # Unparseable model output is not worth replaying
+            cacheable=lambda result: "raw_output" not in result,
+        )
+
+    def analyze_many(self, pairs: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Analyse several (cv_text, job_description) pairs in parallel on the
+        shared AI pool. A failed pair yields an error result instead of raising.
+        """
+        results = AIHttpClient.map_concurrent(
+            lambda pair: self.analyze_cv_vs_job(pair[0], pair[1]), pairs
+        )
+        return [
+            result if not isinstance(result, Exception) else {
+                "match_score": 0,
+                "missing_skills": [],
+                "suggestions": [],
+                "interview_questions": [],
+                "error": str(result),
+            }
+            for result in results
+        ]
+
+    def extract_profile(self, cv_text: str) -> Dict[str, Any]:
+        """
+        Structured candidate fields read from a CV (used to enrich the offline
+        extraction of bulk imports). Unparseable replies yield {}.
+        """
+        prompt = f"""
+Extract the candidate's details from the CV below.
+
+CANDIDATE CV:
+\"\"\"{cv_text[:12000]}\"\"\"
+
+Return strictly a JSON object with the keys: full_name, email, phone, title,
+location, bio, linkedin, github, skills (list), education (list),
+certifications (list), languages (list). Use "" or [] when unknown.
+"""
+        out = self._call_generation(prompt, temperature=0.0, max_output_tokens=700)
+        import re
+
+        try:
+            match = re.search(r"(\{.*\})", out, flags=re.DOTALL)
+            parsed = json.loads(match.group(1) if match else out)
+        except Exception:
+            logger.warning("Could not parse profile extraction reply")
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
+
+    def _analyze_cv_vs_job(self, cv_text: str, job_description: str) -> Dict[str, Any]:
         prompt = f"""
 You are a hiring assistant specializing in parsing resumes and comparing them to job descriptions.
 Please analyze the candidate CV below and the job description below.
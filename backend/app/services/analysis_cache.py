@@ -0,0 +1,168 @@
+"""
+Content-addressed cache for LLM CV-vs-job analyses.
+
+Entries are keyed on a SHA-256 of (normalized CV text, normalized job
+description, model, prompt version), so re-uploads, draft resubmits and
+retries of the same CV against the same job are answered without another
+OpenRouter call, while a prompt or model change naturally misses.
+
+Two backends:
+- memory (default): per-process LRU with TTL
+- redis: shared across workers via SETEX on the app's redis client; eviction
+  is left to the server's maxmemory policy. Falls back to memory when Redis
+  is unavailable.
+
+Only successful analyses are stored; callers decide what counts as success.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'cv_analysis:'
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _setting(name: str, default):
+    if has_app_context():
+        return current_app.config.get(name, default)
+    return os.getenv(name, default)
+
+
+def _normalize(text: Optional[str]) -> str:
+    return _WHITESPACE.sub(' ', text or '').strip().casefold()
+
+
+class AnalysisCache:
+    """TTL + LRU cache of analysis results with hit/miss accounting"""
+
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None,
+                 backend: Optional[str] = None):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._backend = backend
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ----------------- SETTINGS -----------------
+    @property
+    def max_entries(self) -> int:
+        return int(self._max_entries or _setting('ANALYSIS_CACHE_MAX_ENTRIES', 1024))
+
+    @property
+    def ttl_seconds(self) -> int:
+        return int(self._ttl_seconds or _setting('ANALYSIS_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+
+    @property
+    def backend(self) -> str:
+        return (self._backend or _setting('ANALYSIS_CACHE_BACKEND', 'memory')).lower()
+
+    @staticmethod
+    def _redis():
+        from app.extensions import redis_client
+        return redis_client
+
+    # ----------------- KEYS -----------------
+    @staticmethod
+    def make_key(cv_text: str, job_description: str, model: str, prompt_version: str) -> str:
+        digest = hashlib.sha256()
+        for part in (_normalize(cv_text), _normalize(job_description), model or '', prompt_version or ''):
+            # Length-prefix each part so boundaries can't be shifted between fields
+            encoded = part.encode('utf-8')
+            digest.update(len(encoded).to_bytes(8, 'big'))
+            digest.update(encoded)
+        return digest.hexdigest()
+
+    # ----------------- OPERATIONS -----------------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = None
+        if self.backend == 'redis':
+            try:
+                raw = self._redis().get(KEY_PREFIX + key)
+                value = json.loads(raw) if raw else None
+            except Exception as e:
+                logger.warning("Analysis cache Redis read failed, using memory: %s", e)
+                value = self._memory_get(key)
+        else:
+            value = self._memory_get(key)
+
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        if self.backend == 'redis':
+            try:
+                self._redis().setex(KEY_PREFIX + key, self.ttl_seconds, json.dumps(value))
+                return
+            except Exception as e:
+                logger.warning("Analysis cache Redis write failed, using memory: %s", e)
+        self._memory_set(key, value)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Dict[str, Any]],
+                       cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True) -> Dict[str, Any]:
+        """Return the cached result for ``key`` or compute, store and return it"""
+        cached = self.get(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+        result = compute()
+        if isinstance(result, dict) and cacheable(result):
+            self.set(key, result)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "backend": self.backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    # ----------------- MEMORY BACKEND -----------------
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _memory_set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Process-wide instance shared by the analysis paths
+analysis_cache = AnalysisCache()
@@ -0,0 +1,238 @@
+"""
+Daily rollups behind the /api/analytics blueprint.
+
+``analytics_daily_rollups`` holds one row per (fact, day, requisition, status)
+so the analytics endpoints aggregate a few rows per day instead of rescanning
+applications, assessment_results and interviews on every request.
+
+Rollups are (re)computed a whole day at a time with INSERT ... SELECT ...
+GROUP BY, which keeps the logic in one place for both paths:
+
+- backfill: recompute every day (or a date range) of a fact
+- catch-up: recompute only the days touched since the stored watermark,
+  found through the indexed ``updated_at`` columns. A deletion (seen through
+  the change-feed tombstones) falls back to a full backfill of that fact,
+  since the deleted row's day is no longer known.
+
+Both run from the CLI (``flask catch-up-analytics-rollups`` on a schedule,
+``flask backfill-analytics-rollups``). Requests never recompute: they serve
+the rollups as they are, report the watermark as ``refreshed_at`` and at most
+queue a background catch-up when it lags.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from flask import current_app
+from sqlalchemy import select, func, cast, case, literal, text, Date, distinct
+
+from app.extensions import db
+from app.utils.background import schedule_once
+from app.models import (
+    AnalyticsDailyRollup, AnalyticsRollupState, Application,
+    AssessmentResult, Interview, DeletedRecord
+)
+
+# Arbitrary constant identifying the rollup advisory lock
+ROLLUP_LOCK_KEY = 720_310_002
+PASS_MARK = 50
+
+
+class AnalyticsRollupService:
+    """Service maintaining and reading the daily analytics rollups"""
+
+    FACTS = ('applications', 'assessments', 'interviews')
+
+    # ----------------- SOURCE QUERIES -----------------
+    @staticmethod
+    def _source(fact: str):
+        """Return (source model, grouped SELECT matching the rollup columns, day expression)"""
+        if fact == 'applications':
+            day = cast(Application.created_at, Date)
+            requisition = func.coalesce(Application.requisition_id, 0)
+            status = func.coalesce(Application.status, '')
+            stmt = select(
+                literal(fact), day, requisition, status,
+                func.count(Application.id), literal(0.0), literal(0)
+            ).where(Application.created_at.isnot(None)).group_by(day, requisition, status)
+            return Application, stmt, day
+
+        if fact == 'assessments':
+            day = cast(AssessmentResult.created_at, Date)
+            requisition = func.coalesce(Application.requisition_id, 0)
+            status = case((AssessmentResult.percentage_score >= PASS_MARK, 'passed'), else_='failed')
+            stmt = select(
+                literal(fact), day, requisition, status,
+                func.count(AssessmentResult.id),
+                func.coalesce(func.sum(AssessmentResult.percentage_score), 0.0),
+                func.count(AssessmentResult.percentage_score)
+            ).select_from(AssessmentResult).outerjoin(
+                Application, Application.id == AssessmentResult.application_id
+            ).where(AssessmentResult.created_at.isnot(None)).group_by(day, requisition, status)
+            return AssessmentResult, stmt, day
+
+        if fact == 'interviews':
+            day = cast(Interview.created_at, Date)
+            requisition = func.coalesce(Application.requisition_id, 0)
+            status = func.coalesce(Interview.status, '')
+            stmt = select(
+                literal(fact), day, requisition, status,
+                func.count(Interview.id), literal(0.0), literal(0)
+            ).select_from(Interview).outerjoin(
+                Application, Application.id == Interview.application_id
+            ).where(Interview.created_at.isnot(None)).group_by(day, requisition, status)
+            return Interview, stmt, day
+
+        raise ValueError(f"Unknown rollup fact '{fact}'")
+
+    @staticmethod
+    def _recompute(fact: str, days: Optional[Iterable[date]] = None,
+                   start: Optional[date] = None, end: Optional[date] = None):
+        """Replace the rollup rows of ``fact`` for the given days / range (all days when neither is set)"""
+        model, stmt, day = AnalyticsRollupService._source(fact)
+        rollup = AnalyticsDailyRollup
+
+        delete = rollup.__table__.delete().where(rollup.fact == fact)
+        if days is not None:
+            days = list(days)
+            if not days:
+                return
+            # The created_at range lets the index narrow the scan before the day filter
+            stmt = stmt.where(
+                day.in_(days),
+                model.created_at >= min(days),
+                model.created_at < max(days) + timedelta(days=1)
+            )
+            delete = delete.where(rollup.day.in_(days))
+        if start:
+            stmt = stmt.where(model.created_at >= start)
+            delete = delete.where(rollup.day >= start)
+        if end:
+            stmt = stmt.where(model.created_at < end + timedelta(days=1))
+            delete = delete.where(rollup.day <= end)
+
+        db.session.execute(delete)
+        db.session.execute(rollup.__table__.insert().from_select(
+            ['fact', 'day', 'requisition_id', 'status', 'count', 'score_sum', 'score_count'],
+            stmt
+        ))
+
+    @staticmethod
+    def _lock(wait: bool) -> bool:
+        sql = "SELECT pg_advisory_xact_lock(:key)" if wait else "SELECT pg_try_advisory_xact_lock(:key)"
+        acquired = db.session.execute(text(sql), {'key': ROLLUP_LOCK_KEY}).scalar()
+        return wait or bool(acquired)
+
+    @staticmethod
+    def _set_watermark(fact: str, watermark: datetime):
+        state = db.session.get(AnalyticsRollupState, fact)
+        if state is None:
+            db.session.add(AnalyticsRollupState(fact=fact, watermark=watermark))
+        else:
+            state.watermark = watermark
+
+    @staticmethod
+    def _safe_now() -> datetime:
+        lag = current_app.config.get('CHANGE_FEED_SAFETY_SECONDS', 5)
+        return datetime.utcnow() - timedelta(seconds=lag)
+
+    # ----------------- COMMANDS -----------------
+    @staticmethod
+    def backfill(facts: Optional[Iterable[str]] = None,
+                 start: Optional[date] = None, end: Optional[date] = None) -> Dict[str, str]:
+        """
+        Recompute rollups from scratch (optionally within a date range).
+
+        A full backfill (no range) also resets the catch-up watermark.
+        """
+        result = {}
+        try:
+            AnalyticsRollupService._lock(wait=True)
+            for fact in facts or AnalyticsRollupService.FACTS:
+                until = AnalyticsRollupService._safe_now()
+                AnalyticsRollupService._recompute(fact, start=start, end=end)
+                if start is None and end is None:
+                    AnalyticsRollupService._set_watermark(fact, until)
+                result[fact] = 'backfilled'
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return result
+
+    @staticmethod
+    def catch_up(wait: bool = True) -> Dict[str, str]:
+        """
+        Recompute only the days changed since each fact's watermark.
+
+        Returns:
+            {fact: 'backfilled' | '<n> days' | 'skipped'}
+        """
+        result = {}
+        try:
+            if not AnalyticsRollupService._lock(wait):
+                db.session.rollback()
+                return {fact: 'skipped' for fact in AnalyticsRollupService.FACTS}
+
+            for fact in AnalyticsRollupService.FACTS:
+                model, _, day = AnalyticsRollupService._source(fact)
+                state = db.session.get(AnalyticsRollupState, fact)
+                until = AnalyticsRollupService._safe_now()
+
+                if state is None:
+                    AnalyticsRollupService._recompute(fact)
+                    result[fact] = 'backfilled'
+                else:
+                    deleted = db.session.query(DeletedRecord.id).filter(
+                        DeletedRecord.entity_type == fact,
+                        DeletedRecord.deleted_at > state.watermark,
+                        DeletedRecord.deleted_at <= until
+                    ).first()
+                    if deleted:
+                        AnalyticsRollupService._recompute(fact)
+                        result[fact] = 'backfilled'
+                    else:
+                        days = [
+                            d for (d,) in db.session.query(distinct(day)).filter(
+                                model.updated_at > state.watermark,
+                                model.updated_at <= until,
+                                model.created_at.isnot(None)
+                            )
+                        ]
+                        AnalyticsRollupService._recompute(fact, days=days)
+                        result[fact] = f'{len(days)} days'
+
+                AnalyticsRollupService._set_watermark(fact, until)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return result
+
+    @staticmethod
+    def refreshed_at() -> Optional[datetime]:
+        """
+        Oldest fact watermark, i.e. how current the rollups being served are.
+
+        Never recomputes inline: when the rollups are missing or lag more than
+        ANALYTICS_ROLLUP_MAX_LAG_SECONDS a non-blocking catch-up is queued on
+        the background maintenance thread and the request is served as is.
+        """
+        max_lag = current_app.config.get('ANALYTICS_ROLLUP_MAX_LAG_SECONDS', 300)
+        oldest, states = db.session.query(
+            func.min(AnalyticsRollupState.watermark), func.count(AnalyticsRollupState.fact)
+        ).one()
+        if oldest is None or states < len(AnalyticsRollupService.FACTS) \
+                or (datetime.utcnow() - oldest).total_seconds() > max_lag:
+            schedule_once('analytics-rollups.catch-up', lambda: AnalyticsRollupService.catch_up(wait=False))
+        return oldest if states == len(AnalyticsRollupService.FACTS) else None
+
+    # ----------------- READ HELPERS -----------------
+    @staticmethod
+    def query(fact: str, *columns):
+        """Start a query over one rollup fact"""
+        return db.session.query(*columns).filter(AnalyticsDailyRollup.fact == fact)
+
+    @staticmethod
+    def month():
+        return func.date_trunc('month', AnalyticsDailyRollup.day)
@@ -1,5 +1,6 @@
 from app.extensions import db
 from app.models import Requisition, Application, AssessmentResult
+from app.services.shortlist_service import ShortlistService
 from datetime import datetime
 
 
@@ -98,17 +99,13 @@ class AssessmentService:
     @staticmethod
     def shortlist_candidates(requisition_id, cv_weight=60, assessment_weight=40):
         """
-        Calculate overall score based on CV and assessment.
-        Returns candidates sorted by overall_score descending.
+        Calculate overall score based on CV and assessment, dropping applicants
+        that fail the requisition's knockout rules / minimum experience.
+        Returns applications sorted by overall_score descending.
         """
-        applications = Application.query.filter_by(requisition_id=requisition_id).all()
-        shortlisted = []
-        for app in applications:
-            overall = (
-                (app.candidate.cv_score * cv_weight / 100) +
-                (app.assessment_score * assessment_weight / 100)
-            )
-            app.overall_score = overall
-            db.session.commit()
-            shortlisted.append(app)
-        return sorted(shortlisted, key=lambda x: x.overall_score, reverse=True)
+        result = ShortlistService.rank(
+            requisition_id, weightings={"cv": cv_weight, "assessment": assessment_weight}
+        )
+        ids = [row["application_id"] for row in result["ranked"]]
+        applications = {app.id: app for app in Application.query.filter(Application.id.in_(ids))}
+        return [applications[i] for i in ids]
@@ -0,0 +1,197 @@
+"""
+Normalized candidate skills.
+
+``Candidate.skills`` stays the source of truth (a JSON list), but every write
+to it is mirrored into ``candidate_skills`` (one canonical, case-folded skill
+per row, indexed by skill) and ``skill_frequencies`` (candidates per skill)
+from session flush hooks. That covers enrollment, profile updates and any
+other write path without touching them individually, and lets skill filters
+and the frequency endpoint use index lookups instead of scanning JSON.
+"""
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import and_, event, exists, inspect, select, true, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Candidate, CandidateSkill, SkillFrequency
+
+MAX_SKILL_LENGTH = 100
+_WHITESPACE = re.compile(r'\s+')
+
+
+class CandidateSkillService:
+    """Service keeping candidate_skills / skill_frequencies in sync with Candidate.skills"""
+
+    _hooks_registered = False
+
+    # ----------------- NORMALIZATION -----------------
+    @staticmethod
+    def normalize(skill) -> Optional[str]:
+        """Canonical form of a skill: trimmed, single-spaced and case-folded"""
+        if isinstance(skill, dict):
+            skill = skill.get('name') or skill.get('skill')
+        if not isinstance(skill, str):
+            return None
+        skill = _WHITESPACE.sub(' ', skill).strip().casefold()
+        return skill[:MAX_SKILL_LENGTH] or None
+
+    @staticmethod
+    def normalize_all(skills) -> Set[str]:
+        if not isinstance(skills, list):
+            return set()
+        return {s for s in map(CandidateSkillService.normalize, skills) if s}
+
+    # ----------------- HOOKS -----------------
+    @staticmethod
+    def register_hooks():
+        if CandidateSkillService._hooks_registered:
+            return
+        event.listen(Session, 'before_flush', CandidateSkillService._before_flush)
+        event.listen(Session, 'after_flush', CandidateSkillService._after_flush)
+        CandidateSkillService._hooks_registered = True
+
+    @staticmethod
+    def _before_flush(session, flush_context, instances):
+        # Release deleted candidates' rows through _sync so skill_frequencies
+        # is decremented; the ON DELETE CASCADE only covers deletes made
+        # outside the ORM (fix their counts with rebuild-candidate-skills)
+        ids = [obj.id for obj in session.deleted if isinstance(obj, Candidate) and obj.id is not None]
+        if ids:
+            CandidateSkillService._sync(session.connection(), {candidate_id: set() for candidate_id in ids})
+
+    @staticmethod
+    def _after_flush(session, flush_context):
+        targets = {}
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Candidate) or obj in session.deleted:
+                continue
+            if obj in session.new or inspect(obj).attrs.skills.history.has_changes():
+                targets[obj.id] = CandidateSkillService.normalize_all(obj.skills)
+        if targets:
+            CandidateSkillService._sync(session.connection(), targets)
+
+    @staticmethod
+    def sync_bulk(connection, skills_by_candidate: Dict[int, list]):
+        """Mirror Candidate.skills written outside the ORM (bulk upserts) into candidate_skills"""
+        if skills_by_candidate:
+            CandidateSkillService._sync(connection, {
+                candidate_id: CandidateSkillService.normalize_all(skills)
+                for candidate_id, skills in skills_by_candidate.items()
+            })
+
+    @staticmethod
+    def _sync(connection, targets: Dict[int, Set[str]]):
+        """Diff each candidate's new skill set against candidate_skills and apply the changes"""
+        table = CandidateSkill.__table__
+        current = defaultdict(set)
+        for candidate_id, skill in connection.execute(
+            select(table.c.candidate_id, table.c.skill).where(table.c.candidate_id.in_(list(targets)))
+        ):
+            current[candidate_id].add(skill)
+
+        removed, added = [], []
+        deltas = defaultdict(int)
+        for candidate_id, skills in targets.items():
+            for skill in current[candidate_id] - skills:
+                removed.append((candidate_id, skill))
+                deltas[skill] -= 1
+            for skill in skills - current[candidate_id]:
+                added.append({'candidate_id': candidate_id, 'skill': skill})
+                deltas[skill] += 1
+
+        if removed:
+            connection.execute(table.delete().where(
+                tuple_(table.c.candidate_id, table.c.skill).in_(removed)
+            ))
+        if added:
+            connection.execute(table.insert(), added)
+        CandidateSkillService._apply_frequency_deltas(connection, deltas)
+
+    @staticmethod
+    def _apply_frequency_deltas(connection, deltas: Dict[str, int]):
+        deltas = {skill: delta for skill, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        table = SkillFrequency.__table__
+        stmt = pg_insert(table).values([
+            {'skill': skill, 'candidate_count': delta}
+            for skill, delta in sorted(deltas.items())
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.skill],
+            set_={'candidate_count': table.c.candidate_count + stmt.excluded.candidate_count}
+        )
+        connection.execute(stmt)
+        connection.execute(table.delete().where(
+            table.c.skill.in_(list(deltas)), table.c.candidate_count <= 0
+        ))
+
+    # ----------------- REBUILD -----------------
+    @staticmethod
+    def rebuild(batch_size: int = 2000) -> int:
+        """
+        Repopulate both tables from Candidate.skills (initial backfill or
+        repair after writes that bypassed the ORM).
+
+        Returns:
+            Number of candidate_skills rows written
+        """
+        skills_table = CandidateSkill.__table__
+        freq_table = SkillFrequency.__table__
+        try:
+            db.session.execute(skills_table.delete())
+            db.session.execute(freq_table.delete())
+
+            frequencies = defaultdict(int)
+            written = 0
+            batch: List[Dict] = []
+            for candidate_id, skills in db.session.query(Candidate.id, Candidate.skills).yield_per(batch_size):
+                for skill in CandidateSkillService.normalize_all(skills):
+                    batch.append({'candidate_id': candidate_id, 'skill': skill})
+                    frequencies[skill] += 1
+                if len(batch) >= batch_size:
+                    db.session.execute(skills_table.insert(), batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                db.session.execute(skills_table.insert(), batch)
+                written += len(batch)
+
+            if frequencies:
+                db.session.execute(freq_table.insert(), [
+                    {'skill': skill, 'candidate_count': count} for skill, count in frequencies.items()
+                ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return written
+
+    # ----------------- QUERIES -----------------
+    @staticmethod
+    def frequencies(limit: Optional[int] = None) -> Dict[str, int]:
+        """Return {skill: candidate count}, most common first"""
+        query = SkillFrequency.query.order_by(
+            SkillFrequency.candidate_count.desc(), SkillFrequency.skill
+        )
+        if limit:
+            query = query.limit(limit)
+        return {row.skill: row.candidate_count for row in query}
+
+    @staticmethod
+    def has_skills_filter(skills: Iterable[str], candidate_id_column=Candidate.id):
+        """
+        SQL condition matching candidates that list every given skill, as
+        index-backed EXISTS lookups on candidate_skills.
+        """
+        conditions = []
+        for skill in {CandidateSkillService.normalize(s) for s in skills} - {None}:
+            conditions.append(exists().where(
+                CandidateSkill.candidate_id == candidate_id_column,
+                CandidateSkill.skill == skill
+            ))
+        return and_(*conditions) if conditions else true()
@@ -0,0 +1,170 @@
+"""
+Incremental change feed for Power BI refreshes.
+
+Clients keep a watermark (an ISO timestamp) and ask for everything created,
+modified or deleted after it. Modifications are found through the indexed
+``updated_at`` columns; deletions through ``deleted_records`` tombstones that
+are written in the same flush as the delete.
+
+The window upper bound trails "now" by CHANGE_FEED_SAFETY_SECONDS so rows
+stamped just before a slow commit are not skipped, and when an entity has
+more than ``limit`` changes the window is cut at a timestamp boundary so
+rows sharing the same ``updated_at`` are never split across two pulls.
+"""
+import enum
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Application, AssessmentResult, Interview, Offer, DeletedRecord
+
+
+FEED_ENTITIES = {
+    'applications': (Application, (
+        'id', 'candidate_id', 'requisition_id', 'status', 'is_draft', 'cv_score',
+        'assessment_score', 'overall_score', 'recommendation', 'assessed_date',
+        'interview_status', 'last_interview_date', 'created_at', 'updated_at',
+    )),
+    'assessments': (AssessmentResult, (
+        'id', 'application_id', 'candidate_id', 'total_score', 'percentage_score',
+        'recommendation', 'assessed_at', 'created_at', 'updated_at',
+    )),
+    'interviews': (Interview, (
+        'id', 'candidate_id', 'application_id', 'hiring_manager_id', 'scheduled_time',
+        'interview_type', 'status', 'created_at', 'updated_at',
+    )),
+    'offers': (Offer, (
+        'id', 'application_id', 'status', 'base_salary', 'contract_type', 'start_date',
+        'signed_at', 'created_at', 'updated_at',
+    )),
+}
+
+ENTITY_NAMES = {model: name for name, (model, _) in FEED_ENTITIES.items()}
+
+
+def _json_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+class ChangeFeedService:
+    """Service producing watermark-based deltas for BI consumers"""
+
+    DEFAULT_LIMIT = 5000
+    MAX_LIMIT = 50000
+    _hooks_registered = False
+
+    # ----------------- TOMBSTONES -----------------
+    @staticmethod
+    def register_hooks():
+        """Record a tombstone for every deleted feed entity"""
+        if ChangeFeedService._hooks_registered:
+            return
+        event.listen(Session, 'after_flush', ChangeFeedService._after_flush)
+        ChangeFeedService._hooks_registered = True
+
+    @staticmethod
+    def _after_flush(session, flush_context):
+        now = datetime.utcnow()
+        tombstones = [
+            {'entity_type': ENTITY_NAMES[type(obj)], 'entity_id': obj.id, 'deleted_at': now}
+            for obj in session.deleted
+            if type(obj) in ENTITY_NAMES and obj.id is not None
+        ]
+        if tombstones:
+            session.connection().execute(DeletedRecord.__table__.insert(), tombstones)
+
+    @staticmethod
+    def prune_tombstones(older_than_days: int) -> int:
+        """Delete tombstones older than the given age; returns the number removed"""
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        removed = DeletedRecord.query.filter(DeletedRecord.deleted_at < cutoff).delete(
+            synchronize_session=False
+        )
+        db.session.commit()
+        return removed
+
+    # ----------------- FEED -----------------
+    @staticmethod
+    def _fetch(model, ts_column, columns, since, until, limit):
+        """Return (rows, cut) where cut is set when more than ``limit`` rows changed"""
+        query = db.session.query(*columns).filter(ts_column > since, ts_column <= until)
+        rows = query.order_by(ts_column, model.id).limit(limit + 1).all()
+        if len(rows) <= limit:
+            return rows, None
+
+        # Extend to every row sharing the boundary timestamp
+        cut = getattr(rows[limit - 1], ts_column.key)
+        rows = query.filter(ts_column <= cut).order_by(ts_column, model.id).all()
+        return rows, cut
+
+    @staticmethod
+    def get_changes(since: Optional[datetime], limit: Optional[int] = None) -> Dict:
+        """
+        Collect changes in the window (since, watermark].
+
+        Args:
+            since: Previous watermark; None starts from the beginning
+            limit: Soft cap on rows per entity
+
+        Returns:
+            Dict with the new watermark, has_more flag, changed rows per entity
+            and tombstones for deleted rows
+        """
+        limit = min(limit or ChangeFeedService.DEFAULT_LIMIT, ChangeFeedService.MAX_LIMIT)
+        since = since or datetime(1970, 1, 1)
+        lag = current_app.config.get('CHANGE_FEED_SAFETY_SECONDS', 5)
+        until = datetime.utcnow() - timedelta(seconds=lag)
+        if since >= until:
+            return {"since": since.isoformat(), "watermark": since.isoformat(),
+                    "has_more": False, "changes": {name: [] for name in FEED_ENTITIES}, "deleted": []}
+
+        fetched = {}
+        truncated = False
+        for name, (model, fields) in FEED_ENTITIES.items():
+            columns = [getattr(model, field) for field in fields]
+            rows, cut = ChangeFeedService._fetch(model, model.updated_at, columns, since, until, limit)
+            fetched[name] = rows
+            if cut is not None:
+                until = min(until, cut)
+                truncated = True
+
+        tombstones, cut = ChangeFeedService._fetch(
+            DeletedRecord, DeletedRecord.deleted_at,
+            [DeletedRecord.id, DeletedRecord.entity_type, DeletedRecord.entity_id, DeletedRecord.deleted_at],
+            since, until, limit
+        )
+        if cut is not None:
+            until = min(until, cut)
+            truncated = True
+
+        # Trim everything to the final window so the next pull resumes cleanly
+        changes = {
+            name: [
+                {field: _json_value(getattr(row, field)) for field in FEED_ENTITIES[name][1]}
+                for row in rows if row.updated_at <= until
+            ]
+            for name, rows in fetched.items()
+        }
+        deleted = [
+            {"entity": t.entity_type, "id": t.entity_id, "deleted_at": t.deleted_at.isoformat()}
+            for t in tombstones if t.deleted_at <= until
+        ]
+
+        return {
+            "since": since.isoformat(),
+            "watermark": until.isoformat(),
+            "has_more": truncated,
+            "changes": changes,
+            "deleted": deleted,
+        }
@@ -1,65 +1,147 @@
 # services/chat_service.py
+import base64
+import json
 from datetime import datetime
-from app.models import db, ChatThread, ChatMessage, MessageReadStatus, UserPresence, User
+from sqlalchemy import and_, func, literal, or_, select, true, tuple_
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert as pg_insert
+from app.models import db, ChatThread, ChatMessage, ChatReadCursor, User, chat_participants
 from app.extensions import socketio
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+PREVIEW_LENGTH = 100
+
+
+def encode_cursor(*values) -> str:
+    """Opaque pagination cursor for a sort key (datetimes and ints)"""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """(timestamp, id) from ``encode_cursor``; ValueError when malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except Exception as e:
+        raise ValueError('Invalid cursor') from e
+
 
 class ChatService:
     
     @staticmethod
-    def get_user_threads(user_id: int, entity_type: str = None, entity_id: str = None):
-        """Get all chat threads for a user"""
-        query = ChatThread.query.filter(
-            ChatThread.participants.any(id=user_id),
+    def get_user_threads(user_id: int, entity_type: str = None, entity_id: str = None,
+                         limit: int = None, cursor: str = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        The user's inbox in one statement: each thread with its participants,
+        last message preview and the caller's unread count.
+
+        Threads are ordered by last activity (last_message_at, else
+        created_at) and keyset-paginated on (activity, id): pass the returned
+        cursor back to get the next ``limit`` threads.
+
+        Returns:
+            (threads, next cursor or None)
+        """
+        user_id = int(user_id)
+        me = chat_participants.alias('me')
+        members = chat_participants.alias('members')
+        activity = func.coalesce(ChatThread.last_message_at, ChatThread.created_at)
+
+        participants = select(
+            func.json_agg(aggregate_order_by(func.json_build_object(
+                'user_id', User.id,
+                'name', func.coalesce(User.profile['full_name'].astext, User.email),
+                'email', User.email,
+                'role', User.role,
+                'avatar_url', User.profile['profile_picture'].astext,
+            ), User.id)).label('participants')
+        ).select_from(members.join(User, User.id == members.c.user_id)).where(
+            members.c.chat_thread_id == ChatThread.id
+        ).lateral('participants')
+
+        last_message = select(
+            ChatMessage.id, ChatMessage.sender_id, ChatMessage.content, ChatMessage.message_type,
+            ChatMessage.created_at,
+            func.coalesce(User.profile['full_name'].astext, User.email).label('sender_name'),
+        ).outerjoin(User, User.id == ChatMessage.sender_id).where(
+            ChatMessage.thread_id == ChatThread.id, ChatMessage.is_deleted == False
+        ).order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(1).lateral('last_message')
+
+        unread = select(func.count(ChatMessage.id)).where(
+            ChatMessage.thread_id == ChatThread.id,
+            ChatMessage.sender_id != user_id,
+            ChatMessage.is_deleted == False,
+            ChatMessage.id > func.coalesce(ChatReadCursor.last_read_message_id, 0)
+        ).scalar_subquery()
+
+        query = select(
+            ChatThread, activity.label('activity_at'), participants.c.participants,
+            last_message.c.id.label('last_id'), last_message.c.sender_id.label('last_sender_id'),
+            last_message.c.sender_name.label('last_sender_name'),
+            func.left(last_message.c.content, PREVIEW_LENGTH + 1).label('last_content'),
+            last_message.c.message_type.label('last_type'), last_message.c.created_at.label('last_created_at'),
+            unread.label('unread_count'),
+        ).select_from(ChatThread).join(
+            me, and_(me.c.chat_thread_id == ChatThread.id, me.c.user_id == user_id)
+        ).outerjoin(
+            ChatReadCursor, and_(ChatReadCursor.thread_id == ChatThread.id, ChatReadCursor.user_id == user_id)
+        ).join(participants, true()).outerjoin(last_message, true()).where(
             ChatThread.is_active == True,
             ChatThread.is_archived == False
         )
-        
+
         if entity_type:
-            query = query.filter(ChatThread.entity_type == entity_type)
+            query = query.where(ChatThread.entity_type == entity_type)
         if entity_id:
-            query = query.filter(ChatThread.entity_id == entity_id)
-        
-        threads = query.order_by(
-            db.desc(ChatThread.last_message_at) if ChatThread.last_message_at 
-            else db.desc(ChatThread.updated_at)
-        ).all()
-        
+            query = query.where(ChatThread.entity_id == entity_id)
+        if cursor:
+            query = query.where(tuple_(activity, ChatThread.id) < tuple_(*decode_cursor(cursor)))
+
+        query = query.order_by(activity.desc(), ChatThread.id.desc())
+        if limit:
+            query = query.limit(limit + 1)
+        rows = db.session.execute(query).all()
+
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].activity_at, rows[-1].ChatThread.id)
+
         result = []
-        for thread in threads:
-            thread_dict = thread.to_dict_detailed()
-            
-            # Calculate unread count for this user
-            last_message = thread.messages.first()
-            if last_message:
-                last_read = MessageReadStatus.query.filter_by(
-                    user_id=user_id,
-                    message_id=last_message.id
-                ).first()
-                
-                if last_read:
-                    unread_count = ChatMessage.query.filter(
-                        ChatMessage.thread_id == thread.id,
-                        ChatMessage.created_at > last_read.read_at,
-                        ChatMessage.sender_id != user_id
-                    ).count()
-                else:
-                    unread_count = ChatMessage.query.filter_by(
-                        thread_id=thread.id
-                    ).count()
-                
-                thread_dict['unread_count'] = unread_count
-                
-                # Add last message preview
+        for row in rows:
+            thread = row.ChatThread
+            # Built from the row: to_dict() would lazy-load participants per thread
+            thread_dict = {
+                'id': thread.id,
+                'title': thread.title,
+                'entity_type': thread.entity_type,
+                'entity_id': thread.entity_id,
+                'created_by': thread.created_by,
+                'last_message_at': thread.last_message_at.isoformat() if thread.last_message_at else None,
+                'created_at': thread.created_at.isoformat() if thread.created_at else None,
+                'updated_at': thread.updated_at.isoformat() if thread.updated_at else None,
+                'is_active': thread.is_active,
+                'is_archived': thread.is_archived,
+                'participants': row.participants or [],
+            }
+            thread_dict['participant_count'] = len(thread_dict['participants'])
+            thread_dict['unread_count'] = row.unread_count
+            thread_dict['last_message'] = None
+            if row.last_id is not None:
+                content = row.last_content
                 thread_dict['last_message'] = {
-                    'content': last_message.content[:100] + '...' if len(last_message.content) > 100 else last_message.content,
-                    'sender_id': last_message.sender_id,
-                    'created_at': last_message.created_at.isoformat() if last_message.created_at else None
+                    'id': row.last_id,
+                    'thread_id': thread.id,
+                    'sender_id': row.last_sender_id,
+                    'sender': {'user_id': row.last_sender_id, 'name': row.last_sender_name},
+                    'content': content[:PREVIEW_LENGTH] + '...' if len(content) > PREVIEW_LENGTH else content,
+                    'message_type': row.last_type,
+                    'created_at': row.last_created_at.isoformat() if row.last_created_at else None
                 }
-            
             result.append(thread_dict)
         
-        return result
+        return result, next_cursor
     
     @staticmethod
     def create_thread(title: str, created_by: int, participant_ids: List[int], 
@@ -103,43 +185,118 @@ class ChatService:
         return thread
     
     @staticmethod
-    def get_thread_messages(thread_id: int, user_id: int, limit: int = 50, 
-                           before: datetime = None):
-        """Get messages for a thread with pagination"""
+    def get_thread_messages(thread_id: int, user_id: int, limit: int = 50,
+                           before: str = None, after: str = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        A page of thread history, keyset-paginated on (created_at, id).
+
+        Without cursors this is the newest ``limit`` messages. ``before``
+        pages back into older history; ``after`` pages forward, for catching
+        up from the last message a client saw. Messages are returned oldest
+        first either way.
+
+        Returns:
+            (messages, page) where page holds ``before_cursor`` (older
+            history, None at the start of the thread), ``after_cursor`` (resume
+            point for newer messages) and ``has_more`` in the paging direction
+        """
+        user_id = int(user_id)
         # Verify user has access to thread
         thread = ChatThread.query.get_or_404(thread_id)
         if not any(p.id == user_id for p in thread.participants):
-            return []
+            return [], {'before_cursor': None, 'after_cursor': None, 'has_more': False}
         
+        key = tuple_(ChatMessage.created_at, ChatMessage.id)
         query = ChatMessage.query.filter_by(thread_id=thread_id, is_deleted=False)
         
-        if before:
-            query = query.filter(ChatMessage.created_at < before)
-        
-        messages = query.order_by(db.desc(ChatMessage.created_at)).limit(limit).all()
-        
-        # Mark messages as read for this user
-        unread_messages = [msg for msg in messages 
-                          if msg.sender_id != user_id and 
-                          not MessageReadStatus.query.filter_by(
-                              message_id=msg.id, 
-                              user_id=user_id
-                          ).first()]
+        if after:
+            query = query.filter(key > tuple_(*decode_cursor(after)))
+            query = query.order_by(ChatMessage.created_at, ChatMessage.id)
+        else:
+            if before:
+                query = query.filter(key < tuple_(*decode_cursor(before)))
+            query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()  # Return oldest first
+        
+        page = {'before_cursor': None, 'after_cursor': after, 'has_more': has_more}
+        if messages:
+            oldest, newest = messages[0], messages[-1]
+            # Paging forward starts past a message, so older history always exists
+            if after or has_more:
+                page['before_cursor'] = encode_cursor(oldest.created_at, oldest.id)
+            page['after_cursor'] = encode_cursor(newest.created_at, newest.id)
+            
+            # Advance the read cursor to the newest message fetched (no-op when paging back)
+            ChatService.mark_read(thread_id, user_id, newest.id)
+            db.session.commit()
         
-        for msg in unread_messages:
-            read_status = MessageReadStatus(
-                message_id=msg.id,
-                user_id=user_id
+        return [msg.to_dict() for msg in messages], page
+    
+    @staticmethod
+    def get_missed_messages(user_id: int, since: str = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Messages a reconnecting client missed, across all of its threads.
+
+        With ``since`` (the cursor of the last message the client received)
+        everything after it is replayed; without it, everything past each
+        thread's read cursor that others sent. At most the newest ``limit``
+        messages per thread are returned, in one query; ``truncated`` tells
+        the client to page the rest with ``get_thread_messages``.
+
+        Returns:
+            One entry per thread with missed messages (oldest first) and the
+            ``after_cursor`` to resume from
+        """
+        user_id = int(user_id)
+        me = chat_participants.alias('me')
+        rank = func.row_number().over(
+            partition_by=ChatMessage.thread_id,
+            order_by=(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        )
+        query = select(ChatMessage.id, rank.label('rank')).join(
+            me, and_(me.c.chat_thread_id == ChatMessage.thread_id, me.c.user_id == user_id)
+        ).where(ChatMessage.is_deleted == False)
+        
+        if since:
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) > tuple_(*decode_cursor(since)))
+        else:
+            query = query.outerjoin(
+                ChatReadCursor, and_(ChatReadCursor.thread_id == ChatMessage.thread_id,
+                                     ChatReadCursor.user_id == user_id)
+            ).where(
+                ChatMessage.sender_id != user_id,
+                ChatMessage.id > func.coalesce(ChatReadCursor.last_read_message_id, 0)
             )
-            db.session.add(read_status)
         
-        db.session.commit()
+        ranked = query.subquery()
+        rows = db.session.execute(
+            select(ChatMessage, ranked.c.rank).join(ranked, ranked.c.id == ChatMessage.id)
+            .where(ranked.c.rank <= limit + 1)
+            .order_by(ChatMessage.thread_id, ChatMessage.created_at, ChatMessage.id)
+        ).all()
         
-        return [msg.to_dict() for msg in reversed(messages)]  # Return oldest first
+        threads: Dict[int, Dict[str, Any]] = {}
+        for message, position in rows:
+            entry = threads.setdefault(message.thread_id, {
+                'thread_id': message.thread_id, 'messages': [], 'truncated': False
+            })
+            if position > limit:
+                entry['truncated'] = True
+                continue
+            entry['messages'].append(message.to_dict())
+            entry['after_cursor'] = encode_cursor(message.created_at, message.id)
+        
+        return list(threads.values())
     
     @staticmethod
     def send_message(thread_id: int, sender_id: int, content: str, 
-                    message_type: str = 'text', metadata: dict = None):
+                    message_type: str = 'text', metadata: dict = None,
+                    parent_message_id: int = None):
         """Send a new message"""
         thread = ChatThread.query.get_or_404(thread_id)
         
@@ -152,7 +309,8 @@ class ChatService:
             sender_id=sender_id,
             content=content,
             message_type=message_type,
-            metadata=metadata or {}
+            message_metadata=metadata or {},
+            parent_message_id=parent_message_id
         )
         
         db.session.add(message)
@@ -161,14 +319,9 @@ class ChatService:
         thread.last_message_at = datetime.utcnow()
         thread.updated_at = datetime.utcnow()
         
-        db.session.commit()
-        
-        # Mark as read by sender
-        read_status = MessageReadStatus(
-            message_id=message.id,
-            user_id=sender_id
-        )
-        db.session.add(read_status)
+        # The sender has read their own message; same transaction, one commit
+        db.session.flush()
+        ChatService.mark_read(thread_id, sender_id, message.id)
         db.session.commit()
         
         # Get complete message with sender info
@@ -183,39 +336,60 @@ class ChatService:
         return message
     
     @staticmethod
-    def update_presence(user_id: int, status: str, socket_id: str = None):
-        """Update user presence status"""
-        presence = UserPresence.query.get(user_id)
-        if not presence:
-            presence = UserPresence(user_id=user_id)
-            db.session.add(presence)
-        
-        presence.status = status
-        presence.last_seen = datetime.utcnow()
-        if socket_id:
-            presence.socket_id = socket_id
-        
-        db.session.commit()
-        
-        # Broadcast presence update to all user's chat threads
-        user = User.query.get(user_id)
-        if user:
-            user_threads = user.chat_threads.all()
-            
-            presence_data = {
-                'user_id': user_id,
-                'status': status,
-                'last_seen': presence.last_seen.isoformat(),
-                'user_name': user.profile.get('full_name') if user.profile else user.email
-            }
-            
-            for thread in user_threads:
-                for participant in thread.participants:
-                    if participant.id != user_id:
-                        socketio.emit('presence_update', presence_data, 
-                                    room=f'user_{participant.id}')
-        
-        return presence
+    def mark_read(thread_id: int, user_id: int, message_id: int = None) -> Optional[int]:
+        """
+        Move the user's read cursor in a thread forward to ``message_id``
+        (default: the latest message) with one upsert. The cursor never moves
+        back and only participants get one. Does not commit.
+
+        Returns:
+            The new last-read message id, or None when nothing moved
+        """
+        latest = select(func.max(ChatMessage.id)).where(ChatMessage.thread_id == thread_id)
+        if message_id is not None:
+            latest = latest.where(ChatMessage.id <= message_id)
+        latest = latest.scalar_subquery()
+
+        table = ChatReadCursor.__table__
+        source = select(
+            chat_participants.c.chat_thread_id,
+            chat_participants.c.user_id,
+            latest,
+            literal(datetime.utcnow(), db.DateTime),
+        ).where(
+            chat_participants.c.chat_thread_id == thread_id,
+            chat_participants.c.user_id == user_id,
+            latest.isnot(None),
+        )
+        stmt = pg_insert(table).from_select(
+            ['thread_id', 'user_id', 'last_read_message_id', 'last_read_at'], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.thread_id, table.c.user_id],
+            set_={
+                'last_read_message_id': stmt.excluded.last_read_message_id,
+                'last_read_at': stmt.excluded.last_read_at,
+            },
+            where=table.c.last_read_message_id < stmt.excluded.last_read_message_id,
+        ).returning(table.c.last_read_message_id)
+        return db.session.execute(stmt).scalar()
+    
+    @staticmethod
+    def unread_counts(user_id: int, thread_ids: List[int]) -> Dict[int, int]:
+        """{thread id: messages from others past the user's read cursor} in one query"""
+        if not thread_ids:
+            return {}
+        rows = db.session.query(ChatMessage.thread_id, func.count(ChatMessage.id)).outerjoin(
+            ChatReadCursor,
+            and_(ChatReadCursor.thread_id == ChatMessage.thread_id, ChatReadCursor.user_id == user_id)
+        ).filter(
+            ChatMessage.thread_id.in_(thread_ids),
+            ChatMessage.sender_id != user_id,
+            ChatMessage.is_deleted == False,
+            or_(ChatReadCursor.last_read_message_id.is_(None),
+                ChatMessage.id > ChatReadCursor.last_read_message_id)
+        ).group_by(ChatMessage.thread_id).all()
+        return dict(rows)
     
     @staticmethod
     def search_messages(user_id: int, query: str, thread_id: int = None, 
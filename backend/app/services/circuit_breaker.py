@@ -0,0 +1,149 @@
+"""
+Circuit breaker for calls to the AI provider.
+
+The breaker keeps a sliding window of recent call outcomes. A call counts as
+bad when it fails or takes longer than ``slow_call_seconds``. Once the window
+holds at least ``min_calls`` outcomes and the bad rate reaches
+``failure_rate``, the circuit opens: calls fail immediately with
+CircuitOpenError (callers fall back to offline extraction) instead of
+tying up workers on timeouts and retries.
+
+After ``cooldown_seconds`` the circuit goes half-open and lets a single probe
+through; success closes it, failure re-opens it for another cooldown.
+
+``allow()`` returns a ticket that the caller hands back to ``record()``.
+Tickets carry the breaker generation, which changes on every state
+transition, so only the probe's own outcome can close or re-open a half-open
+circuit, and late results of calls admitted before a transition are ignored.
+A probe that never reports back is replaced after another cooldown.
+
+Latencies of successful calls are also kept so callers can derive a p95
+(used as the hedging delay).
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Failure-rate / slow-call circuit breaker with half-open probing"""
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 10, failure_rate: float = 0.5,
+                 slow_call_seconds: float = 30.0, cooldown_seconds: float = 30.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self._outcomes = deque(maxlen=window)
+        self._latencies = deque(maxlen=200)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._generation = 0
+        self._probe: Optional[int] = None
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, name: str, prefix: str = 'AI_BREAKER') -> 'CircuitBreaker':
+        return cls(
+            name,
+            window=int(os.environ.get(f'{prefix}_WINDOW', '20')),
+            min_calls=int(os.environ.get(f'{prefix}_MIN_CALLS', '10')),
+            failure_rate=float(os.environ.get(f'{prefix}_FAILURE_RATE', '0.5')),
+            slow_call_seconds=float(os.environ.get(f'{prefix}_SLOW_CALL_SECONDS', '30')),
+            cooldown_seconds=float(os.environ.get(f'{prefix}_COOLDOWN_SECONDS', '30')),
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> int:
+        """
+        Reserve a call; raises CircuitOpenError when the call must not be made.
+
+        Returns:
+            Ticket to pass to record() with the call's outcome
+        """
+        with self._lock:
+            if self._state == CLOSED:
+                return self._generation
+            now = time.monotonic()
+            if self._state == OPEN and now - self._opened_at < self.cooldown_seconds:
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            # Cooldown elapsed: admit exactly one probe (replacing one lost for a whole cooldown)
+            if self._probe is not None and now - self._probe_started < self.cooldown_seconds:
+                raise CircuitOpenError(f"{self.name} circuit is half-open (probe in flight)")
+            self._state = HALF_OPEN
+            self._generation += 1
+            self._probe = self._generation
+            self._probe_started = now
+            return self._probe
+
+    def record(self, success: bool, latency: Optional[float] = None, ticket: Optional[int] = None):
+        """Report the outcome of the call allow() returned ``ticket`` for"""
+        bad = not success or (latency is not None and latency >= self.slow_call_seconds)
+        with self._lock:
+            if success and latency is not None:
+                self._latencies.append(latency)
+
+            if ticket != self._generation:
+                # Admitted before the last transition: says nothing about the current state
+                return
+
+            if self._state == HALF_OPEN:
+                self._probe = None
+                if bad:
+                    self._trip()
+                else:
+                    logger.info("%s circuit closed after successful probe", self.name)
+                    self._state = CLOSED
+                    self._generation += 1
+                    self._outcomes.clear()
+                return
+
+            if self._state != CLOSED:
+                return
+            self._outcomes.append(bad)
+            if self._state == CLOSED and len(self._outcomes) >= self.min_calls:
+                rate = sum(self._outcomes) / len(self._outcomes)
+                if rate >= self.failure_rate:
+                    self._trip()
+
+    def _trip(self):
+        logger.warning("%s circuit opened for %.0fs", self.name, self.cooldown_seconds)
+        self._state = OPEN
+        self._generation += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def p95_latency(self, default: float) -> float:
+        """95th percentile of recent successful call latencies (``default`` until enough samples)"""
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < 20:
+            return default
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._latencies.clear()
+            self._generation += 1
+            self._probe = None
@@ -0,0 +1,202 @@
+"""
+Columnar (Parquet / Arrow IPC) export of the recruitment fact and dimension tables.
+
+Rows are streamed from a server-side cursor in ``yield_per`` partitions and
+converted to Arrow record batches one partition at a time, so memory stays
+bounded by the batch size rather than the table size. Output is compressed
+with zstd.
+
+pyarrow is imported lazily so the rest of the app does not pay its import
+cost; a missing install surfaces as a 501 ServiceException.
+"""
+import os
+from typing import BinaryIO, Dict, Iterator, List
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Application, Candidate, Requisition, Interview
+from app.services.powerbi_export_service import PowerBIExportService
+from app.utils.exceptions import ServiceException
+
+
+FORMATS = {
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'arrow': ('.arrow', 'application/vnd.apache.arrow.file'),
+}
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401  (registers pyarrow.parquet)
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ServiceException("Columnar export requires the 'pyarrow' package", code=501)
+    return pyarrow
+
+
+class ColumnarExportService:
+    """Service writing export tables as Parquet or Arrow IPC"""
+
+    TABLES = ('applications', 'candidates', 'requisitions', 'interviews')
+    BATCH_SIZE = 10000
+    COMPRESSION = 'zstd'
+
+    @staticmethod
+    def _table_spec(name: str, pa):
+        """Return (select statement, Arrow schema) for an export table"""
+        ts = pa.timestamp('us')
+
+        if name == 'applications':
+            stmt = PowerBIExportService.fact_statement([]).add_columns(
+                Application.created_at.label('application_created_at')
+            )
+            schema = pa.schema([
+                ('application_id', pa.int64()),
+                ('application_status', pa.string()),
+                ('cv_score', pa.float64()),
+                ('assessment_score', pa.float64()),
+                ('overall_score', pa.float64()),
+                ('recommendation', pa.string()),
+                ('candidate_id', pa.int64()),
+                ('candidate_name', pa.string()),
+                ('candidate_email', pa.string()),
+                ('candidate_verified', pa.bool_()),
+                ('job_id', pa.int64()),
+                ('job_title', pa.string()),
+                ('job_category', pa.string()),
+                ('interview_count', pa.int64()),
+                ('interview_dates', pa.list_(ts)),
+                ('application_created_at', ts),
+            ])
+
+        elif name == 'candidates':
+            stmt = select(
+                Candidate.id, Candidate.user_id, Candidate.full_name, Candidate.title,
+                Candidate.location, Candidate.nationality, Candidate.gender,
+                Candidate.cv_score, Candidate.overall_interview_score,
+            ).order_by(Candidate.id)
+            schema = pa.schema([
+                ('id', pa.int64()),
+                ('user_id', pa.int64()),
+                ('full_name', pa.string()),
+                ('title', pa.string()),
+                ('location', pa.string()),
+                ('nationality', pa.string()),
+                ('gender', pa.string()),
+                ('cv_score', pa.int64()),
+                ('overall_interview_score', pa.float64()),
+            ])
+
+        elif name == 'requisitions':
+            stmt = select(
+                Requisition.id, Requisition.title, Requisition.category, Requisition.vacancy,
+                Requisition.min_experience, Requisition.is_active, Requisition.created_by,
+                Requisition.created_at, Requisition.published_on, Requisition.updated_at,
+            ).order_by(Requisition.id)
+            schema = pa.schema([
+                ('id', pa.int64()),
+                ('title', pa.string()),
+                ('category', pa.string()),
+                ('vacancy', pa.int64()),
+                ('min_experience', pa.float64()),
+                ('is_active', pa.bool_()),
+                ('created_by', pa.int64()),
+                ('created_at', ts),
+                ('published_on', ts),
+                ('updated_at', ts),
+            ])
+
+        elif name == 'interviews':
+            stmt = select(
+                Interview.id, Interview.application_id, Interview.candidate_id,
+                Interview.hiring_manager_id, Interview.scheduled_time, Interview.interview_type,
+                Interview.status, Interview.created_at, Interview.updated_at,
+            ).order_by(Interview.id)
+            schema = pa.schema([
+                ('id', pa.int64()),
+                ('application_id', pa.int64()),
+                ('candidate_id', pa.int64()),
+                ('hiring_manager_id', pa.int64()),
+                ('scheduled_time', ts),
+                ('interview_type', pa.string()),
+                ('status', pa.string()),
+                ('created_at', ts),
+                ('updated_at', ts),
+            ])
+
+        else:
+            raise ServiceException(
+                f"Unknown export table '{name}'. Use one of: {', '.join(ColumnarExportService.TABLES)}"
+            )
+
+        return stmt, schema
+
+    @staticmethod
+    def _record_batches(stmt, schema, pa) -> Iterator:
+        result = db.session.execute(stmt, execution_options={'yield_per': ColumnarExportService.BATCH_SIZE})
+        try:
+            for partition in result.mappings().partitions():
+                rows: List[Dict] = [dict(row) for row in partition]
+                yield pa.RecordBatch.from_pylist(rows, schema=schema)
+        finally:
+            result.close()
+
+    @staticmethod
+    def write_table(name: str, sink: BinaryIO, fmt: str = 'parquet') -> int:
+        """
+        Stream one export table into a binary sink.
+
+        Args:
+            name: One of TABLES
+            sink: Writable binary file object
+            fmt: 'parquet' or 'arrow'
+
+        Returns:
+            Number of rows written
+        """
+        if fmt not in FORMATS:
+            raise ServiceException(f"Invalid format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+        pa = _pyarrow()
+        stmt, schema = ColumnarExportService._table_spec(name, pa)
+
+        if fmt == 'parquet':
+            writer = pa.parquet.ParquetWriter(sink, schema, compression=ColumnarExportService.COMPRESSION)
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=ColumnarExportService.COMPRESSION)
+            writer = pa.ipc.new_file(sink, schema, options=options)
+
+        rows = 0
+        with writer:
+            for batch in ColumnarExportService._record_batches(stmt, schema, pa):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
+
+    @staticmethod
+    def export_to_directory(output_dir: str, tables=None, fmt: str = 'parquet') -> Dict[str, int]:
+        """
+        Write export tables to ``output_dir``, replacing previous files atomically.
+
+        Returns:
+            {table name: rows written}
+        """
+        if fmt not in FORMATS:
+            raise ServiceException(f"Invalid format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+        os.makedirs(output_dir, exist_ok=True)
+        extension = FORMATS[fmt][0]
+
+        written = {}
+        for name in tables or ColumnarExportService.TABLES:
+            path = os.path.join(output_dir, f"{name}{extension}")
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, 'wb') as fh:
+                    written[name] = ColumnarExportService.write_table(name, fh, fmt)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        return written
@@ -0,0 +1,295 @@
+"""
+Bulk CV import (``flask import-cvs <dir|zip>``).
+
+For campus-hiring batches, instead of one HTTP round trip per resume:
+
+- Files (PDF / DOCX / TXT, from a directory tree or a zip) are parsed in a
+  process pool: text extraction plus ``AIParser.offline_extract``.
+- Optionally the text is enriched by the AI provider, fanned out on the
+  shared AI pool so concurrency stays bounded by AI_MAX_CONCURRENCY.
+- Candidates are upserted per batch with one ``INSERT ... ON CONFLICT
+  (cv_hash) DO UPDATE``, so re-importing the same file updates its row
+  rather than duplicating it: fields the new parse missed keep their stored
+  values and ``profile`` keys are merged. Extracted text goes to the
+  extraction store and the row keeps the hash (plus the text whenever the
+  store is unavailable).
+- After each committed batch the imported file names are appended to a
+  checkpoint file; a re-run skips them, so an interrupted import resumes
+  where it stopped (and retries files that failed to parse).
+"""
+import logging
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import case, cast, func, literal_column
+from sqlalchemy.dialects.postgresql import JSON, JSONB, insert as pg_insert
+
+from app.extensions import db
+from app.models import Candidate
+from app.services.ai_cv_parser import AIParser
+from app.services.candidate_skill_service import CandidateSkillService
+from app.services.extraction_store import ExtractionStore, content_hash
+from app.services.text_extraction_service import TextExtractionService
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+# Fields an AI enrichment may fill in on top of the offline extraction
+ENRICHED_FIELDS = ('full_name', 'phone', 'title', 'location', 'bio', 'linkedin', 'github',
+                   'skills', 'education', 'certifications', 'languages')
+LIST_COLUMNS = ('skills', 'education', 'certifications', 'languages')
+# Column length limits of the candidates table
+COLUMN_LIMITS = {'full_name': 150, 'phone': 50, 'title': 100, 'location': 150,
+                 'linkedin': 250, 'github': 250}
+
+
+def _parse_file(name: str, payload, max_pages: int, max_chars: int) -> Dict[str, Any]:
+    """Runs in a pool process: hash, extract and offline-parse one file"""
+    try:
+        if isinstance(payload, str):
+            with open(payload, 'rb') as fh:
+                payload = fh.read()
+        extraction = TextExtractionService.extract_document(payload, name, max_pages, max_chars, inline=True)
+        return {
+            'name': name,
+            'cv_hash': content_hash(payload),
+            'size': len(payload),
+            'extraction': extraction,
+            'fields': AIParser.offline_extract(extraction['text']),
+        }
+    except Exception as e:
+        return {'name': name, 'error': f"{type(e).__name__}: {e}"}
+
+
+class CVImportService:
+    """Service importing resumes in bulk as Candidate rows"""
+
+    # ----------------- SOURCES -----------------
+    @staticmethod
+    def iter_sources(path: str, skip: Set[str] = frozenset()) -> Iterator[Tuple[str, Any]]:
+        """
+        Yield (name, payload) for each supported file in a stable order. The
+        payload is the file path (directories) or its bytes (zip members), and
+        None for names in ``skip``.
+        """
+        if os.path.isfile(path) and zipfile.is_zipfile(path):
+            with zipfile.ZipFile(path) as archive:
+                for info in sorted(archive.infolist(), key=lambda i: i.filename):
+                    if not info.is_dir() and info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                        yield info.filename, None if info.filename in skip else archive.read(info)
+            return
+        if not os.path.isdir(path):
+            raise ValueError(f"{path} is neither a directory nor a zip file")
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    full_path = os.path.join(root, filename)
+                    name = os.path.relpath(full_path, path)
+                    # Pool workers open paths themselves; only the path is pickled
+                    yield name, None if name in skip else full_path
+
+    # ----------------- CHECKPOINT -----------------
+    @staticmethod
+    def default_checkpoint(path: str) -> str:
+        return os.path.abspath(path).rstrip(os.sep) + '.import-checkpoint'
+
+    @staticmethod
+    def load_checkpoint(checkpoint: str) -> Set[str]:
+        if not os.path.exists(checkpoint):
+            return set()
+        with open(checkpoint, encoding='utf-8') as fh:
+            return {line.rstrip('\n') for line in fh if line.strip()}
+
+    @staticmethod
+    def _append_checkpoint(checkpoint: str, names: List[str]):
+        with open(checkpoint, 'a', encoding='utf-8') as fh:
+            fh.writelines(f"{name}\n" for name in names)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    # ----------------- ROWS -----------------
+    @staticmethod
+    def _enrich(parsed: List[Dict[str, Any]]):
+        """Merge AI-extracted fields into the offline ones (AI wins where it found something)"""
+        from app.services.ai_http_client import AIHttpClient
+        from app.services.ai_service import AIService
+
+        service = AIService()
+        results = AIHttpClient.map_concurrent(
+            lambda item: service.extract_profile(item['extraction']['text']), parsed
+        )
+        enriched = 0
+        for item, result in zip(parsed, results):
+            if isinstance(result, Exception) or not result:
+                continue
+            for field in ENRICHED_FIELDS:
+                value = result.get(field)
+                if value and isinstance(value, type(item['fields'].get(field, value))):
+                    item['fields'][field] = value
+            if result.get('email'):
+                item['fields']['email'] = result['email']
+            enriched += 1
+        return enriched
+
+    @staticmethod
+    def _row(item: Dict[str, Any], source: str) -> Dict[str, Any]:
+        fields = item['fields']
+        row = {
+            'cv_hash': item['cv_hash'],
+            'full_name': fields.get('full_name') or None,
+            'phone': fields.get('phone') or None,
+            'title': fields.get('title') or None,
+            'location': fields.get('location') or None,
+            'bio': fields.get('bio') or None,
+            'linkedin': fields.get('linkedin') or None,
+            'github': fields.get('github') or None,
+            'skills': list(fields.get('skills') or []),
+            'education': list(fields.get('education') or []),
+            'certifications': list(fields.get('certifications') or []),
+            'languages': list(fields.get('languages') or []),
+            # The text lives in the extraction store; keep it here when the store missed it
+            'cv_text': None if item.get('stored') else item['extraction']['text'],
+            'profile': {
+                'email': fields.get('email') or '',
+                'import_source': source,
+                'import_file': item['name'],
+                'imported_at': datetime.utcnow().isoformat(),
+            },
+        }
+        for column, limit in COLUMN_LIMITS.items():
+            if isinstance(row[column], str):
+                row[column] = row[column].strip()[:limit]
+        return row
+
+    @staticmethod
+    def _merged(current, imported):
+        """
+        Re-imports fill gaps rather than erase: an offline parse that missed
+        a field keeps the stored value, and profile keys are merged.
+        """
+        if current.name == 'profile':
+            merged = cast(func.coalesce(current, cast('{}', JSON)), JSONB).op('||', return_type=JSONB)(
+                cast(imported, JSONB)
+            )
+            return cast(merged, JSON)
+        if current.name in LIST_COLUMNS:
+            return case((func.json_array_length(imported) > 0, imported), else_=func.coalesce(current, imported))
+        return func.coalesce(imported, current)
+
+    @staticmethod
+    def upsert(rows: List[Dict[str, Any]]) -> Tuple[int, int]:
+        """Insert or update candidates by cv_hash; returns (inserted, updated)"""
+        if not rows:
+            return 0, 0
+        table = Candidate.__table__
+        stmt = pg_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.cv_hash],
+            set_={column: CVImportService._merged(table.c[column], stmt.excluded[column])
+                  for column in rows[0] if column != 'cv_hash'},
+        ).returning(table.c.id, table.c.skills, literal_column('(xmax = 0)').label('inserted'))
+
+        connection = db.session.connection()
+        results = connection.execute(stmt).all()
+        # Core statements skip the ORM flush hooks that maintain candidate_skills
+        CandidateSkillService.sync_bulk(connection, {row.id: row.skills for row in results})
+        inserted = sum(1 for row in results if row.inserted)
+        return inserted, len(results) - inserted
+
+    # ----------------- IMPORT -----------------
+    @staticmethod
+    def import_path(
+        path: str,
+        workers: Optional[int] = None,
+        batch_size: int = 200,
+        use_ai: bool = False,
+        checkpoint: Optional[str] = None,
+        max_pages: int = 20,
+        max_chars: int = 100_000,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Import every supported file under ``path`` (directory or zip).
+
+        Args:
+            workers: Parser processes (defaults to the CPU count)
+            batch_size: Files parsed and upserted per transaction
+            use_ai: Enrich the offline extraction with the AI provider
+            checkpoint: File recording imported names (defaults to <path>.import-checkpoint)
+            progress: Called with the running stats after each batch
+
+        Returns:
+            Stats: files, skipped, parsed, failed, inserted, updated, enriched,
+            seconds, files_per_second, errors (first 20)
+        """
+        checkpoint = checkpoint or CVImportService.default_checkpoint(path)
+        done = CVImportService.load_checkpoint(checkpoint)
+        stats = {'files': 0, 'skipped': 0, 'parsed': 0, 'failed': 0, 'inserted': 0,
+                 'updated': 0, 'enriched': 0, 'seconds': 0.0, 'files_per_second': 0.0, 'errors': []}
+        started = time.monotonic()
+
+        def run_batch(executor, batch):
+            names = [name for name, _ in batch]
+            results = list(executor.map(
+                _parse_file, names, [payload for _, payload in batch],
+                [max_pages] * len(batch), [max_chars] * len(batch),
+            ))
+            parsed = []
+            for item in results:
+                if 'error' in item:
+                    stats['failed'] += 1
+                    if len(stats['errors']) < 20:
+                        stats['errors'].append(f"{item['name']}: {item['error']}")
+                else:
+                    parsed.append(item)
+            stats['parsed'] += len(parsed)
+
+            if use_ai and parsed:
+                stats['enriched'] += CVImportService._enrich(parsed)
+
+            # One row per distinct file: ON CONFLICT cannot touch a row twice in a statement
+            unique = {item['cv_hash']: item for item in parsed}
+            for item in unique.values():
+                item['stored'] = ExtractionStore.put(
+                    item['cv_hash'], item['extraction'], filename=item['name'], size=item['size']
+                )
+            try:
+                inserted, updated = CVImportService.upsert(
+                    [CVImportService._row(item, path) for item in unique.values()]
+                )
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            stats['inserted'] += inserted
+            stats['updated'] += updated
+            # Failed files are left out so a re-run retries them
+            CVImportService._append_checkpoint(checkpoint, [item['name'] for item in parsed])
+
+            stats['files'] += len(batch)
+            stats['seconds'] = round(time.monotonic() - started, 2)
+            stats['files_per_second'] = round(stats['files'] / max(stats['seconds'], 1e-6), 2)
+            if progress:
+                progress(stats)
+
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            batch = []
+            for name, payload in CVImportService.iter_sources(path, done):
+                if payload is None:
+                    stats['skipped'] += 1
+                    continue
+                batch.append((name, payload))
+                if len(batch) >= batch_size:
+                    run_batch(executor, batch)
+                    batch = []
+            if batch:
+                run_batch(executor, batch)
+
+        stats['seconds'] = round(time.monotonic() - started, 2)
+        stats['files_per_second'] = round(stats['files'] / max(stats['seconds'], 1e-6), 2)
+        return stats
@@ -0,0 +1,307 @@
+"""
+Background queue for resume upload + analysis.
+
+``upload_resume`` only stores the file in a ``cv_analysis_jobs`` row and
+enqueues the job id; Cloudinary upload, PDF text extraction and the LLM
+analysis run in a worker, which then updates the application, notifies
+admins and emits ``cv_analysis_complete`` / ``cv_analysis_failed`` to the
+candidate's ``user_<id>`` Socket.IO room.
+
+The job row is the durable part; the queue only carries ids:
+
+- redis: LPUSH / BRPOP on ``cv_jobs:queue``, drained by ``flask cv-worker``;
+  retries wait in the ``cv_jobs:delayed`` sorted set (scored by due time)
+  until the worker moves them onto the queue
+- thread: in-process thread pool, used when Redis is not reachable (or
+  CV_JOB_QUEUE_BACKEND=thread), so the app still works without a worker;
+  retries are resubmitted by a timer
+
+Workers claim a job with a conditional UPDATE (queued -> running, once its
+``not_before`` has passed), so a job id delivered twice is only processed
+once, and ``recover`` re-enqueues jobs left queued or stuck running by a
+crashed worker. A failed attempt is retried after an exponential backoff with
+jitter, so a failing dependency is not hammered by every job at once. A
+partial unique index allows one queued/running job per application.
+"""
+import io
+import logging
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db, socketio
+from app.models import Application, CVAnalysisJob, Notification, User
+from app.services.extraction_store import ExtractionStore, content_hash
+from app.utils.exceptions import ConflictException
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = 'cv_jobs:queue'
+DELAYED_KEY = 'cv_jobs:delayed'
+ACTIVE_STATUSES = ('queued', 'running')
+
+
+class CVJobQueue:
+    """Service queueing and processing resume analysis jobs"""
+
+    MAX_ATTEMPTS = 3
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    # ----------------- BACKEND -----------------
+    @staticmethod
+    def _redis():
+        """Return the redis client when the redis backend is usable, else None"""
+        backend = current_app.config.get('CV_JOB_QUEUE_BACKEND', 'auto')
+        if backend == 'thread':
+            return None
+        from app.extensions import redis_client
+        try:
+            redis_client.ping()
+            return redis_client
+        except Exception as e:
+            if backend == 'redis':
+                raise
+            logger.warning("Redis unavailable, running CV jobs in-process: %s", e)
+            return None
+
+    @staticmethod
+    def enqueue(job_id: str, delay: float = 0):
+        """Queue ``job_id``, to be picked up after ``delay`` seconds"""
+        redis = CVJobQueue._redis()
+        if redis is not None:
+            if delay > 0:
+                redis.zadd(DELAYED_KEY, {job_id: time.time() + delay})
+            else:
+                redis.lpush(QUEUE_KEY, job_id)
+            return
+
+        if delay > 0:
+            app = current_app._get_current_object()
+
+            def resubmit():
+                with app.app_context():
+                    CVJobQueue.enqueue(job_id)
+
+            timer = threading.Timer(delay, resubmit)
+            timer.daemon = True
+            timer.start()
+            return
+
+        if CVJobQueue._executor is None:
+            CVJobQueue._executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('CV_JOB_THREADS', 2), thread_name_prefix='cv-job'
+            )
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    CVJobQueue.process(job_id)
+                finally:
+                    db.session.remove()
+
+        CVJobQueue._executor.submit(run)
+
+    # ----------------- SUBMIT -----------------
+    @staticmethod
+    def active_job(application_id: int) -> Optional[CVAnalysisJob]:
+        return CVAnalysisJob.query.filter(
+            CVAnalysisJob.application_id == application_id,
+            CVAnalysisJob.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    @staticmethod
+    def submit(application: Application, user_id: int, file_storage, resume_text: str = "") -> CVAnalysisJob:
+        """
+        Persist the uploaded file as a job and enqueue it.
+
+        Raises:
+            ConflictException: the application already has a queued or running
+                job (details carry its id and status)
+        """
+        file_data = file_storage.read()
+        job = CVAnalysisJob(
+            id=uuid.uuid4().hex,
+            application_id=application.id,
+            user_id=user_id,
+            filename=file_storage.filename,
+            file_data=file_data,
+            file_hash=content_hash(file_data),
+            resume_text=resume_text or None,
+        )
+        db.session.add(job)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Lost the race against a concurrent upload for the same application
+            db.session.rollback()
+            active = CVJobQueue.active_job(application.id)
+            raise ConflictException("Resume analysis already in progress", details={
+                "job_id": active.id if active else None,
+                "status": active.status if active else None,
+            })
+        CVJobQueue.enqueue(job.id)
+        return job
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with equal jitter for the retry after attempt ``attempts``"""
+        base = current_app.config.get('CV_JOB_RETRY_BASE_SECONDS', 30)
+        backoff = min(base * 2 ** (attempts - 1), current_app.config.get('CV_JOB_RETRY_MAX_SECONDS', 900))
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+    # ----------------- PROCESSING -----------------
+    @staticmethod
+    def _claim(job_id: str) -> Optional[CVAnalysisJob]:
+        now = datetime.utcnow()
+        claimed = CVAnalysisJob.query.filter(
+            CVAnalysisJob.id == job_id, CVAnalysisJob.status == 'queued',
+            or_(CVAnalysisJob.not_before.is_(None), CVAnalysisJob.not_before <= now)
+        ).update({
+            'status': 'running',
+            'started_at': now,
+            'attempts': CVAnalysisJob.attempts + 1,
+        }, synchronize_session=False)
+        db.session.commit()
+        return db.session.get(CVAnalysisJob, job_id) if claimed else None
+
+    @staticmethod
+    def _extract_text(job: CVAnalysisJob) -> str:
+        if job.resume_text:
+            return job.resume_text
+        if not job.file_data:
+            return ""
+        return ExtractionStore.extract(job.file_data, job.filename)["text"]
+
+    @staticmethod
+    def process(job_id: str, detached: bool = False) -> Optional[CVAnalysisJob]:
+        """
+        Run one job if it is still queued; returns the job or None when
+        already taken. ``detached`` marks a worker process, which uploads the
+        resume before linking it (the web processes cannot serve its staging
+        directory).
+        """
+        from app.services.cv_parser_service import HybridResumeAnalyzer
+
+        job = CVJobQueue._claim(job_id)
+        if job is None:
+            return None
+
+        try:
+            application = db.session.get(Application, job.application_id)
+            if application is None:
+                raise ValueError("Application no longer exists")
+
+            upload = io.BytesIO(job.file_data or b"")
+            upload.name = job.filename or "resume"
+            resume_url = HybridResumeAnalyzer.upload_cv(upload, wait=detached)
+            if not resume_url:
+                raise RuntimeError("Failed to upload resume")
+
+            resume_text = CVJobQueue._extract_text(job)
+            parser_result = HybridResumeAnalyzer.analyse(resume_text, application.requisition_id)
+
+            application.resume_url = resume_url
+            application.cv_score = parser_result.get("match_score", 0)
+            application.cv_parser_result = parser_result
+            application.recommendation = parser_result.get("recommendation", "")
+
+            candidate = application.candidate
+            job_title = application.requisition.title if application.requisition else "a job"
+            for admin in User.query.filter_by(role="admin").all():
+                db.session.add(Notification(
+                    user_id=admin.id,
+                    message=f"{candidate.full_name if candidate else 'A candidate'} submitted resume for {job_title}."
+                ))
+
+            job.status = 'completed'
+            job.result = {
+                "cv_score": application.cv_score,
+                "missing_skills": parser_result.get("missing_skills", []),
+                "suggestions": parser_result.get("suggestions", []),
+                "recommendation": application.recommendation,
+                "resume_url": resume_url,
+                "raw_parser_text": parser_result.get("raw_text", ""),
+            }
+            job.error = None
+            job.file_data = None
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            socketio.emit('cv_analysis_complete', job.to_dict(), room=f'user_{job.user_id}')
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"CV job {job_id} failed (attempt {job.attempts}): {e}", exc_info=True)
+            job = db.session.get(CVAnalysisJob, job_id)
+            job.error = str(e)[:2000]
+            if job.attempts < CVJobQueue.MAX_ATTEMPTS:
+                delay = CVJobQueue.retry_delay(job.attempts)
+                job.status = 'queued'
+                job.not_before = datetime.utcnow() + timedelta(seconds=delay)
+                db.session.commit()
+                CVJobQueue.enqueue(job_id, delay=delay)
+            else:
+                job.status = 'failed'
+                job.file_data = None
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                socketio.emit('cv_analysis_failed', job.to_dict(), room=f'user_{job.user_id}')
+        return job
+
+    # ----------------- WORKER -----------------
+    @staticmethod
+    def recover(stale_after_seconds: int = 900) -> int:
+        """Requeue jobs stuck running past the stale limit and re-enqueue every queued job"""
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        CVAnalysisJob.query.filter(
+            CVAnalysisJob.status == 'running', CVAnalysisJob.started_at < cutoff
+        ).update({'status': 'queued'}, synchronize_session=False)
+        db.session.commit()
+
+        now = datetime.utcnow()
+        jobs = db.session.query(CVAnalysisJob.id, CVAnalysisJob.not_before).filter(
+            CVAnalysisJob.status == 'queued'
+        ).order_by(CVAnalysisJob.created_at).all()
+        for job_id, not_before in jobs:
+            CVJobQueue.enqueue(job_id, delay=(not_before - now).total_seconds() if not_before else 0)
+        return len(jobs)
+
+    @staticmethod
+    def _promote_due(redis) -> int:
+        """Move delayed retries whose time has come onto the work queue"""
+        moved = 0
+        for job_id in redis.zrangebyscore(DELAYED_KEY, 0, time.time()):
+            # ZREM decides which worker moves it when several poll at once
+            if redis.zrem(DELAYED_KEY, job_id):
+                redis.lpush(QUEUE_KEY, job_id)
+                moved += 1
+        return moved
+
+    @staticmethod
+    def work(poll_timeout: int = 5, max_jobs: Optional[int] = None) -> int:
+        """Block on the Redis queue and process jobs; returns the number processed"""
+        redis = CVJobQueue._redis()
+        if redis is None:
+            raise RuntimeError("cv-worker needs Redis; without it jobs run inside the web process")
+
+        processed = 0
+        while max_jobs is None or processed < max_jobs:
+            CVJobQueue._promote_due(redis)
+            item = redis.brpop(QUEUE_KEY, timeout=poll_timeout)
+            if item is None:
+                continue
+            _, job_id = item
+            try:
+                if CVJobQueue.process(job_id, detached=True) is not None:
+                    processed += 1
+            finally:
+                db.session.remove()
+        return processed
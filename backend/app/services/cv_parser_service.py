@@ -1,17 +1,28 @@
+import logging
 import re
 import os
+import time
+from functools import lru_cache
 from dotenv import load_dotenv
 from openai import OpenAI
 from app.models import Requisition
-from cloudinary.uploader import upload as cloudinary_upload
+from app.services.analysis_cache import analysis_cache
+from app.services.ai_http_client import ai_breaker
 from unittest.mock import MagicMock
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 
+HYBRID_MODEL = "openrouter/auto"
+# Bump whenever the analyse_resume prompt changes so cached results miss
+HYBRID_PROMPT_VERSION = "hybrid-resume/v1"
 
+
+@lru_cache(maxsize=1)
 def get_openai_client():
     """
-    Returns a configured OpenAI/OpenRouter client.
+    Returns a configured OpenAI/OpenRouter client, shared so its connection
+    pool (keep-alive) is reused across analyses.
     If API key is missing (e.g., in tests), returns a mock client.
     """
     api_key = os.getenv("OPENROUTER_API_KEY")
@@ -36,17 +47,13 @@ def get_openai_client():
 
 class HybridResumeAnalyzer:
     @staticmethod
-    def upload_cv(file):
-        """Upload resume file to Cloudinary and return secure URL."""
+    def upload_cv(file, wait=False):
+        """Stage the resume file for storage and return its URL (upload runs in the background unless ``wait``)."""
+        from app.services.storage_service import StorageService
         try:
-            result = cloudinary_upload(
-                file,
-                resource_type="raw",
-                folder="candidate_cvs"
-            )
-            return result.get("secure_url")
+            return StorageService.store(file, folder="candidate_cvs", wait=wait)
         except Exception as e:
-            print("Cloudinary Upload Error:", e)
+            logger.error("Resume storage error: %s", e, exc_info=True)
             return None
 
     @staticmethod
@@ -67,6 +74,24 @@ class HybridResumeAnalyzer:
 
         job_description = job.description or ""
 
+        try:
+            key = analysis_cache.make_key(resume_content, job_description, HYBRID_MODEL, HYBRID_PROMPT_VERSION)
+            return analysis_cache.get_or_compute(
+                key, lambda: HybridResumeAnalyzer._run_analysis(resume_content, job_description)
+            )
+        except Exception as e:
+            # Provider down or circuit open: keyword match instead of a zero score
+            from app.services.ai_cv_parser import AIParser
+            result = AIParser.offline_match(resume_content, job_description, job.required_skills)
+            result["raw_text"] = f"Error during analysis: {str(e)}"
+            return result
+
+    # Entry point used by the upload and enrollment paths
+    analyse = analyse_resume
+
+    @staticmethod
+    def _run_analysis(resume_content, job_description):
+        """Call the model and parse its reply; raises on failure so errors are never cached."""
         # Construct prompt
         prompt = f"""
 Resume:
@@ -89,12 +114,15 @@ Suggestions:
 - ...
 """
 
-        try:
-            # Lazy client
-            openai_client = get_openai_client()
+        # Lazy client
+        openai_client = get_openai_client()
 
+        # Same breaker as AIService: fail fast while OpenRouter is unhealthy
+        ticket = ai_breaker.allow()
+        started = time.monotonic()
+        try:
             response = openai_client.chat.completions.create(
-                model="openrouter/auto",
+                model=HYBRID_MODEL,
                 messages=[
                     {"role": "system", "content": "You are an AI recruitment assistant. Always return results in the required format only."},
                     {"role": "user", "content": prompt}
@@ -103,36 +131,32 @@ Suggestions:
                 top_p=0.9,
                 max_tokens=1024
             )
-
-            text = response.choices[0].message.content or ""
-
-            # --- Parsing ---
-            score_match = re.search(r"(\d{1,3})(?:/100|%)", text)
-            match_score = int(score_match.group(1)) if score_match else 0
-
-            missing_skills_match = re.search(r"Missing Skills:\s*(.*?)(?:Suggestions:|$)", text, re.DOTALL)
-            missing_skills = []
-            if missing_skills_match:
-                skills_text = missing_skills_match.group(1)
-                missing_skills = [line.strip("- ").strip() for line in skills_text.strip().splitlines() if line.strip()]
-
-            suggestions_match = re.search(r"Suggestions:\s*(.*)", text, re.DOTALL)
-            suggestions = []
-            if suggestions_match:
-                suggestions_text = suggestions_match.group(1)
-                suggestions = [line.strip("- ").strip() for line in suggestions_text.strip().splitlines() if line.strip()]
-
-            return {
-                "match_score": match_score,
-                "missing_skills": missing_skills,
-                "suggestions": suggestions,
-                "raw_text": text
-            }
-
-        except Exception as e:
-            return {
-                "match_score": 0,
-                "missing_skills": [],
-                "suggestions": [],
-                "raw_text": f"Error during analysis: {str(e)}"
-            }
+        except Exception:
+            ai_breaker.record(False, ticket=ticket)
+            raise
+        ai_breaker.record(True, time.monotonic() - started, ticket=ticket)
+
+        text = response.choices[0].message.content or ""
+
+        # --- Parsing ---
+        score_match = re.search(r"(\d{1,3})(?:/100|%)", text)
+        match_score = int(score_match.group(1)) if score_match else 0
+
+        missing_skills_match = re.search(r"Missing Skills:\s*(.*?)(?:Suggestions:|$)", text, re.DOTALL)
+        missing_skills = []
+        if missing_skills_match:
+            skills_text = missing_skills_match.group(1)
+            missing_skills = [line.strip("- ").strip() for line in skills_text.strip().splitlines() if line.strip()]
+
+        suggestions_match = re.search(r"Suggestions:\s*(.*)", text, re.DOTALL)
+        suggestions = []
+        if suggestions_match:
+            suggestions_text = suggestions_match.group(1)
+            suggestions = [line.strip("- ").strip() for line in suggestions_text.strip().splitlines() if line.strip()]
+
+        return {
+            "match_score": match_score,
+            "missing_skills": missing_skills,
+            "suggestions": suggestions,
+            "raw_text": text
+        }
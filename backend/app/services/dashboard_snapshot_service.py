@@ -0,0 +1,433 @@
+"""
+Materialized dashboard counters.
+
+The admin dashboard and pipeline header endpoints used to issue a dozen
+COUNT(*) / AVG() scans per request. Instead, every tracked model contributes
+a small set of (metric, bucket, value) deltas that are appended to
+``dashboard_snapshot_deltas`` inside the same transaction as the write, so the
+endpoints only read a few hundred pre-aggregated rows.
+
+Writers only ever insert delta rows, so concurrent transactions never queue on
+the same counter. Reads sum ``dashboard_snapshot`` and the pending deltas;
+``compact()`` folds the deltas into the snapshot rows in the background.
+
+Buckets are '' for all-time totals or a YYYY-MM-DD day for counters that back
+rolling windows ("last 7 days", "today", "upcoming"). Anything that bypasses
+the ORM (bulk ``query.update()``, raw SQL) is corrected by ``rebuild()``, which
+runs from ``flask rebuild-dashboard-snapshot`` and in a background thread once
+the last rebuild is older than DASHBOARD_SNAPSHOT_RECONCILE_SECONDS. Requests
+never rebuild or compact themselves; they serve what is there along with its
+``rebuilt_at``.
+"""
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import delete, event, func, inspect, literal, or_, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.utils.background import schedule_once
+from app.models import (
+    DashboardSnapshot, DashboardSnapshotDelta, User, Candidate, Requisition, Application,
+    Interview, Offer, AuditLog
+)
+
+Delta = Tuple[str, str, float]
+
+TOTAL = ''
+REBUILT_AT = '_meta.rebuilt_at'
+# Arbitrary constant identifying the advisory lock held by rebuild and compact
+REBUILD_LOCK_KEY = 720_310_001
+
+
+def _day(value: Optional[datetime]) -> Optional[str]:
+    return value.date().isoformat() if value else None
+
+
+def _epoch(value: datetime) -> float:
+    """Seconds since the epoch for a naive UTC datetime"""
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def _enum_value(value):
+    return getattr(value, 'value', value)
+
+
+# ----------------- METRIC CONTRIBUTIONS -----------------
+# Each function maps the tracked column values of a single row to the
+# counters that row contributes to. Inserts add them, deletes subtract them
+# and updates subtract the old row's contribution and add the new one.
+
+def _user_metrics(row) -> List[Delta]:
+    deltas = [('users.total', TOTAL, 1)]
+    if row['created_at']:
+        deltas.append(('users.created', _day(row['created_at']), 1))
+    return deltas
+
+
+def _candidate_metrics(row) -> List[Delta]:
+    return [('candidates.total', TOTAL, 1)]
+
+
+def _requisition_metrics(row) -> List[Delta]:
+    deltas = [('requisitions.total', TOTAL, 1)]
+    if row['created_at']:
+        deltas.append(('requisitions.created', _day(row['created_at']), 1))
+    return deltas
+
+
+def _application_metrics(row) -> List[Delta]:
+    status = row['status']
+    created_at = row['created_at']
+    deltas = [('applications.total', TOTAL, 1)]
+    if status:
+        deltas.append((f'applications.status.{status}', TOTAL, 1))
+    if created_at:
+        deltas.append(('applications.created', _day(created_at), 1))
+    if row['cv_score'] is not None:
+        deltas.append(('applications.cv_score.sum', TOTAL, row['cv_score']))
+        deltas.append(('applications.cv_score.count', TOTAL, 1))
+    if row['assessment_score'] is not None:
+        deltas.append(('applications.assessment_score.sum', TOTAL, row['assessment_score']))
+        deltas.append(('applications.assessment_score.count', TOTAL, 1))
+    if status == 'hired' and created_at:
+        deltas.append(('applications.hired.created', _day(created_at), 1))
+        # avg(now - created_at) == now - avg(created_at), so the epoch sum
+        # is enough to serve time-to-hire without scanning hired rows
+        deltas.append(('applications.hired.created_epoch.sum', TOTAL, _epoch(created_at)))
+        deltas.append(('applications.hired.created_epoch.count', TOTAL, 1))
+    return deltas
+
+
+def _interview_metrics(row) -> List[Delta]:
+    status = row['status']
+    deltas = [('interviews.total', TOTAL, 1)]
+    if status:
+        deltas.append((f'interviews.status.{status}', TOTAL, 1))
+    if row['created_at']:
+        deltas.append(('interviews.created', _day(row['created_at']), 1))
+    if status == 'scheduled' and row['scheduled_time']:
+        deltas.append(('interviews.scheduled_on', _day(row['scheduled_time']), 1))
+    return deltas
+
+
+def _offer_metrics(row) -> List[Delta]:
+    status = _enum_value(row['status'])
+    deltas = [('offers.total', TOTAL, 1)]
+    if status:
+        deltas.append((f'offers.status.{status}', TOTAL, 1))
+    if row['created_at']:
+        deltas.append(('offers.created', _day(row['created_at']), 1))
+    return deltas
+
+
+def _audit_metrics(row) -> List[Delta]:
+    return [('audits.total', TOTAL, 1)]
+
+
+TRACKED = {
+    User: (('created_at',), _user_metrics),
+    Candidate: ((), _candidate_metrics),
+    Requisition: (('created_at',), _requisition_metrics),
+    Application: (('status', 'created_at', 'cv_score', 'assessment_score'), _application_metrics),
+    Interview: (('status', 'created_at', 'scheduled_time'), _interview_metrics),
+    Offer: (('status', 'created_at'), _offer_metrics),
+    AuditLog: ((), _audit_metrics),
+}
+
+
+class DashboardCounters:
+    """Read-only view over a loaded snapshot"""
+
+    def __init__(self, rows: List, today):
+        self.today = today
+        self._values: Dict[Tuple[str, str], float] = {}
+        self.rebuilt_at = None
+        self.updated_at = None
+
+        for row in rows:
+            if row.metric == REBUILT_AT:
+                self.rebuilt_at = datetime.fromtimestamp(row.value, timezone.utc).replace(tzinfo=None)
+                continue
+            self._values[(row.metric, row.bucket)] = row.value
+            if row.updated_at and (self.updated_at is None or row.updated_at > self.updated_at):
+                self.updated_at = row.updated_at
+
+    def total(self, metric: str) -> int:
+        return int(round(self._values.get((metric, TOTAL), 0)))
+
+    def totals_by_suffix(self, prefix: str) -> Dict[str, int]:
+        """Return {suffix: total} for every non-zero all-time metric starting with ``prefix``"""
+        return {
+            metric[len(prefix):]: int(round(value))
+            for (metric, bucket), value in self._values.items()
+            if bucket == TOTAL and metric.startswith(prefix) and value
+        }
+
+    def value(self, metric: str) -> float:
+        return self._values.get((metric, TOTAL), 0.0)
+
+    def window(self, metric: str, days: Optional[int] = None, upcoming: bool = False) -> int:
+        """
+        Sum the daily buckets of ``metric``.
+
+        ``days=N`` covers the last N calendar days including today, ``days=1``
+        is today only and ``upcoming=True`` covers today and every later day.
+        """
+        if upcoming:
+            start, end = self.today.isoformat(), None
+        else:
+            start = (self.today - timedelta(days=(days or 1) - 1)).isoformat()
+            end = self.today.isoformat()
+
+        total = 0.0
+        for (name, bucket), value in self._values.items():
+            if name != metric or bucket == TOTAL or bucket < start:
+                continue
+            if end is not None and bucket > end:
+                continue
+            total += value
+        return int(round(total))
+
+    def average(self, sum_metric: str, count_metric: str) -> float:
+        count = self.value(count_metric)
+        return self.value(sum_metric) / count if count else 0
+
+    def days_since_average(self, sum_metric: str, count_metric: str) -> Optional[float]:
+        """Average age in days of the rows behind an epoch sum/count pair"""
+        count = self.value(count_metric)
+        if not count:
+            return None
+        return (_epoch(datetime.utcnow()) - self.value(sum_metric) / count) / 86400
+
+    def meta(self) -> Dict:
+        """Staleness information returned alongside snapshot-backed stats"""
+        now = datetime.utcnow()
+        return {
+            "rebuilt_at": self.rebuilt_at.isoformat() if self.rebuilt_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "seconds_since_rebuild": int((now - self.rebuilt_at).total_seconds()) if self.rebuilt_at else None,
+        }
+
+
+class DashboardSnapshotService:
+    """Service maintaining and reading the materialized dashboard snapshot"""
+
+    WINDOW_DAYS = 30
+    _hooks_registered = False
+    _last_compacted = 0.0
+
+    # ----------------- INCREMENTAL MAINTENANCE -----------------
+    @staticmethod
+    def register_hooks():
+        """Attach the flush listener that keeps the snapshot current"""
+        if DashboardSnapshotService._hooks_registered:
+            return
+
+        event.listen(Session, 'after_flush', DashboardSnapshotService._after_flush)
+
+        # active_history makes SQLAlchemy load the previous value when an
+        # expired attribute is assigned, so updates can retract it exactly
+        for model, (attrs, _) in TRACKED.items():
+            for attr in attrs:
+                event.listen(getattr(model, attr), 'set', _noop_set, active_history=True)
+
+        DashboardSnapshotService._hooks_registered = True
+
+    @staticmethod
+    def _row_values(obj, attrs, old: bool) -> Dict:
+        state = inspect(obj)
+        values = {}
+        for attr in attrs:
+            history = state.attrs[attr].history
+            if old:
+                chosen = history.deleted or history.unchanged
+            else:
+                chosen = history.added or history.unchanged
+            if not old:
+                # The row has just been flushed, so defaults are populated
+                # and expired attributes can still be loaded
+                values[attr] = chosen[0] if chosen else getattr(obj, attr)
+            else:
+                values[attr] = chosen[0] if chosen else None
+        return values
+
+    @staticmethod
+    def _after_flush(session, flush_context):
+        deltas = defaultdict(float)
+
+        def apply(obj, sign, old):
+            attrs, metrics = TRACKED[type(obj)]
+            for metric, bucket, value in metrics(DashboardSnapshotService._row_values(obj, attrs, old)):
+                deltas[(metric, bucket)] += sign * value
+
+        for obj in session.new:
+            if type(obj) in TRACKED:
+                apply(obj, 1, old=False)
+
+        for obj in session.deleted:
+            if type(obj) in TRACKED:
+                apply(obj, -1, old=True)
+
+        for obj in session.dirty:
+            if type(obj) not in TRACKED or obj in session.deleted:
+                continue
+            attrs, _ = TRACKED[type(obj)]
+            state = inspect(obj)
+            if not any(state.attrs[attr].history.has_changes() for attr in attrs):
+                continue
+            apply(obj, -1, old=True)
+            apply(obj, 1, old=False)
+
+        deltas = {key: value for key, value in deltas.items() if value}
+        if deltas:
+            DashboardSnapshotService._apply_deltas(session.connection(), deltas)
+
+    @staticmethod
+    def _apply_deltas(connection, deltas: Dict[Tuple[str, str], float]):
+        """Append counter deltas (plain inserts: no row shared with other writers)"""
+        now = datetime.utcnow()
+        connection.execute(DashboardSnapshotDelta.__table__.insert(), [
+            {'metric': metric, 'bucket': bucket, 'value': value, 'created_at': now}
+            for (metric, bucket), value in deltas.items()
+        ])
+
+    # ----------------- MAINTENANCE (CLI / BACKGROUND) -----------------
+    @staticmethod
+    def _locked(connection, wait: bool) -> bool:
+        """Take the session-level maintenance lock on ``connection``"""
+        lock_sql = "SELECT pg_advisory_lock(:key)" if wait else "SELECT pg_try_advisory_lock(:key)"
+        acquired = connection.execute(text(lock_sql), {'key': REBUILD_LOCK_KEY}).scalar()
+        connection.commit()
+        return wait or bool(acquired)
+
+    @staticmethod
+    def _unlock(connection):
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {'key': REBUILD_LOCK_KEY})
+        connection.commit()
+
+    @staticmethod
+    def rebuild(wait: bool = True) -> bool:
+        """
+        Recompute every counter from the source tables and replace the snapshot.
+
+        Runs in one REPEATABLE READ transaction on its own connection: the
+        recount and the deltas it deletes come from the same database
+        snapshot, so every delta committed before it is counted once and
+        later ones stay pending. Writers are never blocked.
+
+        Args:
+            wait: Block on a concurrent rebuild or compaction instead of skipping
+
+        Returns:
+            True if the snapshot was rebuilt, False if another run held the lock
+        """
+        with db.engine.connect() as connection:
+            if not DashboardSnapshotService._locked(connection, wait):
+                return False
+            try:
+                connection.execution_options(isolation_level='REPEATABLE READ')
+                with connection.begin():
+                    totals = defaultdict(float)
+                    for model, (attrs, metrics) in TRACKED.items():
+                        columns = [getattr(model, attr) for attr in attrs] or [model.id]
+                        result = connection.execute(select(*columns).execution_options(yield_per=5000))
+                        for row in result:
+                            for metric, bucket, value in metrics(row._mapping):
+                                totals[(metric, bucket)] += value
+
+                    now = datetime.utcnow()
+                    rows = [
+                        {'metric': metric, 'bucket': bucket, 'value': value, 'updated_at': now}
+                        for (metric, bucket), value in totals.items() if value
+                    ]
+                    rows.append({'metric': REBUILT_AT, 'bucket': TOTAL, 'value': _epoch(now), 'updated_at': now})
+
+                    table = DashboardSnapshot.__table__
+                    connection.execute(DashboardSnapshotDelta.__table__.delete())
+                    connection.execute(table.delete())
+                    connection.execute(table.insert(), rows)
+            finally:
+                DashboardSnapshotService._unlock(connection)
+        return True
+
+    @staticmethod
+    def compact() -> bool:
+        """
+        Fold pending deltas into the snapshot rows in one statement; skipped
+        (False) while a rebuild or another compaction holds the lock.
+        """
+        deltas = DashboardSnapshotDelta.__table__
+        table = DashboardSnapshot.__table__
+        moved = delete(deltas).returning(deltas.c.metric, deltas.c.bucket, deltas.c.value).cte('moved')
+        stmt = pg_insert(table).from_select(
+            ['metric', 'bucket', 'value', 'updated_at'],
+            select(moved.c.metric, moved.c.bucket, func.sum(moved.c.value), literal(datetime.utcnow()))
+            .group_by(moved.c.metric, moved.c.bucket)
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.metric, table.c.bucket],
+            set_={'value': table.c.value + stmt.excluded.value, 'updated_at': stmt.excluded.updated_at},
+        ).add_cte(moved)
+
+        with db.engine.connect() as connection:
+            if not DashboardSnapshotService._locked(connection, wait=False):
+                return False
+            try:
+                connection.execute(stmt)
+                connection.commit()
+            finally:
+                DashboardSnapshotService._unlock(connection)
+        DashboardSnapshotService._last_compacted = time.monotonic()
+        return True
+
+    @staticmethod
+    def _schedule(name: str, task: Callable[[], bool]):
+        """Run ``task`` on the background maintenance thread unless it is already queued"""
+        schedule_once(f'dashboard-snapshot.{name}', task)
+
+    # ----------------- READ -----------------
+    @staticmethod
+    def load() -> DashboardCounters:
+        """
+        Load all-time totals and the daily buckets needed for rolling windows
+        (snapshot rows plus pending deltas).
+
+        Never rebuilds inline: a missing or stale snapshot (older than
+        DASHBOARD_SNAPSHOT_RECONCILE_SECONDS) schedules a background rebuild,
+        and the counters report ``rebuilt_at`` so callers can tell.
+        """
+        rebuilt_at = db.session.query(DashboardSnapshot.value).filter_by(
+            metric=REBUILT_AT, bucket=TOTAL
+        ).scalar()
+        max_age = current_app.config.get('DASHBOARD_SNAPSHOT_RECONCILE_SECONDS', 3600)
+        compact_every = current_app.config.get('DASHBOARD_SNAPSHOT_COMPACT_SECONDS', 60)
+        if rebuilt_at is None or _epoch(datetime.utcnow()) - rebuilt_at > max_age:
+            DashboardSnapshotService._schedule('rebuild', lambda: DashboardSnapshotService.rebuild(wait=False))
+        elif time.monotonic() - DashboardSnapshotService._last_compacted > compact_every:
+            DashboardSnapshotService._schedule('compact', DashboardSnapshotService.compact)
+
+        today = datetime.utcnow().date()
+        since = (today - timedelta(days=DashboardSnapshotService.WINDOW_DAYS)).isoformat()
+        snapshot, deltas = DashboardSnapshot.__table__, DashboardSnapshotDelta.__table__
+        combined = union_all(
+            select(snapshot.c.metric, snapshot.c.bucket, snapshot.c.value, snapshot.c.updated_at),
+            select(deltas.c.metric, deltas.c.bucket, deltas.c.value, deltas.c.created_at),
+        ).subquery()
+        rows = db.session.execute(
+            select(
+                combined.c.metric, combined.c.bucket,
+                func.sum(combined.c.value).label('value'), func.max(combined.c.updated_at).label('updated_at'),
+            ).where(
+                or_(combined.c.bucket == TOTAL, combined.c.bucket >= since)
+            ).group_by(combined.c.metric, combined.c.bucket)
+        ).all()
+        return DashboardCounters(rows, today)
+
+
+def _noop_set(target, value, oldvalue, initiator):
+    return value
@@ -38,6 +38,8 @@ class EnrollmentService:
         "cover_letter",
         "profile_picture",
         "cv_url",
+        # Kept in full: Candidate.cv_hash is the unique key of bulk imports,
+        # so accounts uploading the same file cannot share it
         "cv_text",
     }
 
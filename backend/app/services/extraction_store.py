@@ -0,0 +1,150 @@
+"""
+Content-addressed store of extracted CV text, kept in MongoDB.
+
+Documents in ``cv_extractions`` are keyed (``_id``) by the SHA-256 of the
+uploaded file's bytes and hold the extracted text, page count and parser
+metadata. A file is therefore parsed once no matter how often it comes back
+through resume uploads, enrollment or ``/api/auth/cv/parse``; SQL rows keep
+the 64-character hash, and the text too whenever ``put`` could not confirm
+the write.
+
+Pasted CV text is stored the same way under the hash of its UTF-8 bytes
+(format 'text'), so analysis rows can reference it by hash too.
+
+Mongo is an accelerator, not a dependency: when it is unreachable the text
+is extracted as before and lookups are skipped for a short back-off period.
+"""
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.text_extraction_service import TextExtractionService
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = 'cv_extractions'
+# Bump when extraction output changes so older documents are re-parsed
+EXTRACTOR_VERSION = 1
+BACKOFF_SECONDS = 60
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExtractionStore:
+    """Service caching extracted CV text by content hash"""
+
+    _unavailable_until = 0.0
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _collection():
+        """Return the Mongo collection, or None while in back-off after a failure"""
+        if time.monotonic() < ExtractionStore._unavailable_until:
+            return None
+        from app.extensions import mongo_db
+        return mongo_db[COLLECTION]
+
+    @staticmethod
+    def _failed(e: Exception):
+        logger.warning("Extraction store unavailable, skipping for %ss: %s", BACKOFF_SECONDS, e)
+        with ExtractionStore._lock:
+            ExtractionStore._unavailable_until = time.monotonic() + BACKOFF_SECONDS
+
+    # ----------------- LOOKUPS -----------------
+    @staticmethod
+    def get(digest: str) -> Optional[Dict[str, Any]]:
+        """Return the stored extraction for a content hash, or None"""
+        collection = ExtractionStore._collection()
+        if collection is None or not digest:
+            return None
+        try:
+            doc = collection.find_one_and_update(
+                {'_id': digest, 'extractor_version': EXTRACTOR_VERSION},
+                {'$set': {'last_seen_at': datetime.utcnow()}, '$inc': {'hits': 1}},
+            )
+        except Exception as e:
+            ExtractionStore._failed(e)
+            return None
+        return doc
+
+    @staticmethod
+    def get_text(digest: Optional[str]) -> Optional[str]:
+        doc = ExtractionStore.get(digest) if digest else None
+        return doc['text'] if doc else None
+
+    @staticmethod
+    def put(digest: str, extraction: Dict[str, Any], filename: Optional[str] = None,
+            size: Optional[int] = None) -> bool:
+        """Store an extraction; False when the store is unavailable (callers keep the text)"""
+        collection = ExtractionStore._collection()
+        if collection is None:
+            return False
+        now = datetime.utcnow()
+        try:
+            collection.update_one(
+                {'_id': digest},
+                {
+                    '$set': {
+                        'text': extraction.get('text', ''),
+                        'format': extraction.get('format'),
+                        'parser': extraction.get('parser'),
+                        'page_count': extraction.get('page_count', 0),
+                        'truncated': extraction.get('truncated', False),
+                        'extractor_version': EXTRACTOR_VERSION,
+                        'last_seen_at': now,
+                    },
+                    '$setOnInsert': {'filename': filename, 'size': size, 'created_at': now, 'hits': 0},
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            ExtractionStore._failed(e)
+            return False
+        return True
+
+    # ----------------- ENTRY POINTS -----------------
+    @staticmethod
+    def extract(source, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return the extraction for an uploaded file, parsing it only on a miss.
+
+        Args:
+            source: bytes or file-like upload (left rewound for later readers)
+            filename: Used for format detection when the upload has no name
+
+        Returns:
+            {cv_hash, text, format, parser, page_count, truncated, cached,
+            stored}; ``stored`` is False when the text is not in the store
+        """
+        data, filename = TextExtractionService.read(source, filename)
+        if isinstance(data, str):
+            with open(data, 'rb') as fh:
+                data = fh.read()
+        digest = content_hash(data)
+
+        doc = ExtractionStore.get(digest)
+        if doc is not None:
+            return {
+                'cv_hash': digest, 'text': doc['text'], 'format': doc.get('format'),
+                'parser': doc.get('parser'), 'page_count': doc.get('page_count', 0),
+                'truncated': doc.get('truncated', False), 'cached': True, 'stored': True,
+            }
+
+        extraction = TextExtractionService.extract_document(data, filename)
+        stored = ExtractionStore.put(digest, extraction, filename=filename, size=len(data))
+        return dict(extraction, cv_hash=digest, cached=False, stored=stored)
+
+    @staticmethod
+    def save_text(text: str) -> Tuple[str, bool]:
+        """Store pasted CV text; returns (hash, whether the store holds it)"""
+        data = (text or '').encode('utf-8')
+        digest = content_hash(data)
+        if ExtractionStore.get(digest) is not None:
+            return digest, True
+        return digest, ExtractionStore.put(digest, {'text': text or '', 'format': 'text', 'parser': None,
+                                                    'page_count': 1}, size=len(data))
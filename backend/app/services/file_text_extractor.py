@@ -1,5 +1,5 @@
-import pdfplumber
-import docx
+from app.services.text_extraction_service import TextExtractionService
+
 
 def extract_text_from_file(file):
     """
@@ -15,33 +15,26 @@ def extract_text_from_file(file):
         return extract_docx(file)
 
     if filename.endswith(".txt"):
-        return file.read().decode("utf-8", errors="ignore")
+        return TextExtractionService.extract(file, filename)
 
     raise ValueError("Unsupported CV format")
 
 
 def extract_pdf(file):
     """
-    Extract text from a PDF using pdfplumber.
+    Extract text from a PDF (fastest installed backend, in the extraction pool).
     """
-    text = ""
     try:
-        with pdfplumber.open(file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-        return text.strip()
+        return TextExtractionService.extract(file, "upload.pdf")
     except Exception as e:
         raise Exception(f"Failed to extract PDF text: {e}")
 
 
 def extract_docx(file):
     """
-    Extract text from a DOCX file using python-docx.
+    Extract text from a DOCX file.
     """
     try:
-        doc = docx.Document(file)
-        return "\n".join([p.text for p in doc.paragraphs]).strip()
+        return TextExtractionService.extract(file, "upload.docx")
     except Exception as e:
         raise Exception(f"Failed to extract DOCX text: {e}")
@@ -9,6 +9,7 @@ from sqlalchemy.orm import Query
 
 from app.extensions import db
 from app.models import Requisition, User, Application, JobActivityLog
+from app.services.job_stats_service import JobStatsService
 from app.schemas.job_schemas import (
     job_create_schema, job_update_schema, job_filter_schema
 )
@@ -262,14 +263,9 @@ class JobService:
                 details={"section": "detailed_statistics"}
             )
             
-            # Get application statistics
-            applications = Application.query.filter_by(requisition_id=job_id).all()
-            applications_count = len(applications)
-            
-            # Status breakdown
-            status_counts = {}
-            for app in applications:
-                status_counts[app.status] = status_counts.get(app.status, 0) + 1
+            # Get application statistics (single grouped query)
+            status_counts = JobStatsService.status_breakdown([job_id])[job_id]
+            applications_count = sum(status_counts.values())
             
             # Get activity log count
             activity_count = JobActivityLog.query.filter_by(job_id=job_id).count()
@@ -384,13 +380,16 @@ class JobService:
                 error_out=False
             )
             
+            # Application counts for the whole page in one grouped query
+            app_counts = JobStatsService.application_counts(
+                job.id for job in paginated_jobs.items
+            )
+            
             # Prepare response
             jobs_data = []
             for job in paginated_jobs.items:
                 job_dict = job.to_dict()
-                # Add application count for each job
-                app_count = Application.query.filter_by(requisition_id=job.id).count()
-                job_dict['application_count'] = app_count
+                job_dict['application_count'] = app_counts.get(job.id, 0)
                 jobs_data.append(job_dict)
             
             response = {
@@ -0,0 +1,154 @@
+"""
+Aggregate statistics for jobs/requisitions.
+
+All per-job application counts are computed with grouped / conditional
+aggregation so a list of jobs costs a single round trip instead of one
+COUNT(*) per job and status.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, case, desc
+
+from app.extensions import db
+from app.models import Requisition, Application
+
+
+class JobStatsService:
+    """Service for per-job application statistics"""
+
+    PIPELINE_STATUSES = ('screening', 'assessment', 'interview', 'offer', 'hired', 'rejected')
+    RECENT_DAYS = 7
+
+    @staticmethod
+    def _stats_subquery(job_ids: Optional[Iterable[int]] = None):
+        """
+        Build a subquery with one row per requisition holding the total
+        application count, a column per pipeline status and the number of
+        applications received in the last RECENT_DAYS days.
+        """
+        recent_cutoff = datetime.utcnow() - timedelta(days=JobStatsService.RECENT_DAYS)
+
+        columns = [
+            Application.requisition_id.label('requisition_id'),
+            func.count(Application.id).label('total'),
+        ]
+        for status in JobStatsService.PIPELINE_STATUSES:
+            columns.append(
+                func.sum(case((Application.status == status, 1), else_=0)).label(status)
+            )
+        columns.append(
+            func.sum(case((Application.created_at >= recent_cutoff, 1), else_=0)).label('recent')
+        )
+
+        query = db.session.query(*columns).group_by(Application.requisition_id)
+        if job_ids is not None:
+            query = query.filter(Application.requisition_id.in_(list(job_ids)))
+
+        return query.subquery()
+
+    @staticmethod
+    def _row_to_stats(job: Requisition, row) -> Dict:
+        """Convert a joined (Requisition, aggregates...) row to the stats dict"""
+        status_counts = {
+            status: int(getattr(row, status) or 0)
+            for status in JobStatsService.PIPELINE_STATUSES
+        }
+        hired_count = status_counts['hired']
+
+        progress = 0
+        if job.vacancy and job.vacancy > 0:
+            progress = min(100, (hired_count / job.vacancy) * 100)
+
+        return {
+            "applications_count": int(row.total or 0),
+            "recent_applications": int(row.recent or 0),
+            "hired_count": hired_count,
+            "progress": round(progress, 1),
+            "status_breakdown": status_counts,
+        }
+
+    @staticmethod
+    def list_jobs_with_stats(
+        category: Optional[str] = None,
+        status: str = 'all',
+        page: Optional[int] = None,
+        per_page: int = 20
+    ) -> Tuple[List[Tuple[Requisition, Dict]], Optional[object]]:
+        """
+        Fetch jobs together with their application statistics in one statement.
+
+        Args:
+            category: Optional category filter
+            status: 'active', 'inactive' or 'all'
+            page: Page number; when omitted every matching job is returned
+            per_page: Page size when paginating
+
+        Returns:
+            Tuple of ([(job, stats dict)], pagination object or None)
+        """
+        stats = JobStatsService._stats_subquery()
+
+        query = db.session.query(
+            Requisition,
+            stats.c.total,
+            stats.c.recent,
+            *[stats.c[s] for s in JobStatsService.PIPELINE_STATUSES]
+        ).outerjoin(stats, stats.c.requisition_id == Requisition.id)
+
+        if status == 'active':
+            query = query.filter(Requisition.is_active == True)
+        elif status == 'inactive':
+            query = query.filter(Requisition.is_active == False)
+
+        if category:
+            query = query.filter(Requisition.category == category)
+
+        query = query.order_by(desc(Requisition.created_at), desc(Requisition.id))
+
+        pagination = None
+        if page:
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            rows = pagination.items
+        else:
+            rows = query.all()
+
+        return [(row[0], JobStatsService._row_to_stats(row[0], row)) for row in rows], pagination
+
+    @staticmethod
+    def application_counts(job_ids: Iterable[int]) -> Dict[int, int]:
+        """Return {job_id: total applications} for the given jobs in one query"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+
+        rows = db.session.query(
+            Application.requisition_id,
+            func.count(Application.id)
+        ).filter(
+            Application.requisition_id.in_(job_ids)
+        ).group_by(Application.requisition_id).all()
+
+        counts = {job_id: 0 for job_id in job_ids}
+        counts.update({job_id: count for job_id, count in rows})
+        return counts
+
+    @staticmethod
+    def status_breakdown(job_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """Return {job_id: {status: count}} for the given jobs in one query"""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+
+        rows = db.session.query(
+            Application.requisition_id,
+            Application.status,
+            func.count(Application.id)
+        ).filter(
+            Application.requisition_id.in_(job_ids)
+        ).group_by(Application.requisition_id, Application.status).all()
+
+        breakdown = {job_id: {} for job_id in job_ids}
+        for job_id, status, count in rows:
+            breakdown[job_id][status] = count
+        return breakdown
@@ -1,16 +1,15 @@
 # app/services/pdf_service.py
 from fpdf import FPDF
-import tempfile
-import cloudinary.uploader
-import os
+
+from app.services.storage_service import StorageService
 
 
 class PDFService:
     @staticmethod
     def generate_offer_pdf(offer) -> str:
         """
-        Generate a PDF for the given offer and upload to Cloudinary.
-        Returns the public URL of the uploaded PDF.
+        Generate a PDF for the given offer in memory and store it.
+        Returns the URL of the stored PDF (the upload runs in the background).
         """
 
         # Safe access
@@ -38,20 +37,11 @@ class PDFService:
         pdf.ln(10)
         pdf.multi_cell(0, 10, "Please sign this offer digitally to confirm your acceptance.")
 
-        # Save PDF to temp file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            pdf.output(tmp_file.name)
-            tmp_file_path = tmp_file.name
-
-        try:
-            upload = cloudinary.uploader.upload(
-                tmp_file_path,
-                resource_type="raw",
-                folder="offers",
-                public_id=f"offer_{offer.id}",
-                overwrite=True
-            )
-            return upload["secure_url"]
-        finally:
-            if os.path.exists(tmp_file_path):
-                os.remove(tmp_file_path)
+        # fpdf 1.x returns the document as a latin-1 string
+        data = pdf.output(dest="S").encode("latin-1")
+        return StorageService.store(
+            data,
+            folder="offers",
+            filename=f"offer_{offer.id}.pdf",
+            content_type="application/pdf",
+        )
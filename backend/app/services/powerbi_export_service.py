@@ -0,0 +1,188 @@
+"""
+Streaming export of the flattened application fact table for Power BI.
+
+Rows are produced by a single statement per batch: candidate, user and
+requisition are outer-joined, the assessment recommendation is a correlated
+LIMIT 1 subquery and interview count / dates are aggregated in a LATERAL
+subquery, so nothing is lazy-loaded per row. Batches are walked with a
+keyset on ``applications.id`` and serialized chunk by chunk, keeping memory
+flat regardless of how many rows are exported.
+"""
+import csv
+import io
+import json
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import select, func, true
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+
+from app.extensions import db
+from app.models import Application, Candidate, User, Requisition, AssessmentResult, Interview
+
+
+class PowerBIExportService:
+    """Service building and streaming the Power BI application export"""
+
+    FORMATS = ('json', 'ndjson', 'csv')
+    CONTENT_TYPES = {
+        'json': 'application/json',
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    COLUMNS = (
+        'application_id', 'application_status', 'cv_score', 'assessment_score',
+        'overall_score', 'recommendation', 'candidate_id', 'candidate_name',
+        'candidate_email', 'candidate_verified', 'job_id', 'job_title',
+        'job_category', 'interview_count', 'interview_dates',
+    )
+    BATCH_SIZE = 1000
+    MAX_LIMIT = 100000
+
+    @staticmethod
+    def _filters(filters: Dict) -> List:
+        conditions = []
+        if filters.get('job_id'):
+            conditions.append(Application.requisition_id == filters['job_id'])
+        if filters.get('candidate_id'):
+            conditions.append(Application.candidate_id == filters['candidate_id'])
+        if filters.get('status'):
+            conditions.append(Application.status == filters['status'])
+        if filters.get('start_date'):
+            conditions.append(Application.created_at >= filters['start_date'])
+        if filters.get('end_date'):
+            conditions.append(Application.created_at <= filters['end_date'])
+        return conditions
+
+    @staticmethod
+    def fact_statement(conditions: List):
+        """Select the flattened application fact rows matching ``conditions``, ordered by id"""
+        recommendation = (
+            select(AssessmentResult.recommendation)
+            .where(AssessmentResult.application_id == Application.id)
+            .order_by(AssessmentResult.id)
+            .limit(1)
+            .correlate(Application)
+            .scalar_subquery()
+        )
+        interviews = (
+            select(
+                func.count(Interview.id).label('interview_count'),
+                func.array_agg(
+                    aggregate_order_by(Interview.scheduled_time, Interview.scheduled_time)
+                ).label('interview_dates'),
+            )
+            .where(Interview.application_id == Application.id)
+            .correlate(Application)
+            .lateral('interview_agg')
+        )
+
+        return (
+            select(
+                Application.id.label('application_id'),
+                Application.status.label('application_status'),
+                Application.cv_score,
+                Application.assessment_score,
+                Application.overall_score,
+                recommendation.label('recommendation'),
+                Candidate.id.label('candidate_id'),
+                Candidate.full_name.label('candidate_name'),
+                User.email.label('candidate_email'),
+                User.is_verified.label('candidate_verified'),
+                Requisition.id.label('job_id'),
+                Requisition.title.label('job_title'),
+                Requisition.category.label('job_category'),
+                interviews.c.interview_count,
+                interviews.c.interview_dates,
+            )
+            .select_from(Application)
+            .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+            .outerjoin(User, User.id == Candidate.user_id)
+            .outerjoin(Requisition, Requisition.id == Application.requisition_id)
+            .outerjoin(interviews, true())
+            .where(*conditions)
+            .order_by(Application.id)
+        )
+
+    @staticmethod
+    def page_bounds(filters: Dict, cursor: Optional[int], limit: Optional[int]):
+        """
+        Resolve the id range of one export page before streaming starts.
+
+        Only application ids are scanned, so the cursor for the next page can
+        be sent as a response header.
+
+        Returns:
+            Tuple of (upper bound id or None, next cursor or None)
+        """
+        if not limit:
+            return None, None
+
+        conditions = PowerBIExportService._filters(filters)
+        if cursor:
+            conditions.append(Application.id > cursor)
+
+        ids = db.session.execute(
+            select(Application.id)
+            .where(*conditions)
+            .order_by(Application.id)
+            .offset(limit - 1)
+            .limit(2)
+        ).scalars().all()
+
+        if not ids:
+            return None, None
+        return ids[0], (ids[0] if len(ids) > 1 else None)
+
+    @staticmethod
+    def iter_rows(filters: Dict, cursor: Optional[int] = None, upper: Optional[int] = None) -> Iterator[Dict]:
+        """Yield export rows with application id in (cursor, upper], one keyset batch at a time"""
+        base_conditions = PowerBIExportService._filters(filters)
+        if upper is not None:
+            base_conditions.append(Application.id <= upper)
+
+        last_id = cursor or 0
+        while True:
+            stmt = PowerBIExportService.fact_statement(
+                base_conditions + [Application.id > last_id]
+            ).limit(PowerBIExportService.BATCH_SIZE)
+            batch = db.session.execute(stmt).mappings().all()
+            if not batch:
+                return
+
+            for row in batch:
+                row = dict(row)
+                row['interview_dates'] = [d.isoformat() for d in row['interview_dates'] or []]
+                yield row
+
+            last_id = batch[-1]['application_id']
+            if len(batch) < PowerBIExportService.BATCH_SIZE:
+                return
+
+    @staticmethod
+    def serialize(rows: Iterator[Dict], fmt: str) -> Iterator[str]:
+        """Encode rows as a JSON array, NDJSON or CSV, one chunk per row"""
+        if fmt == 'ndjson':
+            for row in rows:
+                yield json.dumps(row) + '\n'
+
+        elif fmt == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(PowerBIExportService.COLUMNS)
+            for row in rows:
+                row['interview_dates'] = ';'.join(row['interview_dates'])
+                writer.writerow([row[col] for col in PowerBIExportService.COLUMNS])
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+            if buffer.tell():
+                yield buffer.getvalue()
+
+        else:
+            yield '['
+            first = True
+            for row in rows:
+                yield ('' if first else ',') + json.dumps(row)
+                first = False
+            yield ']'
+
@@ -0,0 +1,388 @@
+"""
+Chat presence kept in Redis instead of ``user_presence`` rows.
+
+Every connected socket is a member of ``presence:sockets:<user_id>`` (a
+sorted set scored by its expiry), so a user with three tabs open has three
+references and only goes offline when the last one disconnects or expires.
+The worker holding a socket refreshes its expiry every PRESENCE_TTL_SECONDS / 3
+(heartbeat); sockets of a crashed worker stop being refreshed and are swept
+once their TTL passes. Transitions are computed atomically in Lua scripts, so
+concurrent connects / disconnects on different workers agree on when a user
+came online or went offline.
+
+Presence changes are not broadcast as they happen. Changed user ids are
+collected in ``presence:changed`` and, every PRESENCE_FLUSH_MS, one worker
+(holding a short Redis lock) drains them, resolves the watchers with one
+query (distinct users sharing a thread with a changed user, online ones
+only) and emits a single ``presence_update`` per watcher listing every
+change it can see. A user in 200 threads going offline costs one message to
+each distinct contact per flush, not one per thread and participant.
+
+When Redis is unreachable (or PRESENCE_BACKEND=memory) the same logic runs
+on in-process dictionaries, which is only correct with a single worker.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.extensions import db, socketio
+from app.models import User, chat_participants
+
+logger = logging.getLogger(__name__)
+
+SOCKETS_PREFIX = 'presence:sockets:'
+EXPIRY_KEY = 'presence:expiry'
+STATUS_KEY = 'presence:status'
+LAST_SEEN_KEY = 'presence:last_seen'
+CHANGED_KEY = 'presence:changed'
+FLUSH_LOCK_KEY = 'presence:flush_lock'
+
+# Returns the number of live sockets the user had before this one was (re)registered
+TOUCH_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+local before = redis.call('ZCARD', KEYS[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[1]) then before = before - 1 end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+redis.call('EXPIREAT', KEYS[1], ARGV[5])
+redis.call('ZADD', KEYS[2], 'GT', ARGV[3], ARGV[4])
+redis.call('HSET', KEYS[3], ARGV[4], ARGV[2])
+return before
+"""
+
+# Returns 1 when this was the user's last live socket
+RELEASE_SCRIPT = """
+local removed = redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[3], ARGV[2])
+if removed == 1 and redis.call('ZCARD', KEYS[1]) == 0 then
+  redis.call('ZREM', KEYS[2], ARGV[3])
+  redis.call('HDEL', KEYS[4], ARGV[3])
+  return 1
+end
+return 0
+"""
+
+# Drops expired sockets of users whose latest expiry passed; returns users now offline.
+# Touches per-user keys not passed in KEYS, so it needs a single (non-cluster) Redis.
+SWEEP_SCRIPT = """
+local offline = {}
+for _, uid in ipairs(redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, 1000)) do
+  local key = ARGV[2] .. uid
+  redis.call('ZREMRANGEBYSCORE', key, '-inf', ARGV[1])
+  local latest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+  if #latest == 0 then
+    redis.call('ZREM', KEYS[1], uid)
+    redis.call('HDEL', KEYS[2], uid)
+    table.insert(offline, uid)
+  else
+    redis.call('ZADD', KEYS[1], latest[2], uid)
+  end
+end
+return offline
+"""
+
+
+class RedisPresenceStore:
+    """Presence state shared by every worker through Redis"""
+
+    def __init__(self, client):
+        self.client = client
+        self._touch = client.register_script(TOUCH_SCRIPT)
+        self._release = client.register_script(RELEASE_SCRIPT)
+        self._sweep = client.register_script(SWEEP_SCRIPT)
+
+    def touch(self, user_id: int, sid: str, now: float, ttl: int) -> bool:
+        """Register or refresh a socket; True when the user just came online"""
+        expires = now + ttl
+        before = self._touch(
+            keys=[f'{SOCKETS_PREFIX}{user_id}', EXPIRY_KEY, LAST_SEEN_KEY],
+            args=[sid, now, expires, user_id, math.ceil(expires)],
+        )
+        return int(before) == 0
+
+    def release(self, user_id: int, sid: str, now: float) -> bool:
+        """Drop a socket; True when it was the user's last one"""
+        return bool(self._release(
+            keys=[f'{SOCKETS_PREFIX}{user_id}', EXPIRY_KEY, LAST_SEEN_KEY, STATUS_KEY],
+            args=[sid, now, user_id],
+        ))
+
+    def sweep(self, now: float) -> List[int]:
+        return [int(uid) for uid in self._sweep(keys=[EXPIRY_KEY, STATUS_KEY], args=[now, SOCKETS_PREFIX])]
+
+    def set_status(self, user_id: int, status: Optional[str]):
+        if status:
+            self.client.hset(STATUS_KEY, user_id, status)
+        else:
+            self.client.hdel(STATUS_KEY, user_id)
+
+    def snapshot(self, user_ids: List[int], now: float) -> Dict[int, Dict[str, Any]]:
+        if not user_ids:
+            return {}
+        pipe = self.client.pipeline(transaction=False)
+        for user_id in user_ids:
+            pipe.zcount(f'{SOCKETS_PREFIX}{user_id}', now, '+inf')
+        pipe.hmget(STATUS_KEY, user_ids)
+        pipe.hmget(LAST_SEEN_KEY, user_ids)
+        *counts, statuses, last_seen = pipe.execute()
+        return {
+            user_id: _state(user_id, count, status, seen)
+            for user_id, count, status, seen in zip(user_ids, counts, statuses, last_seen)
+        }
+
+    def mark_changed(self, user_ids: Iterable[int]):
+        user_ids = list(user_ids)
+        if user_ids:
+            self.client.sadd(CHANGED_KEY, *user_ids)
+
+    def drain_changed(self) -> List[int]:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.smembers(CHANGED_KEY)
+        pipe.delete(CHANGED_KEY)
+        members, _ = pipe.execute()
+        return sorted(int(uid) for uid in members)
+
+    def acquire_flush(self, milliseconds: int) -> bool:
+        """Only one worker flushes per interval"""
+        return bool(self.client.set(FLUSH_LOCK_KEY, 1, nx=True, px=max(milliseconds - 10, 1)))
+
+
+class MemoryPresenceStore:
+    """Same operations on process-local dictionaries (single worker, tests)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sockets: Dict[int, Dict[str, float]] = defaultdict(dict)
+        self._status: Dict[int, str] = {}
+        self._last_seen: Dict[int, float] = {}
+        self._changed: set = set()
+
+    def _live(self, user_id: int, now: float) -> Dict[str, float]:
+        sockets = self._sockets[user_id]
+        for sid in [sid for sid, expires in sockets.items() if expires <= now]:
+            del sockets[sid]
+        return sockets
+
+    def touch(self, user_id: int, sid: str, now: float, ttl: int) -> bool:
+        with self._lock:
+            sockets = self._live(user_id, now)
+            before = len(sockets) - (1 if sid in sockets else 0)
+            sockets[sid] = now + ttl
+            self._last_seen[user_id] = now
+            return before == 0
+
+    def release(self, user_id: int, sid: str, now: float) -> bool:
+        with self._lock:
+            removed = self._sockets[user_id].pop(sid, None) is not None
+            self._last_seen[user_id] = now
+            if removed and not self._live(user_id, now):
+                self._status.pop(user_id, None)
+                return True
+            return False
+
+    def sweep(self, now: float) -> List[int]:
+        with self._lock:
+            offline = []
+            for user_id in [uid for uid, sockets in self._sockets.items() if sockets]:
+                if not self._live(user_id, now):
+                    self._status.pop(user_id, None)
+                    offline.append(user_id)
+            return offline
+
+    def set_status(self, user_id: int, status: Optional[str]):
+        with self._lock:
+            if status:
+                self._status[user_id] = status
+            else:
+                self._status.pop(user_id, None)
+
+    def snapshot(self, user_ids: List[int], now: float) -> Dict[int, Dict[str, Any]]:
+        with self._lock:
+            return {
+                # Counted without pruning: expired sockets are left for sweep() to report
+                user_id: _state(user_id, sum(1 for expires in self._sockets.get(user_id, {}).values() if expires > now),
+                                self._status.get(user_id), self._last_seen.get(user_id))
+                for user_id in user_ids
+            }
+
+    def mark_changed(self, user_ids: Iterable[int]):
+        with self._lock:
+            self._changed.update(user_ids)
+
+    def drain_changed(self) -> List[int]:
+        with self._lock:
+            changed, self._changed = sorted(self._changed), set()
+            return changed
+
+    def acquire_flush(self, milliseconds: int) -> bool:
+        return True
+
+
+def _state(user_id: int, live_sockets: int, status: Optional[str], last_seen) -> Dict[str, Any]:
+    return {
+        'user_id': user_id,
+        'status': (status or 'online') if live_sockets else 'offline',
+        'last_seen': datetime.utcfromtimestamp(float(last_seen)).isoformat() if last_seen else None,
+    }
+
+
+class PresenceService:
+    """Service tracking who is online and broadcasting coalesced presence changes"""
+
+    _store = None
+    _sockets: Dict[str, int] = {}  # sid -> user id, for sockets held by this process
+    _lock = threading.Lock()
+    _loop_started = False
+
+    # ----------------- BACKEND -----------------
+    @staticmethod
+    def store():
+        if PresenceService._store is None:
+            backend = current_app.config.get('PRESENCE_BACKEND', 'auto')
+            store = None
+            if backend != 'memory':
+                from app.extensions import redis_client
+                try:
+                    redis_client.ping()
+                    store = RedisPresenceStore(redis_client)
+                except Exception as e:
+                    if backend == 'redis':
+                        raise
+                    logger.warning("Redis unavailable, keeping presence in-process: %s", e)
+            PresenceService._store = store or MemoryPresenceStore()
+        return PresenceService._store
+
+    @staticmethod
+    def _ttl() -> int:
+        return current_app.config.get('PRESENCE_TTL_SECONDS', 90)
+
+    # ----------------- SOCKET LIFECYCLE -----------------
+    @staticmethod
+    def connect(user_id: int, sid: str):
+        with PresenceService._lock:
+            PresenceService._sockets[sid] = user_id
+        store = PresenceService.store()
+        if store.touch(user_id, sid, time.time(), PresenceService._ttl()):
+            store.mark_changed([user_id])
+        PresenceService._ensure_loop()
+
+    @staticmethod
+    def disconnect(sid: str) -> Optional[int]:
+        """Release a socket held by this process; returns its user id (None if unknown)"""
+        with PresenceService._lock:
+            user_id = PresenceService._sockets.pop(sid, None)
+        if user_id is None:
+            return None
+        store = PresenceService.store()
+        if store.release(user_id, sid, time.time()):
+            store.mark_changed([user_id])
+        return user_id
+
+    @staticmethod
+    def heartbeat():
+        """Refresh the expiry of every socket held by this process"""
+        with PresenceService._lock:
+            sockets = list(PresenceService._sockets.items())
+        store = PresenceService.store()
+        now, ttl = time.time(), PresenceService._ttl()
+        # A socket swept while this worker was stalled comes back online here
+        revived = [user_id for sid, user_id in sockets if store.touch(user_id, sid, now, ttl)]
+        store.mark_changed(revived)
+
+    # ----------------- STATUS -----------------
+    @staticmethod
+    def set_status(user_id: int, status: str) -> Dict[str, Any]:
+        """Set a manual status ('away', 'busy', ...); 'online' clears it"""
+        store = PresenceService.store()
+        store.set_status(user_id, None if status == 'online' else status)
+        store.mark_changed([user_id])
+        return store.snapshot([user_id], time.time())[user_id]
+
+    @staticmethod
+    def get(user_ids: List[int]) -> List[Dict[str, Any]]:
+        snapshot = PresenceService.store().snapshot(list(dict.fromkeys(user_ids)), time.time())
+        return list(snapshot.values())
+
+    # ----------------- BROADCAST -----------------
+    @staticmethod
+    def watchers(user_ids: List[int]) -> Dict[int, List[int]]:
+        """{watcher id: [changed user ids it shares a thread with]} in one query"""
+        if not user_ids:
+            return {}
+        mine, theirs = chat_participants.alias('mine'), chat_participants.alias('theirs')
+        rows = db.session.execute(
+            select(theirs.c.user_id, mine.c.user_id).distinct()
+            .join(theirs, theirs.c.chat_thread_id == mine.c.chat_thread_id)
+            .where(mine.c.user_id.in_(user_ids), theirs.c.user_id != mine.c.user_id)
+        )
+        watched = defaultdict(list)
+        for watcher_id, user_id in rows:
+            watched[watcher_id].append(user_id)
+        return watched
+
+    @staticmethod
+    def flush() -> int:
+        """Broadcast pending presence changes, one message per watcher; returns messages sent"""
+        store = PresenceService.store()
+        now = time.time()
+        store.mark_changed(store.sweep(now))
+        changed = store.drain_changed()
+        if not changed:
+            return 0
+
+        states = store.snapshot(changed, now)
+        names = dict(db.session.execute(
+            select(User.id, func.coalesce(User.profile['full_name'].astext, User.email)).where(User.id.in_(changed))
+        ).all())
+        for user_id, state in states.items():
+            state['user_name'] = names.get(user_id)
+
+        watched = PresenceService.watchers(changed)
+        online = store.snapshot(list(watched), now)
+        timestamp = datetime.utcnow().isoformat()
+        sent = 0
+        for watcher_id, user_ids in watched.items():
+            if online[watcher_id]['status'] == 'offline':
+                continue
+            socketio.emit('presence_update', {
+                'presences': [states[user_id] for user_id in sorted(user_ids)],
+                'timestamp': timestamp,
+            }, room=f'user_{watcher_id}')
+            sent += 1
+        return sent
+
+    @staticmethod
+    def _ensure_loop():
+        with PresenceService._lock:
+            if PresenceService._loop_started:
+                return
+            PresenceService._loop_started = True
+        socketio.start_background_task(PresenceService._run, current_app._get_current_object())
+
+    @staticmethod
+    def _run(app):
+        """Per-process loop: heartbeats for local sockets, flushes when holding the lock"""
+        with app.app_context():
+            interval_ms = app.config.get('PRESENCE_FLUSH_MS', 500)
+            heartbeat_every = PresenceService._ttl() / 3
+        next_heartbeat = time.monotonic() + heartbeat_every
+        while True:
+            socketio.sleep(interval_ms / 1000)
+            with app.app_context():
+                try:
+                    if time.monotonic() >= next_heartbeat:
+                        PresenceService.heartbeat()
+                        next_heartbeat = time.monotonic() + heartbeat_every
+                    if PresenceService.store().acquire_flush(interval_ms):
+                        PresenceService.flush()
+                except Exception as e:
+                    logger.error(f"Presence loop error: {e}", exc_info=True)
+                finally:
+                    db.session.remove()
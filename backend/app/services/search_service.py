@@ -0,0 +1,155 @@
+"""
+Full-text search over candidates, requisitions, meetings and audit logs.
+
+Each searchable model has a generated ``search_vector`` tsvector column
+(maintained by Postgres on every write) with a GIN index. The columns people
+search by substring (candidate names and phone numbers, job titles, meeting
+titles and descriptions, audit details) additionally carry trigram indexes,
+so the ``ILIKE '%term%'`` matches the admin screens always had, inside a word
+("ohn" -> "John") or a number ("555 01"), stay index-backed.
+
+User input is reduced to word tokens and turned into a prefix tsquery
+(``dev eng`` -> ``dev:* & eng:*``), so no user text ever reaches the tsquery
+parser unescaped. Results are ordered by ``ts_rank`` plus trigram similarity.
+"""
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, or_, select
+
+from app.extensions import db
+from app.models import Application, AuditLog, Candidate, Interview, Meeting, Requisition, User
+
+SEARCH_CONFIG = 'simple'
+MAX_TERMS = 8
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchService:
+    """Service building ranked full-text search conditions"""
+
+    # Columns with trigram indexes, per model
+    TRIGRAM_COLUMNS = {
+        Candidate: (Candidate.full_name, Candidate.phone),
+        Requisition: (Requisition.title,),
+        Meeting: (Meeting.title, Meeting.description),
+        AuditLog: (AuditLog.details,),
+    }
+
+    @staticmethod
+    def prefix_query(text: Optional[str]) -> Optional[str]:
+        """Turn free text into a prefix tsquery string, or None when it has no words"""
+        tokens = _TOKEN.findall((text or '').lower())[:MAX_TERMS]
+        if not tokens:
+            return None
+        return ' & '.join(f"{token}:*" for token in tokens)
+
+    @staticmethod
+    def _tsquery(text: str):
+        return func.to_tsquery(SEARCH_CONFIG, SearchService.prefix_query(text))
+
+    @staticmethod
+    def condition(model, text: str):
+        """
+        Match condition for ``model``: tsvector prefix match, or a substring
+        match on any of the model's trigram-indexed columns.
+        """
+        conditions = []
+        if SearchService.prefix_query(text):
+            conditions.append(model.search_vector.op('@@')(SearchService._tsquery(text)))
+        pattern = text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        for column in SearchService.TRIGRAM_COLUMNS.get(model, ()):
+            conditions.append(column.ilike(f"%{pattern}%", escape='\\'))
+        return or_(*conditions) if conditions else db.false()
+
+    @staticmethod
+    def rank(model, text: str):
+        """Relevance expression for ordering (higher is better)"""
+        score = db.literal(0.0)
+        if SearchService.prefix_query(text):
+            score = func.ts_rank(model.search_vector, SearchService._tsquery(text))
+        columns = SearchService.TRIGRAM_COLUMNS.get(model, ())
+        if columns:
+            similarities = [func.coalesce(func.similarity(column, text), 0) for column in columns]
+            score = score + (func.greatest(*similarities) if len(similarities) > 1 else similarities[0])
+        return score
+
+    @staticmethod
+    def filter(query, model, text: Optional[str], order: bool = False):
+        """Apply a text filter to a query, optionally ordering it by relevance"""
+        text = (text or '').strip()
+        if not text:
+            return query
+        query = query.filter(SearchService.condition(model, text))
+        if order:
+            query = query.order_by(SearchService.rank(model, text).desc())
+        return query
+
+    # ----------------- GLOBAL SEARCH -----------------
+    @staticmethod
+    def search_all(text: str, limit: int = 10) -> Dict[str, List[Dict]]:
+        """Ranked matches per entity type, one query each"""
+        candidate_match = SearchService.condition(Candidate, text)
+        job_match = SearchService.condition(Requisition, text)
+        candidate_rank = SearchService.rank(Candidate, text)
+        job_rank = SearchService.rank(Requisition, text)
+
+        candidates = db.session.query(
+            Candidate.id, Candidate.full_name, Candidate.cv_score, User.email
+        ).outerjoin(User, User.id == Candidate.user_id).filter(
+            candidate_match
+        ).order_by(candidate_rank.desc(), Candidate.id).limit(limit).all()
+
+        application_count = select(func.count(Application.id)).where(
+            Application.requisition_id == Requisition.id
+        ).correlate(Requisition).scalar_subquery().label('applications_count')
+        jobs = db.session.query(
+            Requisition.id, Requisition.title, Requisition.category, application_count
+        ).filter(job_match).order_by(job_rank.desc(), Requisition.id).limit(limit).all()
+
+        applications = db.session.query(
+            Application.id, Application.status, Application.overall_score,
+            Candidate.full_name, Requisition.title
+        ).join(Candidate, Candidate.id == Application.candidate_id).join(
+            Requisition, Requisition.id == Application.requisition_id
+        ).filter(or_(candidate_match, job_match)).order_by(
+            (candidate_rank + job_rank).desc(), Application.id
+        ).limit(limit).all()
+
+        interviews = db.session.query(
+            Interview.id, Interview.scheduled_time, Interview.status, Candidate.full_name
+        ).join(Candidate, Candidate.id == Interview.candidate_id).filter(
+            candidate_match
+        ).order_by(candidate_rank.desc(), Interview.scheduled_time.desc()).limit(limit).all()
+
+        return {
+            "candidates": [{
+                "id": c.id,
+                "name": c.full_name,
+                "email": c.email,
+                "type": "candidate",
+                "score": c.cv_score
+            } for c in candidates],
+            "jobs": [{
+                "id": j.id,
+                "title": j.title,
+                "category": j.category,
+                "type": "job",
+                "applications_count": j.applications_count
+            } for j in jobs],
+            "applications": [{
+                "id": a.id,
+                "candidate_name": a.full_name,
+                "job_title": a.title,
+                "status": a.status,
+                "type": "application",
+                "score": a.overall_score
+            } for a in applications],
+            "interviews": [{
+                "id": i.id,
+                "candidate_name": i.full_name,
+                "scheduled_time": i.scheduled_time.isoformat() if i.scheduled_time else None,
+                "type": "interview",
+                "status": i.status
+            } for i in interviews],
+        }
@@ -0,0 +1,204 @@
+"""
+Vectorized shortlist ranking.
+
+All applications of a requisition are loaded with a single column query into
+NumPy arrays; weightings, ``min_experience`` and the requisition's knockout
+rules are then applied to whole arrays, the top-k is selected with
+``argpartition`` and ``overall_score`` is written back with one bulk UPDATE.
+
+Knockout rules are requirements an applicant must meet, written as
+``<field> <op> <number>``, e.g. ``"assessment_score >= 50"`` or
+``"experience >= 3"``. Fields: cv_score, assessment_score, overall_score and
+experience (years, read from ``Candidate.profile['years_of_experience']``).
+Rules that do not follow this form are ignored and reported back. Applicants
+whose experience is unknown are never knocked out on experience.
+
+The CV score is the application's own match score (``Application.cv_score``,
+set by resume analysis for this requisition), falling back to the candidate's
+last analysed score (``Candidate.cv_score``) when the application has none.
+The previous shortlist read ``Candidate.profile['cv_score']``, which nothing
+writes, so every applicant was ranked on assessment score alone.
+"""
+import re
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, text
+
+from app.extensions import db
+from app.models import Application, Candidate, Requisition
+
+DEFAULT_WEIGHTINGS = {'cv': 60, 'assessment': 40}
+
+_FIELDS = {
+    'cv': 'cv_score', 'cv_score': 'cv_score',
+    'assessment': 'assessment_score', 'assessment_score': 'assessment_score',
+    'overall': 'overall_score', 'overall_score': 'overall_score',
+    'experience': 'experience', 'years_of_experience': 'experience',
+}
+_OPERATORS = {
+    '>=': np.greater_equal, '>': np.greater,
+    '<=': np.less_equal, '<': np.less,
+    '==': np.equal, '!=': np.not_equal,
+}
+_RULE = re.compile(
+    r'^\s*(?P<field>[a-z_]+)\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<value>-?\d+(?:\.\d+)?)\s*$',
+    re.IGNORECASE
+)
+
+_BULK_UPDATE = text("""
+    UPDATE applications
+    SET overall_score = data.score, updated_at = :now
+    FROM unnest(CAST(:ids AS integer[]), CAST(:scores AS double precision[])) AS data(id, score)
+    WHERE applications.id = data.id
+      AND applications.overall_score IS DISTINCT FROM data.score
+""")
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+@lru_cache(maxsize=256)
+def compile_rules(rules: Tuple[str, ...]):
+    """
+    Compile knockout rule strings into (field, ufunc, threshold) predicates.
+
+    Returns:
+        (predicates, ignored rule strings)
+    """
+    predicates, ignored = [], []
+    for rule in rules:
+        match = _RULE.match(rule) if isinstance(rule, str) else None
+        field = _FIELDS.get(match.group('field').lower()) if match else None
+        if field is None:
+            ignored.append(rule)
+            continue
+        predicates.append((field, _OPERATORS[match.group('op')], float(match.group('value'))))
+    return tuple(predicates), tuple(ignored)
+
+
+class ShortlistService:
+    """Service ranking a requisition's applicants"""
+
+    @staticmethod
+    def _weights(weightings: Optional[Dict]) -> Tuple[float, float]:
+        weightings = weightings or {}
+        weights = []
+        for key in ('cv', 'assessment'):
+            weight = _to_float(weightings.get(key, DEFAULT_WEIGHTINGS[key]))
+            weights.append(DEFAULT_WEIGHTINGS[key] if np.isnan(weight) else weight)
+        return weights[0] / 100, weights[1] / 100
+
+    @staticmethod
+    def _load(requisition_id: int):
+        """Load one requisition's applications as parallel arrays"""
+        rows = db.session.query(
+            Application.id, Application.candidate_id, Candidate.full_name, Application.status,
+            # Per-application match score, falling back to the candidate's CV score
+            # (0 is the column default, i.e. not analysed yet)
+            func.coalesce(func.nullif(Application.cv_score, 0), Candidate.cv_score, 0),
+            func.coalesce(Application.assessment_score, 0),
+            Candidate.profile['years_of_experience'].as_string(),
+        ).outerjoin(
+            Candidate, Candidate.id == Application.candidate_id
+        ).filter(
+            Application.requisition_id == requisition_id
+        ).order_by(Application.id).all()
+
+        count = len(rows)
+        ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=count)
+        columns = {
+            'cv_score': np.fromiter((r[4] for r in rows), dtype=np.float64, count=count),
+            'assessment_score': np.fromiter((r[5] for r in rows), dtype=np.float64, count=count),
+            'experience': np.fromiter((_to_float(r[6]) for r in rows), dtype=np.float64, count=count),
+        }
+        return rows, ids, columns
+
+    @staticmethod
+    def rank(requisition_id: int, top_k: Optional[int] = None, weightings: Optional[Dict] = None,
+             persist: bool = True) -> Dict:
+        """
+        Score and rank every application of a requisition.
+
+        Args:
+            requisition_id: Requisition to rank
+            top_k: Only return the k best eligible applicants (all when None)
+            weightings: Overrides Requisition.weightings ({'cv': .., 'assessment': ..})
+            persist: Write overall_score back to the applications
+
+        Returns:
+            Dict with the ranked applicants (best first), the number of
+            applicants knocked out and any knockout rules that were ignored
+        """
+        requisition = db.session.get(Requisition, requisition_id)
+        if requisition is None:
+            raise ValueError("Requisition not found")
+
+        rows, ids, columns = ShortlistService._load(requisition_id)
+        cv_weight, assessment_weight = ShortlistService._weights(weightings or requisition.weightings)
+        scores = columns['cv_score'] * cv_weight + columns['assessment_score'] * assessment_weight
+        columns['overall_score'] = scores
+
+        predicates, ignored = compile_rules(tuple(requisition.knockout_rules or ()))
+        if ignored:
+            current_app.logger.warning(
+                f"Ignoring unrecognised knockout rules for requisition {requisition_id}: {list(ignored)}"
+            )
+        if requisition.min_experience:
+            predicates += (('experience', np.greater_equal, float(requisition.min_experience)),)
+
+        eligible = np.ones(ids.size, dtype=bool)
+        for field, op, threshold in predicates:
+            values = columns[field]
+            passed = op(values, threshold)
+            if field == 'experience':
+                passed |= np.isnan(values)
+            eligible &= passed
+
+        candidates = np.flatnonzero(eligible)
+        if top_k is not None and top_k < candidates.size:
+            top_k = max(top_k, 0)
+            if top_k:
+                candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+            else:
+                candidates = candidates[:0]
+        # Stable sort keeps ties in application order
+        order = candidates[np.argsort(-scores[candidates], kind='stable')]
+
+        if persist and ids.size:
+            try:
+                db.session.execute(_BULK_UPDATE, {
+                    'ids': ids.tolist(), 'scores': scores.tolist(), 'now': datetime.utcnow()
+                })
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+
+        ranked = []
+        for i in order.tolist():
+            row = rows[i]
+            ranked.append({
+                "application_id": row[0],
+                "candidate_id": row[1],
+                "full_name": row[2],
+                "cv_score": float(columns['cv_score'][i]),
+                "assessment_score": float(columns['assessment_score'][i]),
+                "overall_score": float(scores[i]),
+                "status": row[3],
+            })
+
+        return {
+            "requisition_id": requisition_id,
+            "total": int(ids.size),
+            "knocked_out": int(ids.size - np.count_nonzero(eligible)),
+            "ignored_rules": list(ignored),
+            "ranked": ranked,
+        }
@@ -0,0 +1,193 @@
+"""
+Socket.IO fan-out across web workers, nodes and background processes.
+
+Each gunicorn worker runs its own Socket.IO server and only knows the
+sockets connected to it. With a message queue every ``socketio.emit`` (from
+``ChatService``, ``notification_service``, ``websocket_handler`` or the CV
+worker) is published on a Redis pub/sub channel; every server subscribes to
+that channel and delivers the event to the matching sockets it holds. Without
+a queue an emit only reaches sockets held by the emitting process.
+
+SOCKETIO_MESSAGE_QUEUE:
+- auto: REDIS_URL when Redis answers at startup, otherwise this process only
+- none: this process only (single worker, tests)
+- any URL python-socketio supports (redis://, rediss://, kafka://, zmq+tcp://,
+  amqp:// through kombu); a local ``redis-server`` or Valkey stands in for a
+  managed Redis in development
+
+Sticky sessions: the long-polling transport spreads one connection over many
+HTTP requests that must all reach the same worker. Gunicorn does not route by
+client, so with more than one worker either allow only the WebSocket
+transport (SOCKETIO_TRANSPORTS=websocket, one upgraded request per
+connection) or run one worker per port behind a load balancer with client
+affinity (nginx ``ip_hash`` or ``hash $remote_addr consistent``, a cookie
+affinity on managed balancers). The message queue is needed either way.
+
+``benchmark`` is the load test: it starts N Socket.IO servers sharing a
+queue, connects WebSocket clients to them and measures delivered messages
+per second for broadcasts published from another process.
+"""
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+def message_queue_url(setting: Optional[str], redis_url: str) -> Optional[str]:
+    """Resolve SOCKETIO_MESSAGE_QUEUE to a queue URL, or None for in-process delivery"""
+    setting = (setting or 'none').strip()
+    if setting.lower() == 'none':
+        return None
+    if setting.lower() != 'auto':
+        return setting
+    try:
+        redis.Redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1).ping()
+    except Exception as e:
+        logger.warning("Socket.IO message queue disabled, Redis unreachable (%s); "
+                       "emits only reach sockets of this process", e)
+        return None
+    return redis_url
+
+
+def socketio_options(config, redis_url: str) -> Dict[str, Any]:
+    """Keyword arguments for ``socketio.init_app`` derived from the app config"""
+    transports = [t.strip() for t in config.get('SOCKETIO_TRANSPORTS', 'websocket,polling').split(',') if t.strip()]
+    return {
+        'async_mode': config.get('SOCKETIO_ASYNC_MODE', 'threading'),
+        'message_queue': message_queue_url(config.get('SOCKETIO_MESSAGE_QUEUE'), redis_url),
+        'channel': config.get('SOCKETIO_CHANNEL', 'flask-socketio'),
+        'transports': transports,
+    }
+
+
+# ----------------- LOAD TEST -----------------
+# Process targets live at module level so spawned processes can import them
+
+def _serve(queue_url: str, channel: str, ports):
+    """Benchmark server process: a threading-mode Socket.IO server on a free port"""
+    import socketio
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = socketio.Server(
+        async_mode='threading',
+        client_manager=socketio.RedisManager(queue_url, channel=channel),
+        transports=['websocket'],
+    )
+    httpd = make_server('127.0.0.1', 0, socketio.WSGIApp(server), threaded=True)
+    ports.put(httpd.server_port)
+    httpd.serve_forever()
+
+
+def _listen(port: int, clients: int, messages: int, timeout: float, ready, results):
+    """Benchmark client process: ``clients`` WebSocket connections counting events"""
+    import simple_websocket
+
+    url = f'ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket'
+    sockets = []
+    for _ in range(clients):
+        ws = simple_websocket.Client.connect(url)
+        ws.receive(timeout)  # engine.io open packet
+        ws.send('40')  # connect to the default namespace
+        ws.receive(timeout)
+        sockets.append(ws)
+    ready.put(clients)
+
+    counts: List[int] = [0] * clients
+    finished: List[float] = [0.0] * clients
+
+    def read(index, ws):
+        deadline = time.monotonic() + timeout
+        while counts[index] < messages and time.monotonic() < deadline:
+            try:
+                packet = ws.receive(max(deadline - time.monotonic(), 0.01))
+            except simple_websocket.ConnectionClosed:
+                break
+            if packet == '2':
+                ws.send('3')  # engine.io pong
+            elif packet and packet.startswith('42'):
+                counts[index] += 1
+                finished[index] = time.time()
+
+    readers = [threading.Thread(target=read, args=(i, ws), daemon=True) for i, ws in enumerate(sockets)]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    for ws in sockets:
+        ws.close()
+    results.put((sum(counts), max(finished)))
+
+
+def benchmark(queue_url: str, workers: int = 1, clients: int = 200, messages: int = 200,
+              payload_bytes: int = 256, timeout: float = 120.0) -> Dict[str, Any]:
+    """
+    Broadcast ``messages`` events to ``clients`` WebSocket clients spread over
+    ``workers`` server processes that share ``queue_url`` (on a throwaway
+    channel), publishing from a separate write-only emitter the way the CV
+    worker does.
+
+    Returns:
+        workers, clients, messages, delivered, expected, seconds,
+        delivered_per_second
+    """
+    import socketio
+
+    ctx = multiprocessing.get_context('spawn')
+    channel = f'socketio-benchmark-{uuid.uuid4().hex[:8]}'
+    ports, ready, results = ctx.Queue(), ctx.Queue(), ctx.Queue()
+    processes = []
+    try:
+        for _ in range(workers):
+            process = ctx.Process(target=_serve, args=(queue_url, channel, ports), daemon=True)
+            process.start()
+            processes.append(process)
+        server_ports = [ports.get(timeout=30) for _ in range(workers)]
+
+        share, extra = divmod(clients, workers)
+        listeners = []
+        for index, port in enumerate(server_ports):
+            count = share + (1 if index < extra else 0)
+            if count:
+                process = ctx.Process(target=_listen, args=(port, count, messages, timeout, ready, results),
+                                      daemon=True)
+                process.start()
+                processes.append(process)
+                listeners.append(process)
+        connected = sum(ready.get(timeout=60) for _ in listeners)
+        # Servers subscribe when their first client connects; let the subscriptions settle
+        time.sleep(0.5)
+
+        emitter = socketio.Server(client_manager=socketio.RedisManager(queue_url, channel=channel, write_only=True))
+        body = 'x' * payload_bytes
+        started = time.time()
+        for sequence in range(messages):
+            emitter.emit('benchmark', {'sequence': sequence, 'body': body})
+
+        delivered, finished = 0, started
+        for _ in listeners:
+            count, last = results.get(timeout=timeout + 30)
+            delivered += count
+            finished = max(finished, last)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join(5)
+
+    seconds = max(finished - started, 1e-6)
+    return {
+        'workers': workers,
+        'clients': connected,
+        'messages': messages,
+        'delivered': delivered,
+        'expected': connected * messages,
+        'seconds': round(seconds, 3),
+        'delivered_per_second': round(delivered / seconds, 1),
+    }
@@ -0,0 +1,287 @@
+"""
+File storage for uploads (CVs, documents, profile pictures, offer PDFs).
+
+``StorageService.store`` streams the upload in chunks to the local staging
+directory while hashing it, fsyncs it and renames it to its SHA-256 (the
+write-ahead copy), records a ``stored_files`` row and returns a stable URL
+(``/api/files/<sha256>``). The request is done once the bytes are durably
+on disk; nothing waits on Cloudinary. Worker processes pass ``wait=True``
+to upload before the URL is handed out, and links built outside a request
+need PUBLIC_API_URL.
+
+Backends (STORAGE_BACKEND):
+- local: the staged file is the stored file (offline use, tests). Storing
+  from a worker process requires STORAGE_LOCAL_DIR on storage the web
+  processes share (STORAGE_LOCAL_SHARED)
+- cloudinary: a background thread uploads the staged file (chunked for
+  files above STORAGE_CHUNK_SIZE) with the hash as public id, then removes
+  the local copy. ``/api/files/<key>`` serves the local copy until the
+  upload lands and redirects to Cloudinary afterwards.
+
+Identical content is stored and uploaded once. Uploads that failed or were
+interrupted by a restart are retried by ``flask storage-sync``.
+"""
+import hashlib
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Tuple
+
+from flask import current_app, has_request_context, request
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.extensions import db
+from app.models import StoredFile
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK = 1024 * 1024
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # Not supported on this platform
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class CloudinaryBackend:
+    """Pushes staged files to Cloudinary"""
+
+    @staticmethod
+    def upload(path: str, row: StoredFile, chunk_size: int) -> str:
+        import cloudinary.uploader
+
+        options = dict(
+            resource_type=row.resource_type,
+            folder=row.folder,
+            public_id=row.key,
+            overwrite=False,  # same hash, same bytes: re-uploads are no-ops
+        )
+        if row.resource_type == 'image':
+            options['format'] = 'jpg'
+        if row.size > chunk_size:
+            result = cloudinary.uploader.upload_large(path, chunk_size=chunk_size, **options)
+        else:
+            result = cloudinary.uploader.upload(path, **options)
+        return result['secure_url']
+
+
+class StorageService:
+    """Service staging uploads locally and storing them on the configured backend"""
+
+    MAX_ATTEMPTS = 3
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    # ----------------- LOCAL STAGING -----------------
+    @staticmethod
+    def _root() -> str:
+        return current_app.config.get('STORAGE_LOCAL_DIR') or os.path.join(os.getcwd(), 'storage')
+
+    @staticmethod
+    def local_path(key: str) -> str:
+        return os.path.join(StorageService._root(), key[:2], key)
+
+    @staticmethod
+    def stage(source) -> Tuple[str, str, int]:
+        """
+        Write ``source`` (bytes, path or file-like) to the staging directory
+        under its SHA-256, durably. Returns (key, path, size).
+        """
+        tmp_dir = os.path.join(StorageService._root(), 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, f"{uuid.uuid4().hex}.part")
+
+        digest = hashlib.sha256()
+        size = 0
+        stream = None
+        try:
+            with open(tmp_path, 'wb') as out:
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    chunks = [bytes(source)]
+                else:
+                    stream = open(source, 'rb') if isinstance(source, str) else getattr(source, 'stream', source)
+                    if hasattr(stream, 'seek'):
+                        stream.seek(0)
+                    chunks = iter(lambda: stream.read(READ_CHUNK), b'')
+                for chunk in chunks:
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            if isinstance(source, str):
+                stream.close()
+            elif hasattr(stream, 'seek'):
+                stream.seek(0)  # Leave uploads readable for later consumers
+
+            key = digest.hexdigest()
+            path = StorageService.local_path(key)
+            if os.path.exists(path):
+                os.remove(tmp_path)  # Same content already staged
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                _fsync_dir(os.path.dirname(path))
+            return key, path, size
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ----------------- STORE -----------------
+    @staticmethod
+    def _base_url() -> str:
+        base = current_app.config.get('PUBLIC_API_URL')
+        if base:
+            return base
+        if has_request_context():
+            return request.host_url
+        raise RuntimeError("PUBLIC_API_URL must be set to store files outside a request (workers, CLI)")
+
+    @staticmethod
+    def url(key: str) -> str:
+        return f"{StorageService._base_url().rstrip('/')}/api/files/{key}"
+
+    @staticmethod
+    def store(source, folder: str, filename: Optional[str] = None, content_type: Optional[str] = None,
+              resource_type: str = 'raw', wait: bool = False) -> str:
+        """
+        Stage ``source`` and return its URL. The backend upload (if any)
+        runs in the background, or before returning with ``wait`` (worker
+        processes: the web processes cannot see their staging directory).
+        The caller's session is neither flushed nor committed.
+        """
+        StorageService._base_url()  # Fail before staging anything
+        backend = current_app.config.get('STORAGE_BACKEND', 'cloudinary')
+        if wait and backend == 'local' and not current_app.config.get('STORAGE_LOCAL_SHARED'):
+            raise RuntimeError(
+                "STORAGE_BACKEND=local in a worker process needs STORAGE_LOCAL_DIR shared with "
+                "the web processes (set STORAGE_LOCAL_SHARED=true)"
+            )
+
+        filename = filename or getattr(source, 'filename', None) or os.path.basename(getattr(source, 'name', '') or '')
+        content_type = content_type or getattr(source, 'mimetype', None) or getattr(source, 'content_type', None)
+        key, path, size = StorageService.stage(source)
+
+        # Own transaction: committing db.session would publish the caller's half-done work
+        table = StoredFile.__table__
+        with db.engine.begin() as conn:
+            conn.execute(pg_insert(table).values(
+                key=key,
+                folder=folder,
+                filename=(filename or key)[:255],
+                content_type=content_type,
+                resource_type=resource_type,
+                size=size,
+                backend=backend,
+                status='uploaded' if backend == 'local' else 'staged',
+                attempts=0,
+                created_at=datetime.utcnow(),
+            ).on_conflict_do_nothing(index_elements=['key']))
+            stored_backend, status = conn.execute(
+                select(table.c.backend, table.c.status).where(table.c.key == key)
+            ).one()
+
+        if stored_backend != 'local':
+            if status == 'uploaded':
+                # Already on the backend; drop the copy staged by this call
+                StorageService._discard_local(key)
+            elif wait:
+                status, error = StorageService._upload_now(key)
+                if status != 'uploaded':
+                    raise RuntimeError(f"Upload of {key} failed: {error}")
+            else:
+                StorageService.enqueue(key)
+        return StorageService.url(key)
+
+    # ----------------- BACKGROUND UPLOAD -----------------
+    @staticmethod
+    def enqueue(key: str):
+        if StorageService._executor is None:
+            StorageService._executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('STORAGE_UPLOAD_THREADS', 2), thread_name_prefix='storage'
+            )
+        app = current_app._get_current_object()
+
+        def run():
+            with app.app_context():
+                try:
+                    StorageService.upload(key)
+                finally:
+                    db.session.remove()
+
+        StorageService._executor.submit(run)
+
+    @staticmethod
+    def _upload_now(key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Upload synchronously in a fresh app context (own session); returns (status, error)"""
+        with current_app._get_current_object().app_context():
+            try:
+                row = StorageService.upload(key, retry=False)
+                return (row.status, row.error) if row else (None, 'Unknown file')
+            finally:
+                db.session.remove()
+
+    @staticmethod
+    def upload(key: str, retry: bool = True) -> Optional[StoredFile]:
+        """Push one staged file to its backend; returns the row (None if unknown)"""
+        row = db.session.get(StoredFile, key)
+        if row is None or row.status == 'uploaded':
+            return row
+
+        path = StorageService.local_path(key)
+        row.attempts += 1
+        try:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Staged copy of {key} is missing")
+            row.remote_url = CloudinaryBackend.upload(
+                path, row, current_app.config.get('STORAGE_CHUNK_SIZE', 20 * 1024 * 1024)
+            )
+            row.status = 'uploaded'
+            row.uploaded_at = datetime.utcnow()
+            row.error = None
+            db.session.commit()
+            StorageService._discard_local(key)
+        except Exception as e:
+            logger.error(f"Upload of {key} failed (attempt {row.attempts}): {e}", exc_info=True)
+            row.error = str(e)[:2000]
+            exhausted = row.attempts >= StorageService.MAX_ATTEMPTS
+            row.status = 'failed' if exhausted else 'staged'
+            db.session.commit()
+            if retry and not exhausted:
+                StorageService.enqueue(key)
+        return row
+
+    @staticmethod
+    def sync() -> Tuple[int, int]:
+        """Upload every staged or failed file synchronously; returns (uploaded, failed)"""
+        keys = [key for (key,) in db.session.query(StoredFile.key).filter(
+            StoredFile.backend != 'local', StoredFile.status.in_(('staged', 'failed'))
+        ).order_by(StoredFile.created_at)]
+        uploaded = failed = 0
+        for key in keys:
+            row = db.session.get(StoredFile, key)
+            row.attempts = 0
+            row.status = 'staged'
+            db.session.commit()
+            row = StorageService.upload(key, retry=False)
+            if row.status == 'uploaded':
+                uploaded += 1
+            else:
+                failed += 1
+        return uploaded, failed
+
+    @staticmethod
+    def _discard_local(key: str):
+        try:
+            os.remove(StorageService.local_path(key))
+        except FileNotFoundError:
+            pass
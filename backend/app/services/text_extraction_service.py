@@ -0,0 +1,326 @@
+"""
+CV text extraction.
+
+One entry point for every upload path (enrollment / CV parse, background
+resume jobs, the legacy ``file_text_extractor`` helpers):
+
+- Works on in-memory bytes, file-like uploads or a file path; nothing is
+  written to temp files. Paths are opened by the backend directly (PyMuPDF
+  and pdfium memory-map them), so large files are never read into Python.
+- Picks the fastest installed backend per format: PyMuPDF, then pypdfium2,
+  then pdfplumber for PDF; a streaming parse of ``word/document.xml`` for
+  DOCX (python-docx as fallback); UTF-8 decoding for text.
+- Pages are produced one at a time (``iter_pages``) and collected into a list,
+  so a huge PDF never holds every page object at once. ``max_pages`` and
+  ``max_chars`` cap the work per document (DOCX pages are counted from its
+  page breaks).
+- ``extract`` runs the CPU-heavy parsing in a process of its own per
+  document, at most TEXT_EXTRACTION_PROCESSES at a time, with a timeout; a
+  timed-out document's process is killed without touching other parses.
+  Set TEXT_EXTRACTION_PROCESSES=0 to parse in-process.
+"""
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import zipfile
+from typing import Iterator, Optional, Union
+from xml.etree import ElementTree
+
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+Source = Union[bytes, bytearray, memoryview, str, os.PathLike]
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class ExtractionError(ValueError):
+    """Raised when a document cannot be parsed (corrupt, empty or timed out)"""
+
+
+def _setting(name: str, default: int) -> int:
+    if has_app_context():
+        return int(current_app.config.get(name, default))
+    return int(os.getenv(name, default))
+
+
+# ----------------- FORMAT DETECTION -----------------
+def detect_format(data: Optional[bytes], filename: Optional[str]) -> str:
+    """Return 'pdf', 'docx' or 'txt' from the extension, falling back to magic bytes (then text)"""
+    name = (filename or '').lower()
+    for fmt in ('pdf', 'docx', 'txt'):
+        if name.endswith('.' + fmt):
+            return fmt
+    head = bytes(data[:4]) if data is not None else b''
+    if head.startswith(b'%PDF'):
+        return 'pdf'
+    if head.startswith(b'PK'):
+        return 'docx'
+    return 'txt'
+
+
+# ----------------- PAGE ITERATORS -----------------
+def _pdf_pages_pymupdf(source, max_pages: int) -> Iterator[str]:
+    import fitz
+    doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+    try:
+        for index in range(min(doc.page_count, max_pages)):
+            yield doc.load_page(index).get_text()
+    finally:
+        doc.close()
+
+
+def _pdf_pages_pdfium(source, max_pages: int) -> Iterator[str]:
+    import pypdfium2 as pdfium
+    pdf = pdfium.PdfDocument(source if isinstance(source, str) else bytes(source))
+    try:
+        for index in range(min(len(pdf), max_pages)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                yield textpage.get_text_range()
+            finally:
+                textpage.close()
+                page.close()
+    finally:
+        pdf.close()
+
+
+def _pdf_pages_pdfplumber(source, max_pages: int) -> Iterator[str]:
+    import pdfplumber
+    with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text() or ""
+            page.close()
+
+
+def _docx_paragraphs_xml(source, max_pages: int) -> Iterator[str]:
+    # DOCX has no pages of its own: count hard page breaks and the breaks Word
+    # rendered when it last saved (a hard break is usually followed by one)
+    handle = source if isinstance(source, str) else io.BytesIO(source)
+    with zipfile.ZipFile(handle) as archive, archive.open('word/document.xml') as xml:
+        parts = []
+        page, first_page, after_break = 1, None, False
+        for _, element in ElementTree.iterparse(xml, events=('end',)):
+            tag = element.tag
+            if tag == _W + 't':
+                if element.text:
+                    after_break = False
+                    first_page = first_page or page
+                parts.append(element.text or '')
+            elif tag == _W + 'tab':
+                parts.append('\t')
+            elif tag in (_W + 'br', _W + 'cr'):
+                parts.append('\n')
+                if element.get(_W + 'type') == 'page':
+                    page, after_break = page + (not after_break), True
+            elif tag == _W + 'lastRenderedPageBreak':
+                page, after_break = page + (not after_break), True
+            elif tag == _W + 'p':
+                if (first_page or page) <= max_pages:
+                    yield ''.join(parts)
+                if page > max_pages:
+                    return
+                parts, first_page = [], None
+                element.clear()
+
+
+def _docx_paragraphs_python_docx(source, max_pages: int) -> Iterator[str]:
+    import docx
+    document = docx.Document(source if isinstance(source, str) else io.BytesIO(source))
+    page = 1
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+        # Only the breaks Word rendered are visible here
+        page += len(paragraph.rendered_page_breaks)
+        if page > max_pages:
+            return
+
+
+def _txt_pages(source, max_pages: int) -> Iterator[str]:
+    if isinstance(source, str):
+        with open(source, 'rb') as fh:
+            source = fh.read()
+    yield bytes(source).decode('utf-8-sig', errors='ignore')
+
+
+# Fastest first; a backend whose import fails is skipped
+BACKENDS = {
+    'pdf': (_pdf_pages_pymupdf, _pdf_pages_pdfium, _pdf_pages_pdfplumber),
+    'docx': (_docx_paragraphs_xml, _docx_paragraphs_python_docx),
+    'txt': (_txt_pages,),
+}
+
+
+def iter_pages(source, fmt: str, max_pages: int, info: Optional[dict] = None) -> Iterator[str]:
+    """
+    Yield the text of each page (paragraph for DOCX) using the first working
+    backend; its name is recorded in ``info['parser']`` when given.
+    """
+    last_error = None
+    for backend in BACKENDS[fmt]:
+        started = False
+        try:
+            for page in backend(source, max_pages):
+                if not started and info is not None:
+                    info['parser'] = backend.__name__.lstrip('_')
+                started = True
+                yield page
+            return
+        except ImportError as e:
+            last_error = e
+        except Exception as e:
+            # Only fall through to the next backend if nothing was yielded yet
+            if started:
+                raise ExtractionError(f"Failed to extract {fmt.upper()} text: {e}")
+            logger.warning("%s failed on %s document: %s", backend.__name__, fmt, e)
+            last_error = e
+    raise ExtractionError(f"Failed to extract {fmt.upper()} text: {last_error}")
+
+
+def _extract_worker(source, fmt: str, max_pages: int, max_chars: int) -> dict:
+    """Collect pages up to the character budget (runs in the extraction process)"""
+    info = {'format': fmt, 'parser': None}
+    pages, length = [], 0
+    for page in iter_pages(source, fmt, max_pages, info):
+        pages.append(page)
+        length += len(page) + 1
+        if length >= max_chars:
+            break
+    text = "\n".join(pages)
+    info.update(text=text[:max_chars].strip(), page_count=len(pages), truncated=len(text) > max_chars)
+    return info
+
+
+def _extract_child(conn, source, fmt: str, max_pages: int, max_chars: int):
+    """Entry point of a per-document process: send back (result, error)"""
+    try:
+        conn.send((_extract_worker(source, fmt, max_pages, max_chars), None))
+    except Exception as e:
+        conn.send((None, e if isinstance(e, ExtractionError) else ExtractionError(f"{type(e).__name__}: {e}")))
+    finally:
+        conn.close()
+
+
+class TextExtractionService:
+    """Service turning uploaded CV files into plain text"""
+
+    _slots: Optional[threading.BoundedSemaphore] = None
+    _slots_lock = threading.Lock()
+
+    @staticmethod
+    def read(source, filename: Optional[str] = None):
+        """Normalise a source to (bytes or path, filename) without temp files"""
+        if isinstance(source, os.PathLike):
+            source = os.fspath(source)
+        if isinstance(source, str):
+            return source, filename or source
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            return bytes(source), filename
+        # File-like (werkzeug FileStorage, open file, BytesIO)
+        filename = filename or getattr(source, 'filename', None) or getattr(source, 'name', None)
+        stream = getattr(source, 'stream', source)
+        if hasattr(stream, 'seek'):
+            stream.seek(0)
+        data = stream.read()
+        if hasattr(stream, 'seek'):
+            # Leave the upload readable for the next consumer (e.g. Cloudinary)
+            stream.seek(0)
+        return data, filename
+
+    @classmethod
+    def _acquire_slot(cls, processes: int) -> threading.BoundedSemaphore:
+        """Bound the number of extraction processes running at once"""
+        with cls._slots_lock:
+            if cls._slots is None:
+                cls._slots = threading.BoundedSemaphore(processes)
+            slots = cls._slots
+        slots.acquire()
+        return slots
+
+    @classmethod
+    def _run_in_process(cls, source, fmt: str, max_pages: int, max_chars: int,
+                        processes: int, timeout: float) -> dict:
+        """
+        Parse one document in its own process, so a timeout kills only that
+        document's parse and never another request's.
+        """
+        slots = cls._acquire_slot(processes)
+        try:
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(
+                target=_extract_child, args=(sender, source, fmt, max_pages, max_chars), daemon=True
+            )
+            process.start()
+            sender.close()
+            try:
+                if not receiver.poll(timeout):
+                    raise ExtractionError(f"Extraction timed out after {timeout}s")
+                result, error = receiver.recv()
+            except EOFError:
+                raise ExtractionError(f"Extraction process exited with code {process.exitcode}")
+            finally:
+                if process.is_alive():
+                    process.kill()
+                process.join()
+                receiver.close()
+        finally:
+            slots.release()
+        if error is not None:
+            raise error
+        return result
+
+    @staticmethod
+    def iter_pages(source: Source, filename: Optional[str] = None,
+                   max_pages: Optional[int] = None) -> Iterator[str]:
+        """Stream page texts in-process (no pool, no timeout)"""
+        source, filename = TextExtractionService.read(source, filename)
+        fmt = detect_format(source if not isinstance(source, str) else None, filename)
+        return iter_pages(source, fmt, max_pages or _setting('TEXT_EXTRACTION_MAX_PAGES', 50))
+
+    @classmethod
+    def extract(cls, source: Source, filename: Optional[str] = None, max_pages: Optional[int] = None,
+                max_chars: Optional[int] = None, timeout: Optional[float] = None) -> str:
+        """
+        Extract the text of a PDF, DOCX or TXT document.
+
+        Args:
+            source: bytes, file path or file-like upload
+            filename: Used to detect the format (magic bytes otherwise)
+            max_pages: Stop after this many pages
+            max_chars: Truncate the text to this many characters
+            timeout: Seconds before giving up on the document (pool mode only)
+
+        Raises:
+            ExtractionError for unreadable or timed-out documents
+        """
+        return cls.extract_document(source, filename, max_pages, max_chars, timeout)['text']
+
+    @classmethod
+    def extract_document(cls, source: Source, filename: Optional[str] = None, max_pages: Optional[int] = None,
+                         max_chars: Optional[int] = None, timeout: Optional[float] = None,
+                         inline: bool = False) -> dict:
+        """
+        Like extract, but returns {text, format, parser, page_count, truncated}.
+        ``inline`` parses in the calling process (for callers that already run
+        in a worker process).
+        """
+        source, filename = cls.read(source, filename)
+        if isinstance(source, str):
+            with open(source, 'rb') as fh:
+                head = fh.read(4)
+        else:
+            head = source
+        fmt = detect_format(head, filename)
+
+        max_pages = max_pages or _setting('TEXT_EXTRACTION_MAX_PAGES', 50)
+        max_chars = max_chars or _setting('TEXT_EXTRACTION_MAX_CHARS', 200_000)
+        processes = 0 if inline else _setting('TEXT_EXTRACTION_PROCESSES', 2)
+        if processes <= 0:
+            return _extract_worker(source, fmt, max_pages, max_chars)
+
+        timeout = timeout or _setting('TEXT_EXTRACTION_TIMEOUT_SECONDS', 30)
+        return cls._run_in_process(source, fmt, max_pages, max_chars, processes, timeout)
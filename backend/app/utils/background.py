@@ -0,0 +1,49 @@
+"""
+Fire-and-forget maintenance tasks kept off the request path.
+
+Tasks run one at a time on a single daemon thread inside an app context; a
+task that is already queued or running is not queued again, so a burst of
+requests noticing the same stale data schedules one refresh.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from flask import current_app
+
+from app.extensions import db
+
+_executor = None
+_pending = set()
+_lock = threading.Lock()
+
+
+def schedule_once(name: str, task: Callable[[], object]) -> bool:
+    """
+    Queue ``task`` on the maintenance thread unless ``name`` is already pending.
+
+    Returns:
+        True if the task was queued
+    """
+    global _executor
+    with _lock:
+        if name in _pending:
+            return False
+        _pending.add(name)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='maintenance')
+    app = current_app._get_current_object()
+
+    def run():
+        with app.app_context():
+            try:
+                task()
+            except Exception as e:
+                app.logger.error(f"Background task {name} failed: {e}", exc_info=True)
+            finally:
+                with _lock:
+                    _pending.discard(name)
+                db.session.remove()
+
+    _executor.submit(run)
+    return True
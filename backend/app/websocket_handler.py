@@ -8,6 +8,7 @@ from flask_socketio import emit, join_room, leave_room, disconnect
 from app.extensions import socketio, db
 from app.models import User
 from app.services.chat_service import ChatService
+from app.services.presence_service import PresenceService
 
 
 def socket_auth_required(f):
@@ -109,12 +110,8 @@ def register_websocket_handlers(app):
             join_room(f'user_{user_id}')
             current_app.logger.info(f"✅ User {user_id} joined personal room")
             
-            # Update user presence to online
-            ChatService.update_presence(
-                user_id=user_id,
-                status='online',
-                socket_id=request.sid
-            )
+            # Register this socket; contacts hear about it in the next presence flush
+            PresenceService.connect(user_id, request.sid)
             
             # Join all user's existing chat threads
             user = User.query.get(user_id)
@@ -135,6 +132,23 @@ def register_websocket_handlers(app):
                 'message': 'Successfully connected to chat server'
             })
             
+            # Replay what a reconnecting client missed: ?since=<cursor of the
+            # last message it received>, or ?since=unread for everything past
+            # its read cursors
+            since = request.args.get('since')
+            if since:
+                try:
+                    missed = ChatService.get_missed_messages(
+                        user_id, since=None if since == 'unread' else since
+                    )
+                    emit('missed_messages', {
+                        'success': True,
+                        'threads': missed,
+                        'timestamp': datetime.utcnow().isoformat()
+                    })
+                except ValueError as e:
+                    emit('error', {'message': f'Failed to sync messages: {str(e)}'})
+            
             current_app.logger.info(
                 f"✅ WebSocket connected: User {user_id}, SID {request.sid}"
             )
@@ -153,19 +167,10 @@ def register_websocket_handlers(app):
         try:
             # Note: We can't use @socket_auth_required here as token might not be available
             
-            # Try to find user by socket ID from presence records
-            from app.models import UserPresence
-            presence = UserPresence.query.filter_by(socket_id=request.sid).first()
+            # Sockets are tracked by the worker holding them, no lookup needed
+            user_id = PresenceService.disconnect(request.sid)
             
-            if presence:
-                user_id = presence.user_id
-                
-                # Update presence to offline
-                ChatService.update_presence(
-                    user_id=user_id,
-                    status='offline'
-                )
-                
+            if user_id is not None:
                 current_app.logger.info(f"🔴 User {user_id} disconnected")
             else:
                 current_app.logger.warning(f"🔴 Unknown client disconnected: {request.sid}")
@@ -390,15 +395,18 @@ def register_websocket_handlers(app):
                     )
                     continue
             
-            # Mark messages as read
-            # This will be handled automatically when fetching messages
-            # But we can still send an acknowledgment
+            # Advance the read cursor (to the newest listed message, else the latest)
+            last_read_message_id = ChatService.mark_read(
+                thread_id, user_id, max(message_ids) if message_ids else None
+            )
+            db.session.commit()
             
             emit('messages_read', {
                 'success': True,
                 'thread_id': thread_id,
                 'user_id': user_id,
                 'message_ids': message_ids,
+                'last_read_message_id': last_read_message_id,
                 'timestamp': datetime.utcnow().isoformat()
             })
             
@@ -410,6 +418,25 @@ def register_websocket_handlers(app):
             current_app.logger.error(f"❌ Error marking messages as read: {e}")
             emit('error', {'message': f'Failed to mark messages as read: {str(e)}'})
     
+    @socketio.on('presence')
+    @socket_auth_required
+    def handle_presence(data: Dict[str, Any]):
+        """Set the user's status ('online', 'away', 'busy')"""
+        try:
+            user_id = request.user_id
+            status = (data or {}).get('status')
+
+            if not status:
+                emit('error', {'message': 'Status is required'})
+                return
+
+            PresenceService.set_status(user_id, status)
+            current_app.logger.debug(f"👤 User {user_id} set presence to {status}")
+
+        except Exception as e:
+            current_app.logger.error(f"❌ Error setting presence: {e}")
+            emit('error', {'message': f'Failed to set presence: {str(e)}'})
+
     @socketio.on('get_presence')
     @socket_auth_required
     def handle_get_presence(data: Dict[str, Any]):
@@ -438,7 +465,7 @@ def register_websocket_handlers(app):
                 return
             
             # Get presence data
-            presences = ChatService.get_presence(user_ids)
+            presences = PresenceService.get(user_ids)
             
             emit('presence_data', {
                 'success': True,
@@ -548,16 +575,19 @@ def register_websocket_handlers(app):
                 entity_id = str(entity_id_raw)
             
             # Get threads
-            threads = ChatService.get_user_threads(
+            threads, next_cursor = ChatService.get_user_threads(
                 user_id=user_id,
                 entity_type=entity_type,
-                entity_id=entity_id
+                entity_id=entity_id,
+                limit=min(int(data.get('limit', 50)), 100),
+                cursor=data.get('cursor')
             )
             
             emit('threads_data', {
                 'success': True,
                 'threads': threads,
                 'count': len(threads),
+                'next_cursor': next_cursor,
                 'timestamp': datetime.utcnow().isoformat()
             })
             
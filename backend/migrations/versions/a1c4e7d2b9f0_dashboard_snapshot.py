@@ -0,0 +1,30 @@
+"""dashboard snapshot table
+
+Revision ID: a1c4e7d2b9f0
+Revises: 5e59a6f99a77
+Create Date: 2026-10-18 09:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c4e7d2b9f0'
+down_revision = '5e59a6f99a77'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dashboard_snapshot',
+    sa.Column('metric', sa.String(length=100), nullable=False),
+    sa.Column('bucket', sa.String(length=10), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('metric', 'bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_snapshot')
@@ -0,0 +1,36 @@
+"""chat inbox indexes
+
+Revision ID: a6c1e9d4b2f7
+Revises: e8b2c4f6a9d3
+Create Date: 2026-10-18 23:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c1e9d4b2f7'
+down_revision = 'e8b2c4f6a9d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_thread_id_created_at', ['thread_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('chat_participants', schema=None) as batch_op:
+        batch_op.create_index('idx_chat_thread_user', ['chat_thread_id', 'user_id'], unique=False)
+        batch_op.drop_index('idx_chat_thread')
+        batch_op.drop_index('idx_chat_user')
+
+
+def downgrade():
+    with op.batch_alter_table('chat_participants', schema=None) as batch_op:
+        batch_op.create_index('idx_chat_user', ['user_id'], unique=False)
+        batch_op.create_index('idx_chat_thread', ['chat_thread_id'], unique=False)
+        batch_op.drop_index('idx_chat_thread_user')
+
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_thread_id_created_at')
@@ -0,0 +1,48 @@
+"""background cv analysis jobs
+
+Revision ID: a8e3f5b1d7c2
+Revises: f2b8d6a1c4e9
+Create Date: 2026-10-18 17:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e3f5b1d7c2'
+down_revision = 'f2b8d6a1c4e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cv_analysis_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('application_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('file_data', sa.LargeBinary(), nullable=True),
+    sa.Column('resume_text', sa.Text(), nullable=True),
+    sa.Column('result', postgresql.JSON(astext_type=sa.Text()), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['application_id'], ['applications.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cv_analysis_jobs_application_id'), ['application_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cv_analysis_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cv_analysis_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_cv_analysis_jobs_application_id'))
+    op.drop_table('cv_analysis_jobs')
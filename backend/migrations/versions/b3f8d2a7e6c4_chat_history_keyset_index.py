@@ -0,0 +1,29 @@
+"""chat history keyset index
+
+Revision ID: b3f8d2a7e6c4
+Revises: a6c1e9d4b2f7
+Create Date: 2026-10-18 23:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3f8d2a7e6c4'
+down_revision = 'a6c1e9d4b2f7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_thread_id_created_at_id', ['thread_id', 'created_at', 'id'],
+                              unique=False, postgresql_where=sa.text('is_deleted = false'))
+        batch_op.drop_index('ix_chat_messages_thread_id_created_at')
+
+
+def downgrade():
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_thread_id_created_at', ['thread_id', 'created_at'], unique=False)
+        batch_op.drop_index('ix_chat_messages_thread_id_created_at_id')
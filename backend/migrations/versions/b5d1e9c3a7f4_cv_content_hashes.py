@@ -0,0 +1,34 @@
+"""cv content hashes for the extraction store
+
+Revision ID: b5d1e9c3a7f4
+Revises: a8e3f5b1d7c2
+Create Date: 2026-10-18 19:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5d1e9c3a7f4'
+down_revision = 'a8e3f5b1d7c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cv_analyses', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cv_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index(batch_op.f('ix_cv_analyses_cv_hash'), ['cv_hash'], unique=False)
+
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('file_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.drop_column('file_hash')
+
+    with op.batch_alter_table('cv_analyses', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cv_analyses_cv_hash'))
+        batch_op.drop_column('cv_hash')
@@ -0,0 +1,32 @@
+"""index application_id on interviews and assessment_results
+
+Revision ID: b7d2f5a8c3e1
+Revises: a1c4e7d2b9f0
+Create Date: 2026-10-18 10:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2f5a8c3e1'
+down_revision = 'a1c4e7d2b9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_interviews_application_id'), ['application_id'], unique=False)
+
+    with op.batch_alter_table('assessment_results', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_assessment_results_application_id'), ['application_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('assessment_results', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assessment_results_application_id'))
+
+    with op.batch_alter_table('interviews', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_interviews_application_id'))
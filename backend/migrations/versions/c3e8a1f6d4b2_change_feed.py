@@ -0,0 +1,57 @@
+"""change feed: updated_at columns and deleted_records tombstones
+
+Revision ID: c3e8a1f6d4b2
+Revises: b7d2f5a8c3e1
+Create Date: 2026-10-18 11:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a1f6d4b2'
+down_revision = 'b7d2f5a8c3e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE applications SET updated_at = COALESCE(created_at, now())")
+
+    with op.batch_alter_table('assessment_results', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE assessment_results SET updated_at = COALESCE(assessed_at, created_at, now())")
+    op.execute("UPDATE interviews SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL")
+
+    for table in ('applications', 'assessment_results', 'interviews', 'offers'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_updated_at'), ['updated_at'], unique=False)
+
+    op.create_table('deleted_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('deleted_records', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_deleted_records_deleted_at'), ['deleted_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('deleted_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_deleted_records_deleted_at'))
+    op.drop_table('deleted_records')
+
+    for table in ('offers', 'interviews', 'assessment_results', 'applications'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_updated_at'))
+
+    with op.batch_alter_table('assessment_results', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('applications', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
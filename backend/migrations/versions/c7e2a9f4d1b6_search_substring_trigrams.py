@@ -0,0 +1,39 @@
+"""trigram indexes for substring search on phones, meetings and audit details
+
+Revision ID: c7e2a9f4d1b6
+Revises: b3f8d2a7e6c4
+Create Date: 2026-10-19 10:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7e2a9f4d1b6'
+down_revision = 'b3f8d2a7e6c4'
+branch_labels = None
+depends_on = None
+
+
+TRIGRAM_INDEXES = (
+    ('candidates', 'idx_candidates_phone_trgm', 'phone'),
+    ('meetings', 'idx_meetings_title_trgm', 'title'),
+    ('meetings', 'idx_meetings_description_trgm', 'description'),
+    ('audit_logs', 'idx_audit_logs_details_trgm', 'details'),
+)
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, name, column in TRIGRAM_INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, [column], unique=False, postgresql_using='gin',
+                                  postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    for table, name, _ in TRIGRAM_INDEXES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
@@ -0,0 +1,28 @@
+"""candidate cv hash for bulk import upserts
+
+Revision ID: c9f4a2e6b8d1
+Revises: b5d1e9c3a7f4
+Create Date: 2026-10-18 19:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9f4a2e6b8d1'
+down_revision = 'b5d1e9c3a7f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('candidates', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cv_hash', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('candidates_cv_hash_key', ['cv_hash'])
+
+
+def downgrade():
+    with op.batch_alter_table('candidates', schema=None) as batch_op:
+        batch_op.drop_constraint('candidates_cv_hash_key', type_='unique')
+        batch_op.drop_column('cv_hash')
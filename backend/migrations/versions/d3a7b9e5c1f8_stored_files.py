@@ -0,0 +1,44 @@
+"""content-addressed stored files
+
+Revision ID: d3a7b9e5c1f8
+Revises: c9f4a2e6b8d1
+Create Date: 2026-10-18 20:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a7b9e5c1f8'
+down_revision = 'c9f4a2e6b8d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_files',
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('folder', sa.String(length=100), nullable=True),
+    sa.Column('filename', sa.String(length=255), nullable=True),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('resource_type', sa.String(length=20), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('backend', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('remote_url', sa.String(length=1024), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('uploaded_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stored_files_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stored_files_status'))
+
+    op.drop_table('stored_files')
@@ -0,0 +1,38 @@
+"""append-only dashboard snapshot deltas
+
+Revision ID: d4b9e1c6a8f2
+Revises: c7e2a9f4d1b6
+Create Date: 2026-10-19 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b9e1c6a8f2'
+down_revision = 'c7e2a9f4d1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dashboard_snapshot_deltas',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('metric', sa.String(length=100), nullable=False),
+    sa.Column('bucket', sa.String(length=10), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    # Fold pending deltas into the snapshot before dropping them
+    op.execute(
+        "INSERT INTO dashboard_snapshot (metric, bucket, value, updated_at) "
+        "SELECT metric, bucket, sum(value), now() FROM dashboard_snapshot_deltas GROUP BY metric, bucket "
+        "ON CONFLICT (metric, bucket) DO UPDATE SET value = dashboard_snapshot.value + excluded.value, "
+        "updated_at = excluded.updated_at"
+    )
+    op.drop_table('dashboard_snapshot_deltas')
@@ -0,0 +1,54 @@
+"""analytics daily rollups
+
+Revision ID: d9f1b4c7e2a5
+Revises: c3e8a1f6d4b2
+Create Date: 2026-10-18 13:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9f1b4c7e2a5'
+down_revision = 'c3e8a1f6d4b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_daily_rollups',
+    sa.Column('fact', sa.String(length=20), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('requisition_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=False),
+    sa.Column('score_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('fact', 'day', 'requisition_id', 'status')
+    )
+    with op.batch_alter_table('analytics_daily_rollups', schema=None) as batch_op:
+        batch_op.create_index('idx_rollup_fact_requisition', ['fact', 'requisition_id'], unique=False)
+
+    op.create_table('analytics_rollup_state',
+    sa.Column('fact', sa.String(length=20), nullable=False),
+    sa.Column('watermark', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('fact')
+    )
+
+    for table in ('applications', 'assessment_results', 'interviews'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_created_at'), ['created_at'], unique=False)
+
+
+def downgrade():
+    for table in ('interviews', 'assessment_results', 'applications'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_created_at'))
+
+    op.drop_table('analytics_rollup_state')
+
+    with op.batch_alter_table('analytics_daily_rollups', schema=None) as batch_op:
+        batch_op.drop_index('idx_rollup_fact_requisition')
+    op.drop_table('analytics_daily_rollups')
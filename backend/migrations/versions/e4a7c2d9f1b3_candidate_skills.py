@@ -0,0 +1,47 @@
+"""normalized candidate skills and skill frequencies
+
+Revision ID: e4a7c2d9f1b3
+Revises: d9f1b4c7e2a5
+Create Date: 2026-10-18 15:10:00.000000
+
+Run `flask rebuild-candidate-skills` once after upgrading to backfill
+existing candidates.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4a7c2d9f1b3'
+down_revision = 'd9f1b4c7e2a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('candidate_skills',
+    sa.Column('candidate_id', sa.Integer(), nullable=False),
+    sa.Column('skill', sa.String(length=100), nullable=False),
+    sa.ForeignKeyConstraint(['candidate_id'], ['candidates.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('candidate_id', 'skill')
+    )
+    with op.batch_alter_table('candidate_skills', schema=None) as batch_op:
+        batch_op.create_index('idx_candidate_skills_skill', ['skill', 'candidate_id'], unique=False)
+
+    op.create_table('skill_frequencies',
+    sa.Column('skill', sa.String(length=100), nullable=False),
+    sa.Column('candidate_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('skill')
+    )
+    with op.batch_alter_table('skill_frequencies', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_skill_frequencies_candidate_count'), ['candidate_count'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('skill_frequencies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_skill_frequencies_candidate_count'))
+    op.drop_table('skill_frequencies')
+
+    with op.batch_alter_table('candidate_skills', schema=None) as batch_op:
+        batch_op.drop_index('idx_candidate_skills_skill')
+    op.drop_table('candidate_skills')
@@ -0,0 +1,40 @@
+"""cv job retry backoff and one active job per application
+
+Revision ID: e5c8b2f4a9d1
+Revises: d4b9e1c6a8f2
+Create Date: 2026-10-19 12:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5c8b2f4a9d1'
+down_revision = 'd4b9e1c6a8f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('not_before', sa.DateTime(), nullable=True))
+
+    # Keep only the newest active job of applications that raced in duplicates
+    op.execute(
+        "UPDATE cv_analysis_jobs SET status = 'failed', finished_at = now(), "
+        "error = 'Superseded by a concurrent upload', file_data = NULL "
+        "WHERE status IN ('queued', 'running') AND id NOT IN ("
+        "SELECT DISTINCT ON (application_id) id FROM cv_analysis_jobs "
+        "WHERE status IN ('queued', 'running') ORDER BY application_id, created_at DESC)"
+    )
+    op.create_index('uq_cv_analysis_jobs_active_application', 'cv_analysis_jobs', ['application_id'],
+                    unique=True, postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+
+def downgrade():
+    op.drop_index('uq_cv_analysis_jobs_active_application', table_name='cv_analysis_jobs',
+                  postgresql_where=sa.text("status IN ('queued', 'running')"))
+
+    with op.batch_alter_table('cv_analysis_jobs', schema=None) as batch_op:
+        batch_op.drop_column('not_before')
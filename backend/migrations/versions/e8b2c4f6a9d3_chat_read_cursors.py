@@ -0,0 +1,64 @@
+"""chat read cursors replace per-message read rows
+
+Revision ID: e8b2c4f6a9d3
+Revises: d3a7b9e5c1f8
+Create Date: 2026-10-18 21:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b2c4f6a9d3'
+down_revision = 'd3a7b9e5c1f8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('chat_read_cursors',
+    sa.Column('thread_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_message_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['thread_id'], ['chat_threads.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('thread_id', 'user_id')
+    )
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_chat_messages_thread_id_id', ['thread_id', 'id'], unique=False)
+
+    # Collapse read rows into one watermark per (thread, user): the newest message read
+    op.execute("""
+        INSERT INTO chat_read_cursors (thread_id, user_id, last_read_message_id, last_read_at)
+        SELECT m.thread_id, r.user_id, MAX(r.message_id), COALESCE(MAX(r.read_at), now())
+        FROM message_read_status r
+        JOIN chat_messages m ON m.id = r.message_id
+        GROUP BY m.thread_id, r.user_id
+    """)
+    op.drop_table('message_read_status')
+
+
+def downgrade():
+    op.create_table('message_read_status',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('message_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['message_id'], ['chat_messages.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('message_id', 'user_id', name='uq_message_user')
+    )
+    # Only the watermark message is known per cursor; the old unread logic keyed on it
+    op.execute("""
+        INSERT INTO message_read_status (message_id, user_id, read_at)
+        SELECT c.last_read_message_id, c.user_id, c.last_read_at
+        FROM chat_read_cursors c
+        JOIN chat_messages m ON m.id = c.last_read_message_id
+    """)
+    with op.batch_alter_table('chat_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_chat_messages_thread_id_id')
+
+    op.drop_table('chat_read_cursors')
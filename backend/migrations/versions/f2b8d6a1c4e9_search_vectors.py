@@ -0,0 +1,68 @@
+"""full-text search vectors and trigram indexes
+
+Revision ID: f2b8d6a1c4e9
+Revises: e4a7c2d9f1b3
+Create Date: 2026-10-18 16:05:00.000000
+
+The search_vector columns are generated (STORED), so Postgres fills them for
+existing rows while the column is added; no backfill is needed.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d6a1c4e9'
+down_revision = 'e4a7c2d9f1b3'
+branch_labels = None
+depends_on = None
+
+
+SEARCH_VECTORS = {
+    'candidates': (('full_name', 'A'), ('title', 'B'), ('phone', 'C'), ('location', 'C')),
+    'requisitions': (('title', 'A'), ('category', 'B'), ('description', 'C')),
+    'meetings': (('title', 'A'), ('description', 'B')),
+    'audit_logs': (('action', 'A'), ('details', 'B')),
+}
+
+TRIGRAM_INDEXES = {
+    'candidates': ('idx_candidates_full_name_trgm', 'full_name'),
+    'requisitions': ('idx_requisitions_title_trgm', 'title'),
+}
+
+
+def _expression(weighted_columns):
+    return " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({column}, '')), '{weight}')"
+        for column, weight in weighted_columns
+    )
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in SEARCH_VECTORS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(
+                'search_vector', postgresql.TSVECTOR(),
+                sa.Computed(_expression(columns), persisted=True), nullable=True
+            ))
+            batch_op.create_index(f'idx_{table}_search', ['search_vector'], unique=False,
+                                  postgresql_using='gin')
+
+    for table, (name, column) in TRIGRAM_INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(name, [column], unique=False, postgresql_using='gin',
+                                  postgresql_ops={column: 'gin_trgm_ops'})
+
+
+def downgrade():
+    for table, (name, _) in TRIGRAM_INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(name)
+
+    for table in SEARCH_VECTORS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'idx_{table}_search')
+            batch_op.drop_column('search_vector')
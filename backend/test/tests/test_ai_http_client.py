@@ -0,0 +1,90 @@
+import pytest
+import requests
+
+from app.services import ai_http_client
+from app.services.ai_http_client import AIHttpClient, AIRequestError, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=None, headers=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.headers = headers or {}
+        self.text = str(self._body)
+
+    def json(self):
+        return self._body
+
+    def iter_lines(self, decode_unicode=False):
+        return iter(self._body.get("lines", []))
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def post(self, url, headers=None, json=None, timeout=None, stream=False):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(ai_http_client.time, "sleep", recorded.append)
+    return recorded
+
+
+def test_retry_after_parsing():
+    assert retry_after_seconds("3") == 3.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+
+
+def test_honours_retry_after_then_succeeds(monkeypatch, sleeps):
+    session = FakeSession([
+        FakeResponse(429, headers={"Retry-After": "2"}),
+        requests.exceptions.ConnectionError("reset"),
+        FakeResponse(200, {"ok": True}),
+    ])
+    monkeypatch.setattr(AIHttpClient, "_session", session)
+
+    assert AIHttpClient.post_json("https://ai.test", {}, retries=3, backoff_base=0.5) == {"ok": True}
+    assert session.calls == 3
+    assert sleeps[0] == 2.0
+    assert 0 <= sleeps[1] <= 1.0
+
+
+def test_client_errors_and_deadline_are_not_retried(monkeypatch, sleeps):
+    monkeypatch.setattr(AIHttpClient, "_session", FakeSession([FakeResponse(401)]))
+    with pytest.raises(AIRequestError) as exc:
+        AIHttpClient.post_json("https://ai.test", {}, retries=3)
+    assert exc.value.status_code == 401
+
+    monkeypatch.setattr(AIHttpClient, "_session", FakeSession([FakeResponse(503, headers={"Retry-After": "30"})]))
+    with pytest.raises(AIRequestError):
+        AIHttpClient.post_json("https://ai.test", {}, retries=3, deadline=5)
+    assert sleeps == []
+
+
+def test_stream_events_yields_data_until_done(monkeypatch):
+    lines = [
+        ": OPENROUTER PROCESSING",
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}',
+        "",
+        'data: {"choices": [{"delta": {"content": "lo"}}]}',
+        "data: [DONE]",
+        'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+    ]
+    monkeypatch.setattr(AIHttpClient, "_session", FakeSession([FakeResponse(200, {"lines": lines})]))
+
+    events = list(AIHttpClient.stream_events("https://ai.test", {"stream": True}))
+
+    assert [e["choices"][0]["delta"]["content"] for e in events] == ["Hel", "lo"]
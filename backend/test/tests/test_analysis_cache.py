@@ -0,0 +1,34 @@
+import time
+
+from app.services.analysis_cache import AnalysisCache
+
+
+def test_key_ignores_whitespace_and_case_but_not_prompt_version():
+    key = AnalysisCache.make_key("Python  Dev\n", "Backend role", "model", "v1")
+    assert key == AnalysisCache.make_key("python dev", "backend   role", "model", "v1")
+    assert key != AnalysisCache.make_key("python dev", "backend role", "model", "v2")
+
+
+def test_lru_eviction_ttl_and_stats(monkeypatch):
+    cache = AnalysisCache(max_entries=2, ttl_seconds=60, backend="memory")
+    calls = []
+
+    def compute(score):
+        calls.append(score)
+        return {"match_score": score}
+
+    assert cache.get_or_compute("a", lambda: compute(1)) == {"match_score": 1}
+    cache.get_or_compute("b", lambda: compute(2))
+    assert cache.get_or_compute("a", lambda: compute(99)) == {"match_score": 1, "cached": True}
+    cache.get_or_compute("c", lambda: compute(3))  # evicts "b", the least recently used
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"match_score": 1}
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    assert cache.get("a") is None
+
+    assert calls == [1, 2, 3]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 5
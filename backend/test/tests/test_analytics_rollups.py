@@ -0,0 +1,61 @@
+from app import db
+from app.models import Requisition, Candidate, Application, AnalyticsDailyRollup
+from app.services.analytics_rollup_service import AnalyticsRollupService
+
+
+def _counts():
+    rows = AnalyticsDailyRollup.query.filter_by(fact="applications").all()
+    counts = {}
+    for row in rows:
+        counts[row.status] = counts.get(row.status, 0) + row.count
+    return counts
+
+
+def test_catch_up_recomputes_changed_days(app, monkeypatch):
+    monkeypatch.setitem(app.config, "CHANGE_FEED_SAFETY_SECONDS", 0)
+    job = Requisition(title="Engineer", description="desc", vacancy=1)
+    candidate = Candidate(full_name="Alice")
+    db.session.add_all([job, candidate])
+    db.session.flush()
+    apps = [
+        Application(candidate_id=candidate.id, requisition_id=job.id, status="applied")
+        for _ in range(3)
+    ]
+    db.session.add_all(apps)
+    db.session.commit()
+
+    AnalyticsRollupService.backfill()
+    assert _counts() == {"applied": 3}
+
+    apps[0].status = "rejected"
+    db.session.commit()
+
+    result = AnalyticsRollupService.catch_up()
+    assert result["applications"] == "1 days"
+    assert _counts() == {"applied": 2, "rejected": 1}
+
+    db.session.delete(apps[1])
+    db.session.commit()
+
+    assert AnalyticsRollupService.catch_up()["applications"] == "backfilled"
+    assert _counts() == {"applied": 1, "rejected": 1}
+
+
+def test_requests_serve_stale_rollups_without_catching_up(app, client, monkeypatch):
+    from app.services import analytics_rollup_service
+
+    scheduled = []
+    monkeypatch.setattr(analytics_rollup_service, "schedule_once", lambda name, task: scheduled.append(name))
+    monkeypatch.setattr(AnalyticsRollupService, "catch_up",
+                        lambda wait=True: (_ for _ in ()).throw(AssertionError("caught up inline")))
+
+    response = client.get("/api/analytics/applications/monthly")
+    assert response.status_code == 200
+    assert "X-Rollups-Refreshed-At" not in response.headers
+    assert scheduled == ["analytics-rollups.catch-up"]
+
+    AnalyticsRollupService.backfill()
+    scheduled.clear()
+    response = client.get("/api/analytics/applications/monthly")
+    assert response.headers["X-Rollups-Refreshed-At"]
+    assert scheduled == []
@@ -0,0 +1,42 @@
+from app import db
+from app.models import Candidate, CandidateSkill
+from app.services.candidate_skill_service import CandidateSkillService
+
+
+def test_skills_are_normalized_and_counted(app):
+    alice = Candidate(full_name="Alice", skills=["Python", "  python ", "SQL"])
+    bob = Candidate(full_name="Bob", skills=[{"name": "python"}])
+    db.session.add_all([alice, bob])
+    db.session.commit()
+
+    assert CandidateSkillService.frequencies() == {"python": 2, "sql": 1}
+
+    alice.skills = ["SQL", "Docker"]
+    db.session.commit()
+    assert CandidateSkillService.frequencies() == {"docker": 1, "python": 1, "sql": 1}
+
+    db.session.delete(bob)
+    db.session.commit()
+    assert CandidateSkillService.frequencies() == {"docker": 1, "sql": 1}
+    assert {s.skill for s in CandidateSkill.query.filter_by(candidate_id=alice.id)} == {"docker", "sql"}
+
+
+def test_has_skills_filter_requires_every_skill(app):
+    alice = Candidate(full_name="Alice", skills=["Python", "SQL"])
+    bob = Candidate(full_name="Bob", skills=["Python"])
+    db.session.add_all([alice, bob])
+    db.session.commit()
+
+    matches = Candidate.query.filter(CandidateSkillService.has_skills_filter(["python", "sql"])).all()
+    assert [c.id for c in matches] == [alice.id]
+
+
+def test_deleting_a_candidate_outside_the_orm_cascades(app):
+    alice = Candidate(full_name="Alice", skills=["Python"])
+    db.session.add(alice)
+    db.session.commit()
+
+    db.session.execute(Candidate.__table__.delete().where(Candidate.__table__.c.id == alice.id))
+    db.session.commit()
+
+    assert CandidateSkill.query.count() == 0
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Requisition, Candidate, Application
+from app.services.change_feed_service import ChangeFeedService
+
+
+@pytest.fixture
+def no_lag(app):
+    previous = app.config.get("CHANGE_FEED_SAFETY_SECONDS")
+    app.config["CHANGE_FEED_SAFETY_SECONDS"] = 0
+    yield
+    app.config["CHANGE_FEED_SAFETY_SECONDS"] = previous
+
+
+def _applications(count, updated_at=None):
+    job = Requisition(title="Engineer", description="desc", vacancy=1)
+    candidate = Candidate(full_name="Alice")
+    db.session.add_all([job, candidate])
+    db.session.flush()
+    apps = [
+        Application(candidate_id=candidate.id, requisition_id=job.id, updated_at=updated_at)
+        for _ in range(count)
+    ]
+    db.session.add_all(apps)
+    db.session.commit()
+    return apps
+
+
+def test_changes_and_tombstones_after_watermark(app, no_lag):
+    apps = _applications(2)
+    first = ChangeFeedService.get_changes(None)
+    assert {a["id"] for a in first["changes"]["applications"]} == {a.id for a in apps}
+
+    watermark = datetime.fromisoformat(first["watermark"])
+    apps[0].status = "screening"
+    deleted_id = apps[1].id
+    db.session.delete(apps[1])
+    db.session.commit()
+
+    second = ChangeFeedService.get_changes(watermark)
+    assert [a["id"] for a in second["changes"]["applications"]] == [apps[0].id]
+    assert second["deleted"] == [
+        {"entity": "applications", "id": deleted_id, "deleted_at": second["deleted"][0]["deleted_at"]}
+    ]
+
+
+def test_limit_never_splits_rows_with_same_timestamp(app, no_lag):
+    stamp = datetime.utcnow() - timedelta(minutes=1)
+    apps = _applications(3, updated_at=stamp)
+
+    feed = ChangeFeedService.get_changes(None, limit=2)
+
+    assert feed["has_more"] is True
+    assert len(feed["changes"]["applications"]) == len(apps)
+    assert feed["watermark"] == stamp.isoformat()
@@ -0,0 +1,63 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.extensions import socketio
+from app.models import ChatMessage, ChatThread, User
+from app.services.chat_service import ChatService, encode_cursor
+
+
+def test_history_pages_through_timestamp_ties(app, monkeypatch):
+    monkeypatch.setattr(socketio, "emit", lambda *args, **kwargs: None)
+    alice, bob = (User(email=f"{name}@history.example.com", password="x", role="hr") for name in ("alice", "bob"))
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    thread = ChatThread(title="Hiring", created_by=alice.id)
+    thread.participants.extend([alice, bob])
+    db.session.add(thread)
+    db.session.flush()
+    # Every message shares one timestamp: only the id breaks the tie
+    now = datetime.utcnow()
+    db.session.add_all([ChatMessage(thread_id=thread.id, sender_id=alice.id, content=str(i), created_at=now)
+                        for i in range(5)])
+    db.session.commit()
+
+    newest, page = ChatService.get_thread_messages(thread.id, bob.id, limit=2)
+    older, older_page = ChatService.get_thread_messages(thread.id, bob.id, limit=2, before=page["before_cursor"])
+    oldest, last_page = ChatService.get_thread_messages(thread.id, bob.id, limit=2, before=older_page["before_cursor"])
+    assert [m["content"] for m in oldest + older + newest] == ["0", "1", "2", "3", "4"]
+    assert page["has_more"] and not last_page["has_more"] and last_page["before_cursor"] is None
+
+    forward, forward_page = ChatService.get_thread_messages(thread.id, bob.id, limit=3, after=last_page["after_cursor"])
+    assert [m["content"] for m in forward] == ["1", "2", "3"] and forward_page["has_more"]
+    with pytest.raises(ValueError):
+        ChatService.get_thread_messages(thread.id, bob.id, before="garbage")
+
+
+def test_missed_messages_replay_since_cursor_or_read_position(app, monkeypatch):
+    monkeypatch.setattr(socketio, "emit", lambda *args, **kwargs: None)
+    alice, bob = (User(email=f"{name}@sync.example.com", password="x", role="hr") for name in ("alice", "bob"))
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    threads = [ChatThread(title=title, created_by=alice.id) for title in ("one", "two")]
+    for thread in threads:
+        thread.participants.extend([alice, bob])
+    db.session.add_all(threads)
+    db.session.commit()
+
+    seen = ChatService.send_message(threads[0].id, alice.id, "seen")
+    ChatService.mark_read(threads[0].id, bob.id)
+    db.session.commit()
+    for i in range(3):
+        ChatService.send_message(threads[0].id, alice.id, f"a{i}")
+    ChatService.send_message(threads[1].id, alice.id, "b0")
+
+    missed = {t["thread_id"]: t for t in ChatService.get_missed_messages(bob.id, limit=2)}
+    assert [m["content"] for m in missed[threads[0].id]["messages"]] == ["a1", "a2"]
+    assert missed[threads[0].id]["truncated"] and not missed[threads[1].id]["truncated"]
+    assert [m["content"] for m in missed[threads[1].id]["messages"]] == ["b0"]
+
+    since = encode_cursor(seen.created_at, seen.id)
+    replay = ChatService.get_missed_messages(alice.id, since=since)
+    assert sum(len(t["messages"]) for t in replay) == 4
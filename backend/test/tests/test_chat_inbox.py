@@ -0,0 +1,37 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.extensions import socketio
+from app.models import ChatThread, User
+from app.services.chat_service import ChatService
+
+
+def test_inbox_is_one_page_per_query(app, monkeypatch):
+    monkeypatch.setattr(socketio, "emit", lambda *args, **kwargs: None)
+    alice, bob = (User(email=f"{name}@inbox.example.com", password="x", role="hr") for name in ("alice", "bob"))
+    db.session.add_all([alice, bob])
+    db.session.flush()
+    start = datetime.utcnow() - timedelta(days=1)
+    threads = []
+    for i in range(5):
+        thread = ChatThread(title=f"t{i}", created_by=alice.id, created_at=start + timedelta(minutes=i))
+        thread.participants.extend([alice, bob])
+        threads.append(thread)
+    db.session.add_all(threads)
+    db.session.commit()
+    # Activity moves the oldest thread to the top of the inbox
+    ChatService.send_message(threads[0].id, alice.id, "x" * 150)
+
+    page, cursor = ChatService.get_user_threads(bob.id, limit=3)
+    assert [t["title"] for t in page] == ["t0", "t4", "t3"]
+    assert page[0]["unread_count"] == 1 and page[1]["unread_count"] == 0
+    assert page[0]["last_message"]["content"] == "x" * 100 + "..."
+    assert page[0]["participant_count"] == 2 and page[1]["last_message"] is None
+
+    rest, cursor = ChatService.get_user_threads(bob.id, limit=3, cursor=cursor)
+    assert [t["title"] for t in rest] == ["t2", "t1"] and cursor is None
+
+    with pytest.raises(ValueError):
+        ChatService.get_user_threads(bob.id, limit=3, cursor="garbage")
@@ -0,0 +1,35 @@
+from app import db
+from app.extensions import socketio
+from app.models import ChatReadCursor, ChatThread, User
+from app.services.chat_service import ChatService
+
+
+def test_read_cursor_drives_unread_counts(app, monkeypatch):
+    monkeypatch.setattr(socketio, "emit", lambda *args, **kwargs: None)
+    alice, bob, eve = (User(email=f"{name}@chat.example.com", password="x", role="hr") for name in ("alice", "bob", "eve"))
+    db.session.add_all([alice, bob, eve])
+    db.session.flush()
+    thread = ChatThread(title="Hiring", created_by=alice.id)
+    thread.participants.extend([alice, bob])
+    db.session.add(thread)
+    db.session.commit()
+
+    first = ChatService.send_message(thread.id, alice.id, "one")
+    second = ChatService.send_message(thread.id, alice.id, "two")
+    ChatService.send_message(thread.id, alice.id, "three")
+
+    # Sending advanced the sender's own cursor in the same commit
+    assert db.session.get(ChatReadCursor, (thread.id, alice.id)).last_read_message_id > second.id
+    assert ChatService.unread_counts(bob.id, [thread.id]) == {thread.id: 3}
+    assert ChatService.unread_counts(alice.id, [thread.id]) == {}
+
+    assert ChatService.mark_read(thread.id, bob.id, second.id) == second.id
+    assert ChatService.unread_counts(bob.id, [thread.id]) == {thread.id: 1}
+    # Never moves back, and non-participants get no cursor
+    assert ChatService.mark_read(thread.id, bob.id, first.id) is None
+    assert ChatService.mark_read(thread.id, eve.id) is None
+    db.session.commit()
+
+    ChatService.get_thread_messages(thread.id, bob.id)
+    assert ChatService.unread_counts(bob.id, [thread.id]) == {}
+    assert db.session.query(ChatReadCursor).filter_by(thread_id=thread.id).count() == 2
@@ -0,0 +1,76 @@
+import pytest
+
+from app.services import circuit_breaker
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from app.services.ai_cv_parser import AIParser
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_opens_on_failure_rate_and_recovers_through_probe(clock):
+    breaker = CircuitBreaker("test", window=4, min_calls=4, failure_rate=0.5,
+                             slow_call_seconds=10, cooldown_seconds=30)
+    for success, latency in [(True, 1), (False, None), (True, 12), (True, 1)]:
+        ticket = breaker.allow()
+        breaker.record(success, latency, ticket=ticket)  # one failure + one slow call = 50%
+
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    clock[0] += 30
+    assert breaker.state == HALF_OPEN
+    probe = breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # only one probe at a time
+    breaker.record(False, ticket=probe)
+    assert breaker.state == OPEN
+
+    clock[0] += 30
+    probe = breaker.allow()
+    breaker.record(True, 1, ticket=probe)
+    assert breaker.state == CLOSED
+
+
+def test_only_the_probe_decides_a_half_open_circuit(clock):
+    breaker = CircuitBreaker("test", window=2, min_calls=2, failure_rate=0.5, cooldown_seconds=30)
+    slow_call = breaker.allow()  # admitted while closed, finishes much later
+    for _ in range(2):
+        breaker.record(False, ticket=breaker.allow())
+    assert breaker.state == OPEN
+
+    clock[0] += 30
+    probe = breaker.allow()
+    breaker.record(True, 1, ticket=slow_call)  # stale success must not close the circuit
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()  # the probe is still the one in flight
+
+    breaker.record(False, ticket=probe)
+    assert breaker.state == OPEN
+
+
+def test_lost_probe_is_replaced_after_a_cooldown(clock):
+    breaker = CircuitBreaker("test", window=1, min_calls=1, failure_rate=1, cooldown_seconds=30)
+    breaker.record(False, ticket=breaker.allow())
+    clock[0] += 30
+    lost = breaker.allow()
+
+    clock[0] += 30
+    probe = breaker.allow()
+    breaker.record(False, ticket=lost)  # the abandoned probe reporting late is ignored
+    assert breaker.state == HALF_OPEN
+    breaker.record(True, 1, ticket=probe)
+    assert breaker.state == CLOSED
+
+
+def test_offline_match_scores_required_skills():
+    result = AIParser.offline_match("Senior Python and SQL engineer", "", ["Python", "SQL", "Kubernetes", "C++"])
+    assert result["match_score"] == 50
+    assert result["missing_skills"] == ["Kubernetes", "C++"]
+    assert result["offline"] is True
@@ -0,0 +1,103 @@
+import io
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models import Requisition, Candidate, Application, User, Interview
+from app.services.columnar_export_service import ColumnarExportService
+from app.utils.exceptions import ServiceException
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc  # noqa: E402
+import pyarrow.parquet  # noqa: E402
+
+
+@pytest.fixture
+def apps(app):
+    manager = User(email="manager@example.com", password="x", role="hiring_manager")
+    job = Requisition(title="Engineer", description="desc", vacancy=1, category="IT")
+    candidate = Candidate(full_name="Alice", cv_score=70)
+    db.session.add_all([manager, job, candidate])
+    db.session.flush()
+    apps = [
+        Application(candidate_id=candidate.id, requisition_id=job.id, status="screening", cv_score=i)
+        for i in range(5)
+    ]
+    db.session.add_all(apps)
+    db.session.flush()
+    db.session.add(Interview(candidate_id=candidate.id, hiring_manager_id=manager.id,
+                             application_id=apps[0].id, scheduled_time=datetime(2026, 3, 1, 9)))
+    db.session.commit()
+    return apps
+
+
+def _batch_sizes(monkeypatch, size):
+    """Record the size of every record batch handed to the writer"""
+    sizes = []
+    original = ColumnarExportService._record_batches
+
+    def recording(stmt, schema, pa_module):
+        for batch in original(stmt, schema, pa_module):
+            sizes.append(batch.num_rows)
+            yield batch
+
+    monkeypatch.setattr(ColumnarExportService, "BATCH_SIZE", size)
+    monkeypatch.setattr(ColumnarExportService, "_record_batches", staticmethod(recording))
+    return sizes
+
+
+def test_parquet_export_matches_schema_and_row_count(apps, monkeypatch):
+    sizes = _batch_sizes(monkeypatch, 2)
+    sink = io.BytesIO()
+
+    rows = ColumnarExportService.write_table("applications", sink, "parquet")
+
+    assert rows == len(apps)
+    assert sizes == [2, 2, 1]  # one record batch per yield_per partition
+    sink.seek(0)
+    parquet = pa.parquet.ParquetFile(sink)
+    _, expected_schema = ColumnarExportService._table_spec("applications", pa)
+    assert parquet.schema_arrow.equals(expected_schema)
+    assert parquet.metadata.num_rows == len(apps)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.row_group(0).column(0).compression == "ZSTD"
+
+    table = parquet.read()
+    assert table.column("application_id").to_pylist() == [a.id for a in apps]
+    assert table.column("interview_dates").to_pylist()[0] == [datetime(2026, 3, 1, 9)]
+    assert table.column("interview_count").to_pylist() == [1, 0, 0, 0, 0]
+
+
+def test_arrow_ipc_export_matches_schema_and_row_count(apps, monkeypatch):
+    sizes = _batch_sizes(monkeypatch, 3)
+    sink = io.BytesIO()
+
+    rows = ColumnarExportService.write_table("applications", sink, "arrow")
+
+    assert rows == len(apps)
+    assert sizes == [3, 2]
+    reader = pa.ipc.open_file(io.BytesIO(sink.getvalue()))
+    _, expected_schema = ColumnarExportService._table_spec("applications", pa)
+    assert reader.schema.equals(expected_schema)
+    assert reader.num_record_batches == 2
+    table = reader.read_all()
+    assert table.num_rows == len(apps)
+    assert table.column("cv_score").to_pylist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+
+def test_dimension_tables_and_directory_export(apps, tmp_path):
+    written = ColumnarExportService.export_to_directory(str(tmp_path), ["candidates", "interviews"], "parquet")
+
+    assert written == {"candidates": 1, "interviews": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["candidates.parquet", "interviews.parquet"]
+    candidates = pa.parquet.read_table(tmp_path / "candidates.parquet")
+    assert candidates.column("cv_score").to_pylist() == [70]
+    assert candidates.schema.field("cv_score").type == pa.int64()
+
+
+def test_rejects_unknown_format_and_table(app):
+    with pytest.raises(ServiceException):
+        ColumnarExportService.write_table("applications", io.BytesIO(), "csv")
+    with pytest.raises(ServiceException):
+        ColumnarExportService.write_table("offers", io.BytesIO(), "parquet")
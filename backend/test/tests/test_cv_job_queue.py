@@ -0,0 +1,86 @@
+import io
+from datetime import datetime
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from app.models import Requisition, Candidate, Application, User, CVAnalysisJob
+from app.services.cv_job_queue import CVJobQueue
+from app.utils.exceptions import ConflictException
+
+
+def test_submitted_job_is_claimed_once(app, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(CVJobQueue, "enqueue", staticmethod(enqueued.append))
+
+    user = User(email="cand@example.com", password="x", role="candidate")
+    job = Requisition(title="Engineer", description="desc", vacancy=1)
+    db.session.add_all([user, job])
+    db.session.flush()
+    candidate = Candidate(full_name="Alice", user_id=user.id)
+    db.session.add(candidate)
+    db.session.flush()
+    application = Application(candidate_id=candidate.id, requisition_id=job.id)
+    db.session.add(application)
+    db.session.commit()
+
+    upload = FileStorage(stream=io.BytesIO(b"resume"), filename="cv.txt")
+    cv_job = CVJobQueue.submit(application, user.id, upload, "Python developer")
+
+    assert enqueued == [cv_job.id]
+    assert CVJobQueue.active_job(application.id).id == cv_job.id
+
+    claimed = CVJobQueue._claim(cv_job.id)
+    assert claimed.status == "running" and claimed.attempts == 1
+    assert CVJobQueue._claim(cv_job.id) is None
+    assert db.session.get(CVAnalysisJob, cv_job.id).file_data == b"resume"
+
+
+def _application():
+    user = User(email="cand2@example.com", password="x", role="candidate")
+    job = Requisition(title="Engineer", description="desc", vacancy=1)
+    db.session.add_all([user, job])
+    db.session.flush()
+    candidate = Candidate(full_name="Bob", user_id=user.id)
+    db.session.add(candidate)
+    db.session.flush()
+    application = Application(candidate_id=candidate.id, requisition_id=job.id)
+    db.session.add(application)
+    db.session.commit()
+    return user, application
+
+
+def test_second_active_job_for_an_application_conflicts(app, monkeypatch):
+    monkeypatch.setattr(CVJobQueue, "enqueue", staticmethod(lambda job_id, delay=0: None))
+    user, application = _application()
+
+    first = CVJobQueue.submit(application, user.id, FileStorage(io.BytesIO(b"a"), filename="a.txt"))
+    # Simulate the racing request that passed the active_job() check too
+    with pytest.raises(ConflictException) as raised:
+        CVJobQueue.submit(application, user.id, FileStorage(io.BytesIO(b"b"), filename="b.txt"))
+
+    assert raised.value.details == {"job_id": first.id, "status": "queued"}
+    assert CVAnalysisJob.query.filter_by(application_id=application.id).count() == 1
+
+
+def test_failed_attempt_is_retried_after_a_jittered_backoff(app, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(CVJobQueue, "enqueue", staticmethod(lambda job_id, delay=0: enqueued.append(delay)))
+    monkeypatch.setitem(app.config, "CV_JOB_RETRY_BASE_SECONDS", 20)
+    user, application = _application()
+    cv_job = CVJobQueue.submit(application, user.id, FileStorage(io.BytesIO(b"a"), filename="a.txt"))
+
+    from app.services.cv_parser_service import HybridResumeAnalyzer
+    monkeypatch.setattr(HybridResumeAnalyzer, "upload_cv",
+                        staticmethod(lambda *a, **k: (_ for _ in ()).throw(RuntimeError("storage down"))))
+    job = CVJobQueue.process(cv_job.id)
+
+    assert job.status == "queued" and job.attempts == 1
+    assert 10 <= enqueued[-1] <= 20
+    assert job.not_before > datetime.utcnow()
+    # Redelivered early (e.g. by recover): not claimed until the backoff passes
+    assert CVJobQueue._claim(cv_job.id) is None
+
+    delays = [CVJobQueue.retry_delay(2) for _ in range(20)]
+    assert all(20 <= d <= 40 for d in delays) and len(set(delays)) > 1
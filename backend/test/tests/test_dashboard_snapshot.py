@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Requisition, Candidate, Application, DashboardSnapshot, DashboardSnapshotDelta
+from app.services.dashboard_snapshot_service import DashboardSnapshotService
+
+
+def _snapshot_values():
+    values = {}
+    for row in DashboardSnapshot.query.all() + DashboardSnapshotDelta.query.all():
+        if not row.metric.startswith('_meta.'):
+            values[(row.metric, row.bucket)] = values.get((row.metric, row.bucket), 0) + row.value
+    return values
+
+
+def _seed():
+    job = Requisition(title="Engineer", description="desc", vacancy=1)
+    candidate = Candidate(full_name="Alice")
+    db.session.add_all([job, candidate])
+    db.session.flush()
+
+    apps = [
+        Application(candidate_id=candidate.id, requisition_id=job.id,
+                    status=status, cv_score=score, created_at=created_at)
+        for status, score, created_at in [
+            ("screening", 60, datetime.utcnow()),
+            ("screening", 80, datetime.utcnow() - timedelta(days=3)),
+            ("rejected", 40, datetime.utcnow() - timedelta(days=40)),
+        ]
+    ]
+    db.session.add_all(apps)
+    db.session.commit()
+    return apps
+
+
+def test_incremental_counters_match_rebuild(app):
+    apps = _seed()
+
+    apps[0].status = "hired"
+    db.session.delete(apps[2])
+    db.session.commit()
+
+    incremental = _snapshot_values()
+    assert incremental[("applications.total", "")] == 2
+    assert incremental[("applications.status.hired", "")] == 1
+    assert incremental[("applications.status.screening", "")] == 1
+    assert incremental.get(("applications.status.rejected", ""), 0) == 0
+
+    DashboardSnapshotService.rebuild()
+    rebuilt = _snapshot_values()
+
+    non_zero = {key: value for key, value in incremental.items() if value}
+    assert set(non_zero) == set(rebuilt)
+    for key, value in rebuilt.items():
+        assert abs(non_zero[key] - value) < 1e-3
+
+
+def test_writers_append_deltas_and_compact_folds_them(app):
+    _seed()
+    DashboardSnapshotService.rebuild()
+    assert DashboardSnapshotDelta.query.count() == 0
+
+    db.session.add(Candidate(full_name="Bob"))
+    db.session.commit()
+    db.session.add(Candidate(full_name="Carol"))
+    db.session.commit()
+
+    pending = DashboardSnapshotDelta.query.filter_by(metric="candidates.total").all()
+    assert [row.value for row in pending] == [1, 1]
+
+    assert DashboardSnapshotService.compact()
+    db.session.expire_all()
+    assert DashboardSnapshotDelta.query.count() == 0
+    assert DashboardSnapshot.query.filter_by(metric="candidates.total", bucket="").one().value == 3
+
+
+def test_load_never_rebuilds_inline(app, monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(DashboardSnapshotService, "_schedule", lambda name, task: scheduled.append(name))
+    monkeypatch.setattr(DashboardSnapshotService, "rebuild",
+                        lambda wait=True: (_ for _ in ()).throw(AssertionError("rebuilt inline")))
+    _seed()
+
+    snapshot = DashboardSnapshotService.load()
+
+    assert scheduled == ["rebuild"]
+    assert snapshot.meta()["rebuilt_at"] is None
+    # Pending deltas are summed on read even before any rebuild
+    assert snapshot.total("candidates.total") == 1
+    assert snapshot.total("applications.total") == 3
+
+
+def test_load_reports_windows_and_staleness(app, monkeypatch):
+    _seed()
+    DashboardSnapshotService.rebuild()
+    db.session.add(Candidate(full_name="Bob"))
+    db.session.commit()
+    monkeypatch.setattr(DashboardSnapshotService, "_schedule", lambda name, task: None)
+
+    snapshot = DashboardSnapshotService.load()
+
+    assert snapshot.total("candidates.total") == 2
+    assert snapshot.window("applications.created", days=7) == 2
+    assert snapshot.totals_by_suffix("applications.status.") == {"screening": 2, "rejected": 1}
+    assert snapshot.average("applications.cv_score.sum", "applications.cv_score.count") == 60
+    assert snapshot.meta()["rebuilt_at"] is not None
@@ -0,0 +1,63 @@
+import io
+
+from app.services import extraction_store
+from app.services.extraction_store import ExtractionStore, content_hash
+from app.services.text_extraction_service import TextExtractionService
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def find_one_and_update(self, query, update):
+        doc = self.docs.get(query["_id"])
+        if doc is None or doc.get("extractor_version") != query["extractor_version"]:
+            return None
+        doc["hits"] += update["$inc"]["hits"]
+        return dict(doc)
+
+    def update_one(self, query, update, upsert=False):
+        doc = self.docs.setdefault(query["_id"], dict(update["$setOnInsert"]))
+        doc.update(update["$set"])
+
+
+def test_file_is_parsed_once_per_content_hash(monkeypatch):
+    monkeypatch.setenv("TEXT_EXTRACTION_PROCESSES", "0")
+    collection = FakeCollection()
+    monkeypatch.setattr(ExtractionStore, "_collection", staticmethod(lambda: collection))
+    parsed = []
+    original = TextExtractionService.extract_document.__func__
+
+    def counting(cls, *args, **kwargs):
+        parsed.append(args)
+        return original(cls, *args, **kwargs)
+
+    monkeypatch.setattr(TextExtractionService, "extract_document", classmethod(counting))
+
+    first = ExtractionStore.extract(io.BytesIO(b"Python developer"), "a.txt")
+    second = ExtractionStore.extract(b"Python developer", "renamed.txt")
+
+    assert first["cv_hash"] == second["cv_hash"] == content_hash(b"Python developer")
+    assert (first["cached"], second["cached"]) == (False, True)
+    assert first["stored"] and second["stored"]
+    assert second["text"] == "Python developer" and second["page_count"] == 1
+    assert len(parsed) == 1
+    assert collection.docs[first["cv_hash"]]["hits"] == 1
+
+
+def test_store_outage_falls_back_to_extraction(monkeypatch):
+    monkeypatch.setenv("TEXT_EXTRACTION_PROCESSES", "0")
+    monkeypatch.setattr(extraction_store.ExtractionStore, "_unavailable_until", 0.0)
+
+    class Broken:
+        def find_one_and_update(self, *args, **kwargs):
+            raise ConnectionError("mongo down")
+
+    monkeypatch.setattr(ExtractionStore, "_collection", staticmethod(lambda: Broken()))
+    result = ExtractionStore.extract(b"plain cv", "cv.txt")
+
+    assert result["text"] == "plain cv" and result["cached"] is False
+    # Nothing confirmed the write, so callers must keep the text themselves
+    assert result["stored"] is False
+    assert ExtractionStore._unavailable_until > 0
+    assert ExtractionStore.save_text("pasted cv") == (content_hash(b"pasted cv"), False)
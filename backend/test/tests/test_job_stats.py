@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models import Requisition, Candidate, Application
+from app.services.job_stats_service import JobStatsService
+
+
+def _make_job(title, category="Engineering", vacancy=2):
+    job = Requisition(
+        title=title,
+        description="desc",
+        vacancy=vacancy,
+        category=category,
+        weightings={"cv": 50, "assessment": 50},
+    )
+    db.session.add(job)
+    db.session.flush()
+    return job
+
+
+def test_list_jobs_with_stats_counts(app):
+    job = _make_job("Backend Engineer")
+    empty_job = _make_job("Designer", category="Design")
+    candidate = Candidate(full_name="Alice")
+    db.session.add(candidate)
+    db.session.flush()
+
+    old = datetime.utcnow() - timedelta(days=30)
+    for status, created_at in [
+        ("screening", datetime.utcnow()),
+        ("hired", datetime.utcnow()),
+        ("rejected", old),
+    ]:
+        db.session.add(Application(
+            candidate_id=candidate.id,
+            requisition_id=job.id,
+            status=status,
+            created_at=created_at,
+        ))
+    db.session.commit()
+
+    rows, pagination = JobStatsService.list_jobs_with_stats()
+    stats = {j.id: s for j, s in rows}
+
+    assert pagination is None
+    assert stats[job.id]["applications_count"] == 3
+    assert stats[job.id]["recent_applications"] == 2
+    assert stats[job.id]["hired_count"] == 1
+    assert stats[job.id]["progress"] == 50.0
+    assert stats[job.id]["status_breakdown"]["rejected"] == 1
+    assert stats[empty_job.id]["applications_count"] == 0
+
+
+def test_list_jobs_with_stats_category_and_pagination(app):
+    for i in range(5):
+        _make_job(f"Job {i}")
+    _make_job("Other", category="Design")
+    db.session.commit()
+
+    rows, pagination = JobStatsService.list_jobs_with_stats(
+        category="Engineering", page=1, per_page=2
+    )
+
+    assert len(rows) == 2
+    assert pagination.total == 5
+    assert all(job.category == "Engineering" for job, _ in rows)
+
+
+def test_status_breakdown_and_application_counts(app):
+    job = _make_job("Analyst")
+    candidate = Candidate(full_name="Bob")
+    db.session.add(candidate)
+    db.session.flush()
+    for status in ["applied", "applied", "screening"]:
+        db.session.add(Application(
+            candidate_id=candidate.id, requisition_id=job.id, status=status
+        ))
+    db.session.commit()
+
+    assert JobStatsService.status_breakdown([job.id]) == {
+        job.id: {"applied": 2, "screening": 1}
+    }
+    assert JobStatsService.application_counts([job.id, 999999]) == {
+        job.id: 3, 999999: 0
+    }
@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Requisition, Candidate, Application, User, Interview, AssessmentResult
+from app.services.powerbi_export_service import PowerBIExportService
+
+
+@pytest.fixture
+def apps(app):
+    manager = User(email="manager@example.com", password="x", role="hiring_manager")
+    user = User(email="alice@example.com", password="x", role="candidate", is_verified=True)
+    job = Requisition(title="Engineer", description="desc", vacancy=1, category="IT")
+    db.session.add_all([manager, user, job])
+    db.session.flush()
+    candidate = Candidate(full_name="Alice", user_id=user.id)
+    other = Candidate(full_name="Bob")
+    db.session.add_all([candidate, other])
+    db.session.flush()
+
+    apps = [
+        Application(candidate_id=candidate.id if i % 2 == 0 else other.id, requisition_id=job.id,
+                    status="screening" if i < 3 else "hired", cv_score=10 * i)
+        for i in range(5)
+    ]
+    db.session.add_all(apps)
+    db.session.flush()
+
+    first = apps[0]
+    db.session.add_all([
+        Interview(candidate_id=candidate.id, hiring_manager_id=manager.id, application_id=first.id,
+                  scheduled_time=datetime(2026, 3, 2, 9)),
+        Interview(candidate_id=candidate.id, hiring_manager_id=manager.id, application_id=first.id,
+                  scheduled_time=datetime(2026, 3, 1, 9)),
+        AssessmentResult(application_id=first.id, candidate_id=candidate.id, recommendation="proceed"),
+        AssessmentResult(application_id=first.id, candidate_id=candidate.id, recommendation="reject"),
+    ])
+    db.session.commit()
+    return apps
+
+
+@pytest.fixture
+def statements(app):
+    """Collect the fact-table batch SELECTs issued while the test runs"""
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "interview_agg" in statement:
+            executed.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(db.engine, "before_cursor_execute", count)
+
+
+def test_page_bounds_walk_the_id_keyset(apps):
+    ids = [a.id for a in apps]
+
+    assert PowerBIExportService.page_bounds({}, None, None) == (None, None)
+    assert PowerBIExportService.page_bounds({}, None, 2) == (ids[1], ids[1])
+    assert PowerBIExportService.page_bounds({}, ids[1], 2) == (ids[3], ids[3])
+    # Short last page: no bound needed (stream the rest) and no next cursor
+    assert PowerBIExportService.page_bounds({}, ids[3], 2) == (None, None)
+    # Exactly full last page: bounded, still no next cursor
+    assert PowerBIExportService.page_bounds({}, ids[3], 1) == (ids[4], None)
+    assert PowerBIExportService.page_bounds({}, ids[4], 2) == (None, None)
+    # Filters apply before the offset
+    assert PowerBIExportService.page_bounds({"status": "hired"}, None, 1) == (ids[3], ids[3])
+
+
+def test_iter_rows_streams_keyset_batches(apps, statements, monkeypatch):
+    monkeypatch.setattr(PowerBIExportService, "BATCH_SIZE", 2)
+    ids = [a.id for a in apps]
+
+    rows = list(PowerBIExportService.iter_rows({}))
+
+    assert [r["application_id"] for r in rows] == ids
+    assert len(statements) == 3  # 2 + 2 + 1 rows, the short batch ends the walk
+    first = rows[0]
+    assert first["candidate_email"] == "alice@example.com" and first["candidate_verified"] is True
+    assert first["job_category"] == "IT"
+    assert first["recommendation"] == "proceed"  # earliest assessment result
+    assert first["interview_count"] == 2
+    assert first["interview_dates"] == ["2026-03-01T09:00:00", "2026-03-02T09:00:00"]
+    assert rows[1]["candidate_email"] is None and rows[1]["interview_count"] == 0
+    assert rows[1]["interview_dates"] == []
+
+    statements.clear()
+    page = list(PowerBIExportService.iter_rows({}, cursor=ids[0], upper=ids[2]))
+    assert [r["application_id"] for r in page] == ids[1:3]
+    # An exactly full last batch costs one extra empty read
+    assert len(statements) == 2
+
+
+def _rows(apps):
+    return list(PowerBIExportService.iter_rows({"job_id": apps[0].requisition_id}))
+
+
+def test_serialize_json_and_ndjson(apps):
+    as_json = json.loads("".join(PowerBIExportService.serialize(iter(_rows(apps)), "json")))
+    assert [r["application_id"] for r in as_json] == [a.id for a in apps]
+    assert set(as_json[0]) == set(PowerBIExportService.COLUMNS)
+
+    assert "".join(PowerBIExportService.serialize(iter([]), "json")) == "[]"
+
+    lines = "".join(PowerBIExportService.serialize(iter(_rows(apps)), "ndjson")).splitlines()
+    assert [json.loads(line) for line in lines] == as_json
+
+
+def test_serialize_csv(apps):
+    chunks = list(PowerBIExportService.serialize(iter(_rows(apps)), "csv"))
+
+    # Header plus one chunk per row, so nothing is buffered across rows
+    assert len(chunks) == len(apps)
+    reader = list(csv.reader(io.StringIO("".join(chunks))))
+    assert tuple(reader[0]) == PowerBIExportService.COLUMNS
+    first = dict(zip(reader[0], reader[1]))
+    assert first["application_id"] == str(apps[0].id)
+    assert first["interview_dates"] == "2026-03-01T09:00:00;2026-03-02T09:00:00"
+    assert len(reader) == len(apps) + 1
+
+    assert "".join(PowerBIExportService.serialize(iter([]), "csv")).splitlines() == [
+        ",".join(PowerBIExportService.COLUMNS)
+    ]
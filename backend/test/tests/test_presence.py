@@ -0,0 +1,41 @@
+from app import db
+from app.extensions import socketio
+from app.models import ChatThread, User
+from app.services.presence_service import MemoryPresenceStore, PresenceService
+
+
+def test_presence_is_refcounted_and_coalesced_per_watcher(app, monkeypatch):
+    monkeypatch.setattr(PresenceService, "_store", MemoryPresenceStore())
+    monkeypatch.setattr(PresenceService, "_sockets", {})
+    monkeypatch.setattr(PresenceService, "_ensure_loop", staticmethod(lambda: None))
+    sent = []
+    monkeypatch.setattr(socketio, "emit", lambda event, data, room=None: sent.append((event, data, room)))
+
+    alice, bob, carol = (User(email=f"{name}@example.com", password="x", role="hr") for name in ("alice", "bob", "carol"))
+    db.session.add_all([alice, bob, carol])
+    db.session.flush()
+    # Bob shares two threads with Alice but must hear about her once
+    for title in ("one", "two"):
+        thread = ChatThread(title=title, created_by=alice.id)
+        thread.participants.extend([alice, bob])
+        db.session.add(thread)
+    db.session.commit()
+
+    PresenceService.connect(bob.id, "bob-1")
+    PresenceService.flush()
+    sent.clear()
+
+    PresenceService.connect(alice.id, "tab-1")
+    PresenceService.connect(alice.id, "tab-2")
+    PresenceService.connect(carol.id, "carol-1")
+    assert PresenceService.flush() == 1
+    assert [(event, room) for event, _, room in sent] == [("presence_update", f"user_{bob.id}")]
+    assert [p["status"] for p in sent[0][1]["presences"]] == ["online"]
+
+    sent.clear()
+    assert PresenceService.disconnect("tab-1") == alice.id
+    assert PresenceService.flush() == 0  # Still online in another tab
+    PresenceService.disconnect("tab-2")
+    PresenceService.flush()
+    assert sent[0][1]["presences"][0]["status"] == "offline"
+    assert PresenceService.disconnect("unknown") is None
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from app import db
+from app.models import Requisition, Candidate, Application, AuditLog, Meeting, User
+from app.services.search_service import SearchService
+
+
+def test_prefix_query_strips_operators():
+    assert SearchService.prefix_query("Dev & eng!") == "dev:* & eng:*"
+    assert SearchService.prefix_query(" :* ") is None
+
+
+def test_search_all_prefix_and_substring_matches(app):
+    job = Requisition(title="Backend Developer", description="Python services", vacancy=1, category="Engineering")
+    other = Requisition(title="Accountant", description="Ledgers", vacancy=1)
+    johnny = Candidate(full_name="Johnny Appleseed")
+    db.session.add_all([job, other, johnny])
+    db.session.flush()
+    db.session.add(Application(candidate_id=johnny.id, requisition_id=job.id))
+    db.session.commit()
+
+    results = SearchService.search_all("devel")
+    assert [j["title"] for j in results["jobs"]] == ["Backend Developer"]
+    assert results["jobs"][0]["applications_count"] == 1
+    assert [a["candidate_name"] for a in results["applications"]] == ["Johnny Appleseed"]
+
+    # Substring inside a word falls back to the trigram-indexed name
+    assert [c["name"] for c in SearchService.search_all("ohnn")["candidates"]] == ["Johnny Appleseed"]
+
+
+def test_substring_matches_survive_on_phones_meetings_and_audits(app):
+    admin = User(email="search-admin@example.com", password="x", role="admin")
+    db.session.add(admin)
+    db.session.flush()
+    db.session.add_all([
+        Candidate(full_name="Thandi Nkosi", phone="+27 11 555 0199"),
+        Meeting(title="Quarterly roadmap", description="Backlog grooming", start_time=datetime.utcnow(),
+                end_time=datetime.utcnow(), organizer_id=admin.id),
+        AuditLog(admin_id=admin.id, action="update", details="Changed requisition#42 owner"),
+    ])
+    db.session.commit()
+
+    assert [c["name"] for c in SearchService.search_all("199")["candidates"]] == ["Thandi Nkosi"]
+    assert SearchService.filter(Meeting.query, Meeting, "admap").count() == 1
+    assert SearchService.filter(Meeting.query, Meeting, "groom").count() == 1
+    assert SearchService.filter(AuditLog.query, AuditLog, "ition#4").count() == 1
@@ -0,0 +1,61 @@
+from app import db
+from app.models import Requisition, Candidate, Application
+from app.services.shortlist_service import ShortlistService, compile_rules
+
+
+def test_compile_rules_reports_unrecognised_rules():
+    predicates, ignored = compile_rules(("assessment >= 50", "Must have a driver's licence"))
+    assert [(field, threshold) for field, _, threshold in predicates] == [("assessment_score", 50.0)]
+    assert ignored == ("Must have a driver's licence",)
+
+
+def test_rank_applies_knockouts_and_persists_scores(app):
+    job = Requisition(
+        title="Engineer", description="desc", vacancy=1, min_experience=2,
+        weightings={"cv": 50, "assessment": 50}, knockout_rules=["assessment_score >= 40"]
+    )
+    senior = Candidate(full_name="Senior", profile={"years_of_experience": 5})
+    junior = Candidate(full_name="Junior", profile={"years_of_experience": 1})
+    unknown = Candidate(full_name="Unknown", profile={})
+    failed = Candidate(full_name="Failed", profile={"years_of_experience": 4})
+    db.session.add_all([job, senior, junior, unknown, failed])
+    db.session.flush()
+    scores = {senior: (80, 60), junior: (90, 90), unknown: (70, 50), failed: (100, 10)}
+    apps = {
+        c: Application(candidate_id=c.id, requisition_id=job.id, cv_score=cv, assessment_score=assessment)
+        for c, (cv, assessment) in scores.items()
+    }
+    db.session.add_all(apps.values())
+    db.session.commit()
+
+    result = ShortlistService.rank(job.id)
+    assert [r["full_name"] for r in result["ranked"]] == ["Senior", "Unknown"]
+    assert result["knocked_out"] == 2
+
+    top = ShortlistService.rank(job.id, top_k=1, persist=False)
+    assert [r["full_name"] for r in top["ranked"]] == ["Senior"]
+
+    db.session.refresh(apps[junior])
+    assert apps[junior].overall_score == 90
+
+
+def test_cv_score_prefers_the_application_then_the_candidate(app):
+    job = Requisition(title="Engineer", description="desc", vacancy=1, weightings={"cv": 100, "assessment": 0})
+    analysed = Candidate(full_name="Analysed", cv_score=40, profile={"cv_score": 99})
+    fallback = Candidate(full_name="Fallback", cv_score=70, profile={"cv_score": 10})
+    neither = Candidate(full_name="Neither", profile={"cv_score": 80})
+    db.session.add_all([job, analysed, fallback, neither])
+    db.session.flush()
+    db.session.add_all([
+        Application(candidate_id=analysed.id, requisition_id=job.id, cv_score=85),
+        Application(candidate_id=fallback.id, requisition_id=job.id, cv_score=0),
+        Application(candidate_id=neither.id, requisition_id=job.id),
+    ])
+    db.session.commit()
+
+    ranked = ShortlistService.rank(job.id, persist=False)["ranked"]
+
+    # profile['cv_score'] (the legacy source) is not read
+    assert [(r["full_name"], r["cv_score"]) for r in ranked] == [
+        ("Analysed", 85), ("Fallback", 70), ("Neither", 0)
+    ]
@@ -0,0 +1,33 @@
+from app.services.ai_cv_parser import AIParser
+from app.services.skill_taxonomy import SkillTaxonomy, get_taxonomy
+
+TAXONOMY = {
+    "skills": {
+        "Java": [], "JavaScript": ["js"], "C++": ["cpp"], "C#": [],
+        "Kubernetes": ["k8s"], "Machine Learning": ["ml"],
+    },
+    "education": {"Bachelor's Degree": ["bsc", "b.sc"]},
+}
+
+
+def test_matches_synonyms_on_word_boundaries_in_one_pass():
+    found = SkillTaxonomy(TAXONOMY).find(
+        "B.Sc graduate. JavaScript and C++ (no plain Java), k8s, machine\n  learning, ML again, C#"
+    )
+    assert found["skills"] == ["JavaScript", "C++", "Java", "Kubernetes", "Machine Learning", "C#"]
+    assert found["education"] == ["Bachelor's Degree"]
+    assert SkillTaxonomy(TAXONOMY).find("Javanese cppreference")["skills"] == []
+
+
+def test_offline_extract_uses_default_taxonomy():
+    data = AIParser.offline_extract("Jane Doe\nBSc Computer Science\nSkills: Python, PostgreSQL, k8s\nisiZulu")
+    assert {"Python", "PostgreSQL", "Kubernetes"} <= set(data["skills"])
+    assert data["education"] == ["Bachelor's Degree"]
+    assert data["languages"] == ["isiZulu"]
+    assert get_taxonomy() is get_taxonomy()
+
+
+def test_default_taxonomy_keeps_the_legacy_keywords():
+    # The keyword list it replaced matched these bare forms
+    found = get_taxonomy().find("Python, Java, Flutter, Dart, React, SQL, Node and AWS")["skills"]
+    assert {"Python", "Java", "Flutter", "Dart", "React", "SQL", "Node.js", "AWS"} <= set(found)
@@ -0,0 +1,20 @@
+from app.extensions import socketio
+from app.services.socketio_fanout import message_queue_url, socketio_options
+
+
+def test_message_queue_resolution():
+    assert message_queue_url("none", "redis://localhost:6379/0") is None
+    assert message_queue_url("rediss://cache:6380/2", "redis://localhost:6379/0") == "rediss://cache:6380/2"
+    # 'auto' falls back to in-process delivery when Redis does not answer
+    assert message_queue_url("auto", "redis://127.0.0.1:1/0") is None
+
+
+def test_options_follow_config(app):
+    options = socketio_options(
+        {"SOCKETIO_MESSAGE_QUEUE": "redis://queue:6379/1", "SOCKETIO_TRANSPORTS": "websocket"},
+        "redis://localhost:6379/0",
+    )
+    assert options == {"async_mode": "threading", "message_queue": "redis://queue:6379/1",
+                       "channel": "flask-socketio", "transports": ["websocket"]}
+    # The test app delivers in-process
+    assert socketio.server_options["message_queue"] is None
@@ -0,0 +1,93 @@
+import io
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from app import db
+from app.models import StoredFile, User
+from app.services import storage_service
+from app.services.storage_service import StorageService
+
+
+def test_local_backend_stages_dedupes_and_serves(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "STORAGE_BACKEND", "local")
+    monkeypatch.setitem(app.config, "STORAGE_LOCAL_DIR", str(tmp_path))
+    monkeypatch.setitem(app.config, "PUBLIC_API_URL", "https://api.example.com")
+    monkeypatch.setattr(storage_service, "READ_CHUNK", 4)  # force several chunks
+
+    upload = FileStorage(stream=io.BytesIO(b"%PDF-1.4 resume"), filename="cv.pdf", content_type="application/pdf")
+    url = StorageService.store(upload, folder="candidate_cvs")
+    again = StorageService.store(b"%PDF-1.4 resume", folder="resumes", filename="copy.pdf")
+
+    key = url.rsplit("/", 1)[1]
+    assert url == again == f"https://api.example.com/api/files/{key}"
+    assert upload.stream.tell() == 0
+    assert StoredFile.query.count() == 1
+    stored = db.session.get(StoredFile, key)
+    assert (stored.status, stored.size, stored.filename) == ("uploaded", 15, "cv.pdf")
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+    response = app.test_client().get(f"/api/files/{key}")
+    assert response.status_code == 200
+    assert response.data == b"%PDF-1.4 resume"
+    assert app.test_client().get("/api/files/" + "0" * 64).status_code == 404
+
+
+def test_cloudinary_upload_runs_after_staging(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "STORAGE_BACKEND", "cloudinary")
+    monkeypatch.setitem(app.config, "STORAGE_LOCAL_DIR", str(tmp_path))
+    queued = []
+    monkeypatch.setattr(StorageService, "enqueue", staticmethod(queued.append))
+    monkeypatch.setattr(storage_service.CloudinaryBackend, "upload",
+                        staticmethod(lambda path, row, chunk_size: f"https://cdn.example.com/{row.key}"))
+
+    with app.test_request_context():
+        url = StorageService.store(b"offer", folder="offers", filename="offer.pdf")
+    key = url.rsplit("/", 1)[1]
+    assert queued == [key]
+    assert db.session.get(StoredFile, key).status == "staged"
+
+    # The staged copy is served until the background upload lands
+    assert app.test_client().get(f"/api/files/{key}").data == b"offer"
+
+    StorageService.upload(key)
+    assert not (tmp_path / key[:2] / key).exists()
+    response = app.test_client().get(f"/api/files/{key}")
+    assert response.status_code == 302
+    assert response.headers["Location"] == f"https://cdn.example.com/{key}"
+
+
+def test_store_leaves_the_callers_transaction_alone(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "STORAGE_BACKEND", "local")
+    monkeypatch.setitem(app.config, "STORAGE_LOCAL_DIR", str(tmp_path))
+    monkeypatch.setitem(app.config, "PUBLIC_API_URL", "")
+    with monkeypatch.context() as outside_request:
+        outside_request.setattr(storage_service, "has_request_context", lambda: False)
+        with pytest.raises(RuntimeError, match="PUBLIC_API_URL"):
+            StorageService.store(b"offer", folder="offers")
+
+    monkeypatch.setitem(app.config, "PUBLIC_API_URL", "https://api.example.com")
+    user = User(email="pending@example.com", password="x", role="hr")
+    db.session.add(user)
+    StorageService.store(b"offer", folder="offers")
+    db.session.rollback()
+    assert User.query.filter_by(email="pending@example.com").count() == 0
+    assert StoredFile.query.count() == 1
+
+    # A worker's staging directory is not the web processes' one
+    with pytest.raises(RuntimeError, match="STORAGE_LOCAL_SHARED"):
+        StorageService.store(b"cv", folder="candidate_cvs", wait=True)
+
+
+def test_worker_uploads_before_returning(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "STORAGE_BACKEND", "cloudinary")
+    monkeypatch.setitem(app.config, "STORAGE_LOCAL_DIR", str(tmp_path))
+    monkeypatch.setitem(app.config, "PUBLIC_API_URL", "https://api.example.com")
+    monkeypatch.setattr(StorageService, "enqueue", staticmethod(lambda key: pytest.fail("queued")))
+    monkeypatch.setattr(storage_service.CloudinaryBackend, "upload",
+                        staticmethod(lambda path, row, chunk_size: f"https://cdn.example.com/{row.key}"))
+
+    url = StorageService.store(b"cv", folder="candidate_cvs", wait=True)
+    key = url.rsplit("/", 1)[1]
+    assert db.session.get(StoredFile, key).remote_url == f"https://cdn.example.com/{key}"
+    assert not (tmp_path / key[:2] / key).exists()
@@ -0,0 +1,78 @@
+import io
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import text_extraction_service
+from app.services.text_extraction_service import ExtractionError, TextExtractionService, detect_format
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+    '<w:p><w:r><w:t>Jane Doe</w:t></w:r></w:p>'
+    '<w:p><w:r><w:t>Python</w:t><w:tab/><w:t>SQL</w:t></w:r></w:p>'
+    '</w:body></w:document>'
+)
+
+
+def make_docx(document_xml: str = DOCUMENT_XML) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", document_xml)
+    return buffer.getvalue()
+
+
+def test_detects_format_from_extension_then_magic_bytes():
+    assert detect_format(b"%PDF-1.7", "cv.PDF") == "pdf"
+    assert detect_format(b"%PDF-1.7", None) == "pdf"
+    assert detect_format(make_docx(), "upload") == "docx"
+    assert detect_format(b"plain", "notes") == "txt"
+
+
+def test_extracts_docx_and_text_in_process(monkeypatch):
+    monkeypatch.setenv("TEXT_EXTRACTION_PROCESSES", "0")
+
+    assert TextExtractionService.extract(make_docx(), "cv.docx") == "Jane Doe\nPython\tSQL"
+
+    upload = io.BytesIO("﻿hello world".encode("utf-8"))
+    assert TextExtractionService.extract(upload, "cv.txt", max_chars=5) == "hello"
+    assert upload.tell() == 0  # left readable for the next consumer
+
+
+def test_iter_pages_streams_paragraphs():
+    pages = TextExtractionService.iter_pages(make_docx(), "cv.docx", max_pages=1)
+    assert next(pages) == "Jane Doe"
+
+
+def test_docx_page_limit_follows_page_breaks(monkeypatch):
+    monkeypatch.setenv("TEXT_EXTRACTION_PROCESSES", "0")
+    # A hard break and the rendered break Word writes after it count once
+    document_xml = DOCUMENT_XML.replace("</w:body>", (
+        '<w:p><w:r><w:br w:type="page"/></w:r><w:r><w:lastRenderedPageBreak/><w:t>Page two</w:t></w:r></w:p>'
+        '<w:p><w:r><w:lastRenderedPageBreak/><w:t>Page three</w:t></w:r></w:p>'
+        '</w:body>'
+    ))
+    docx = make_docx(document_xml)
+
+    assert TextExtractionService.extract(docx, "cv.docx", max_pages=1) == "Jane Doe\nPython\tSQL"
+    assert TextExtractionService.extract(docx, "cv.docx", max_pages=2).endswith("Page two")
+    assert TextExtractionService.extract(docx, "cv.docx", max_pages=5).endswith("Page two\nPage three")
+
+
+def slow_worker(source, fmt, max_pages, max_chars):
+    time.sleep(float(source.decode()))
+    return {"text": source.decode()}
+
+
+def test_timeout_kills_only_its_own_document(monkeypatch):
+    monkeypatch.setenv("TEXT_EXTRACTION_PROCESSES", "2")
+    monkeypatch.setattr(text_extraction_service, "_extract_worker", slow_worker)
+    monkeypatch.setattr(TextExtractionService, "_slots", None)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        survivor = pool.submit(TextExtractionService.extract, b"1.5", "cv.txt", timeout=10)
+        doomed = pool.submit(TextExtractionService.extract, b"30", "cv.txt", timeout=0.5)
+        with pytest.raises(ExtractionError, match="timed out"):
+            doomed.result()
+        assert survivor.result() == "1.5"
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import Requisition, Candidate, Application, User, Interview, AssessmentResult
+
+URL = "/api/analytics/time-per-stage"
+START = datetime(2026, 1, 10, 9)
+
+
+@pytest.fixture
+def stages(app):
+    """
+    Three applications with known stage times (days):
+
+    - eng (IT, January): assessment after 1 day, interviews after 2 and 5 days
+    - eng (IT, February): assessment after 3 days, no interview
+    - sales (Sales, February): no assessment, interview after 4 days
+    """
+    manager = User(email="manager@example.com", password="x", role="hiring_manager")
+    eng = Requisition(title="Engineer", description="desc", vacancy=1, category="IT")
+    sales = Requisition(title="Sales Rep", description="desc", vacancy=1, category="Sales")
+    candidate = Candidate(full_name="Alice")
+    db.session.add_all([manager, eng, sales, candidate])
+    db.session.flush()
+
+    feb = START + timedelta(days=31)
+    apps = [
+        Application(candidate_id=candidate.id, requisition_id=eng.id, created_at=START),
+        Application(candidate_id=candidate.id, requisition_id=eng.id, created_at=feb),
+        Application(candidate_id=candidate.id, requisition_id=sales.id, created_at=feb),
+    ]
+    db.session.add_all(apps)
+    db.session.flush()
+
+    def interview(application, days):
+        return Interview(candidate_id=candidate.id, hiring_manager_id=manager.id, application_id=application.id,
+                         scheduled_time=application.created_at + timedelta(days=days))
+
+    def assessment(application, days):
+        return AssessmentResult(application_id=application.id, candidate_id=candidate.id,
+                                created_at=application.created_at + timedelta(days=days))
+
+    db.session.add_all([
+        assessment(apps[0], 1), assessment(apps[0], 6), interview(apps[0], 5), interview(apps[0], 2),
+        assessment(apps[1], 3),
+        interview(apps[2], 4),
+    ])
+    db.session.commit()
+    return {"apps": apps, "eng": eng, "sales": sales}
+
+
+def test_invalid_group_by(client, stages):
+    response = client.get(URL, query_string={"group_by": "weekday"})
+    assert response.status_code == 400
+
+
+def test_overall_percentiles(client, stages):
+    response = client.get(URL)
+    assert response.status_code == 200
+    data = response.get_json()
+
+    # First assessment: 1 and 3 days; first interview: 2 and 4 days
+    assessment = data["time_to_assessment_days"]
+    assert assessment["count"] == 2
+    assert assessment["mean"] == 2 and assessment["median"] == 2
+    assert assessment["p90"] == pytest.approx(2.8) and assessment["p99"] == pytest.approx(2.98)
+    interview = data["time_to_interview_days"]
+    assert interview["count"] == 2
+    assert interview["mean"] == 3 and interview["p90"] == pytest.approx(3.8)
+
+
+def test_group_by_requisition(client, stages):
+    data = client.get(URL, query_string={"group_by": "requisition"}).get_json()
+
+    by_title = {row["title"]: row for row in data}
+    assert set(by_title) == {"Engineer", "Sales Rep"}
+    eng = by_title["Engineer"]
+    assert eng["requisition_id"] == stages["eng"].id
+    assert eng["time_to_assessment_days"]["count"] == 2 and eng["time_to_assessment_days"]["median"] == 2
+    assert eng["time_to_interview_days"] == {"count": 1, "mean": 2, "median": 2, "p90": 2, "p99": 2}
+    sales = by_title["Sales Rep"]
+    assert sales["time_to_assessment_days"]["count"] == 0 and sales["time_to_assessment_days"]["mean"] is None
+    assert sales["time_to_interview_days"]["mean"] == 4
+
+
+def test_group_by_category(client, stages):
+    data = client.get(URL, query_string={"group_by": "category"}).get_json()
+
+    assert [row["category"] for row in data] == ["IT", "Sales"]
+    assert data[0]["time_to_assessment_days"]["mean"] == 2
+    assert data[1]["time_to_interview_days"]["count"] == 1
+
+
+def test_group_by_month(client, stages):
+    data = client.get(URL, query_string={"group_by": "month"}).get_json()
+
+    assert [row["month"] for row in data] == ["2026-01", "2026-02"]
+    january, february = data
+    assert january["time_to_assessment_days"]["mean"] == 1
+    assert january["time_to_interview_days"]["mean"] == 2
+    assert february["time_to_assessment_days"]["mean"] == 3
+    assert february["time_to_interview_days"]["mean"] == 4
+
+
+def test_raw_mode_paginates(client, stages):
+    ids = [a.id for a in stages["apps"]]
+
+    first = client.get(URL, query_string={"mode": "raw", "per_page": 2}).get_json()
+    assert [r["application_id"] for r in first["results"]] == ids[:2]
+    assert first["results"][0] == {"application_id": ids[0], "time_to_assessment_days": 1.0,
+                                   "time_to_interview_days": 2.0}
+    assert first["results"][1]["time_to_interview_days"] is None
+    assert first["pagination"] == {"page": 1, "per_page": 2, "total_pages": 2, "total_items": 3,
+                                   "has_next": True, "has_prev": False}
+
+    second = client.get(URL, query_string={"mode": "raw", "per_page": 2, "page": 2}).get_json()
+    assert [r["application_id"] for r in second["results"]] == ids[2:]
+    assert second["results"][0]["time_to_assessment_days"] is None
+    assert second["pagination"]["has_next"] is False and second["pagination"]["has_prev"] is True
+
+    capped = client.get(URL, query_string={"mode": "raw", "per_page": 10000}).get_json()
+    assert capped["pagination"]["per_page"] == 500